@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Running-annual-average (RAA) compliance engine
+
+The 2024 PFAS rule judges compliance on running annual averages of
+quarterly results rather than on single samples. This module holds
+multi-year monitoring histories for a whole state as one
+utility × quarter × compound array and evaluates them with array
+operations:
+
+    quarterly mean    mean of a quarter's samples (non-detects as 0)
+    RAA at quarter t  mean of the sampled quarterly means in t-3 .. t
+    violation         RAA above the MCL (quarters without a defined RAA
+                      are not in violation)
+    violation days    calendar days of the violating quarters within the
+                      penalty period (by default the 4 quarters ending at
+                      the utility's last sampled quarter)
+
+The Hazard Index is evaluated on the RAAs of its component compounds
+each quarter, and its violation days are counted like a compound's.
+
+The rolling sum is a sliding window of four shifted slices, so the cost
+is linear in the history length, and quarters are added in time order
+exactly like sample_ingest's raa reducer, so both give identical RAAs
+(a cumulative-sum difference would not, which matters for results that
+sit right at an MCL).
+
+The derived per-compound days replace the fixed 365-day assumption: the
+profiles built here carry them in UtilityProfile.violation_days, which
+generate_liability_report uses for the regulatory penalties.
+
+Requirements:
+    pip install numpy
+
+Usage:
+    python utility_exposure_calculator.py --samples UCMR5_All.txt \\
+        --input fleet.csv --violation-days data --output reports.jsonl
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import calendar
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from exposure_engine import hazard_index
+from sample_ingest import RAA_QUARTERS, iter_samples, load_metadata
+from utility_exposure_calculator import (
+    EPA_LIMITS,
+    EPA_PENALTY_RATE,
+    HAZARD_INDEX,
+    HAZARD_INDEX_MCL,
+    PFASResult,
+    UtilityProfile,
+)
+
+
+# Quarters whose violations are penalized (one year, matching the annual
+# penalty figure in the report)
+PENALTY_PERIOD_QUARTERS = 4
+
+
+def quarter_label(quarter: int) -> str:
+    """'2025Q3' for a quarter index (year * 4 + quarter)."""
+    return f"{quarter // 4}Q{quarter % 4 + 1}"
+
+
+def quarter_days(first_quarter: int, count: int) -> np.ndarray:
+    """Calendar days in each of `count` quarters starting at first_quarter."""
+    days = []
+    for quarter in range(first_quarter, first_quarter + count):
+        year, q = divmod(quarter, 4)
+        days.append(sum(calendar.monthrange(year, month)[1] for month in range(3 * q + 1, 3 * q + 4)))
+    return np.array(days, dtype=np.int64)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HISTORY
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Sample records buffered per chunk by ComplianceHistory.from_samples
+SAMPLE_CHUNK_ROWS = 1 << 16
+
+
+def _pack(rows: List[Tuple[int, int, int, float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(utility, quarter, compound, ppt) rows as compact column arrays."""
+    packed = np.array(rows, dtype=[("u", np.int32), ("q", np.int32), ("c", np.int16), ("ppt", np.float64)])
+    return packed["u"], packed["q"], packed["c"], packed["ppt"]
+
+
+@dataclass
+class ComplianceHistory:
+    """
+    Quarterly monitoring history of many utilities.
+
+    quarterly[u, t, c] is the mean result of utility u for compound c in
+    quarter first_quarter + t, or NaN when it wasn't sampled.
+    """
+    utility_ids: List[str]
+    compounds: Tuple[str, ...]
+    first_quarter: int
+    quarterly: np.ndarray
+    names: List[Optional[str]] = field(default_factory=list)
+    states: List[Optional[str]] = field(default_factory=list)
+
+    @classmethod
+    def from_records(
+        cls,
+        utility_index: np.ndarray,
+        quarter: np.ndarray,
+        compound_index: np.ndarray,
+        ppt: np.ndarray,
+        utility_ids: List[str],
+        compounds: Sequence[str],
+        names: Optional[List[Optional[str]]] = None,
+        states: Optional[List[Optional[str]]] = None,
+    ) -> "ComplianceHistory":
+        """Bin sample records (parallel arrays) into quarterly means."""
+        quarter = np.asarray(quarter, dtype=np.int64)
+        if len(quarter) == 0:
+            raise ValueError("No samples")
+        if (quarter < 0).any():
+            raise ValueError("Every sample needs a collection date for RAA compliance")
+        first = int(quarter.min())
+        shape = (len(utility_ids), int(quarter.max()) - first + 1, len(compounds))
+        flat = np.ravel_multi_index(
+            (np.asarray(utility_index), quarter - first, np.asarray(compound_index)), shape
+        )
+        size = int(np.prod(shape))
+        # bincount adds in input order, like the streaming reducers
+        sums = np.bincount(flat, weights=np.asarray(ppt, dtype=np.float64), minlength=size)
+        counts = np.bincount(flat, minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            quarterly = np.where(counts > 0, sums / counts, np.nan).reshape(shape)
+        return cls(
+            list(utility_ids), tuple(compounds), first, quarterly,
+            names=list(names) if names is not None else [None] * len(utility_ids),
+            states=list(states) if states is not None else [None] * len(utility_ids),
+        )
+
+    @classmethod
+    def from_samples(cls, path: Path) -> "ComplianceHistory":
+        """
+        Read a UCMR5-style sample file (see sample_ingest) into a history.
+
+        Records are buffered SAMPLE_CHUNK_ROWS at a time and packed into
+        compact arrays, so memory grows by ~18 bytes per sample rather
+        than four Python objects.
+        """
+        ids: Dict[str, int] = {}
+        names: List[Optional[str]] = []
+        states: List[Optional[str]] = []
+        compounds: Dict[str, int] = {}
+        chunks: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        rows: List[Tuple[int, int, int, float]] = []
+        for utility_id, compound, ppt, quarter, name, state in iter_samples(path, need_dates=True):
+            u = ids.get(utility_id)
+            if u is None:
+                u = ids[utility_id] = len(ids)
+                names.append(name)
+                states.append(state)
+            c = compounds.get(compound)
+            if c is None:
+                c = compounds[compound] = len(compounds)
+            rows.append((u, quarter, c, ppt))
+            if len(rows) == SAMPLE_CHUNK_ROWS:
+                chunks.append(_pack(rows))
+                rows.clear()
+        if rows or not chunks:
+            chunks.append(_pack(rows))
+        columns = [np.concatenate(column) for column in zip(*chunks)]
+        del chunks
+        return cls.from_records(*columns, list(ids), tuple(compounds), names, states)
+
+    @property
+    def quarters(self) -> List[str]:
+        return [quarter_label(self.first_quarter + t) for t in range(self.quarterly.shape[1])]
+
+    @property
+    def limits(self) -> np.ndarray:
+        return np.array([EPA_LIMITS.get(c, np.inf) for c in self.compounds])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ROLLING COMPLIANCE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def rolling_raa(quarterly: np.ndarray, window: int = RAA_QUARTERS) -> np.ndarray:
+    """
+    Running average over the quarter axis (axis 1) of the sampled quarters.
+
+    NaN (unsampled) quarters are skipped; the RAA is NaN where a window
+    holds no samples. Each window is summed oldest quarter first.
+    """
+    sampled = ~np.isnan(quarterly)
+    values = np.where(sampled, quarterly, 0.0)
+    total = np.zeros_like(values)
+    count = np.zeros(quarterly.shape, dtype=np.int64)
+    quarters = quarterly.shape[1]
+    # total[t] = ((v[t-3] + v[t-2]) + v[t-1]) + v[t]: the oldest lag is added
+    # first, matching a forward pass over the window
+    for lag in range(min(window, quarters) - 1, -1, -1):
+        total[:, lag:] += values[:, : quarters - lag]
+        count[:, lag:] += sampled[:, : quarters - lag]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def assess(
+    history: ComplianceHistory,
+    period_quarters: Optional[int] = PENALTY_PERIOD_QUARTERS,
+) -> Dict[str, Any]:
+    """
+    RAA compliance of every utility, quarter and compound.
+
+    Returns arrays: raa and violating (utility × quarter × compound),
+    violation_days and latest_raa (utility × compound, latest_raa being
+    the RAA at each compound's last sampled quarter, NaN if never
+    sampled), hazard_index (utility × quarter, from that quarter's RAAs),
+    hazard_index_days and latest_hazard_index (per utility, the latter
+    from latest_raa), in_compliance and regulatory_total (per utility,
+    judged on the latest values and priced with the violation days as
+    calculate_regulatory_penalties does). Violation days count over the
+    period_quarters ending at each utility's last sampled quarter, or up
+    to it with period_quarters=None.
+    """
+    quarterly = history.quarterly
+    raa = rolling_raa(quarterly)
+    limits = history.limits
+    with np.errstate(invalid="ignore"):
+        violating = raa > limits  # NaN compares False
+
+    # Each utility's penalty period ends at its own last sampled quarter
+    sampled = ~np.isnan(quarterly)
+    quarters = quarterly.shape[1]
+    days = quarter_days(history.first_quarter, quarters)
+    t = np.arange(quarters)
+    last_sampled = quarters - 1 - np.argmax(sampled.any(axis=2)[:, ::-1], axis=1)
+    in_period = t <= last_sampled[:, None]
+    if period_quarters is not None:
+        in_period &= t > last_sampled[:, None] - period_quarters
+    violation_days = np.einsum("utc,t->uc", violating & in_period[:, :, None], days)
+    index = hazard_index(raa, history.compounds)  # NaN RAAs count as not detected
+    index_days = ((index > HAZARD_INDEX_MCL) & in_period) @ days
+
+    # RAA at the last sampled quarter of each (utility, compound)
+    last = quarters - 1 - np.argmax(sampled[:, ::-1, :], axis=1)
+    latest_raa = np.take_along_axis(raa, last[:, None, :], axis=1)[:, 0, :]
+    latest_raa[~sampled.any(axis=1)] = np.nan
+
+    with np.errstate(invalid="ignore"):
+        exceeding = latest_raa > limits
+    latest_index = hazard_index(latest_raa, history.compounds)
+    index_exceeding = latest_index > HAZARD_INDEX_MCL
+    penalty_days = (exceeding * violation_days).sum(axis=1) + index_exceeding * index_days
+    return {
+        "quarters": history.quarters,
+        "raa": raa,
+        "violating": violating,
+        "violation_days": violation_days,
+        "latest_raa": latest_raa,
+        "hazard_index": index,
+        "hazard_index_days": index_days,
+        "latest_hazard_index": latest_index,
+        "in_compliance": ~exceeding.any(axis=1) & ~index_exceeding,
+        "regulatory_total": penalty_days * EPA_PENALTY_RATE,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PROFILES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def history_profiles(
+    history: ComplianceHistory,
+    metadata: Dict[str, UtilityProfile],
+    period_quarters: Optional[int] = PENALTY_PERIOD_QUARTERS,
+    unmatched: Optional[List[str]] = None,
+) -> Iterator[UtilityProfile]:
+    """
+    One UtilityProfile per utility with metadata: PFAS results are the
+    latest RAAs and violation_days the data-derived days per compound.
+    """
+    result = assess(history, period_quarters)
+    latest = result["latest_raa"].tolist()
+    days = result["violation_days"].tolist()
+    index_days = result["hazard_index_days"].tolist()
+    for u, utility_id in enumerate(history.utility_ids):
+        base = metadata.get(utility_id)
+        if base is None:
+            if unmatched is not None:
+                unmatched.append(utility_id)
+            continue
+        yield UtilityProfile(
+            name=history.names[u] or base.name,
+            population_served=base.population_served,
+            daily_flow_mgd=base.daily_flow_mgd,
+            pfas_results=[
+                PFASResult(compound, level)
+                for compound, level in zip(history.compounds, latest[u])
+                if level > 0  # NaN (never sampled) compares False
+            ],
+            years_of_exposure=base.years_of_exposure,
+            utility_id=utility_id,
+            state=base.state or history.states[u],
+            violation_days={
+                **{compound: d for compound, d in zip(history.compounds, days[u]) if d},
+                **({HAZARD_INDEX: index_days[u]} if index_days[u] else {}),
+            },
+        )
+
+
+def timeseries_profiles(
+    samples_path: Path,
+    metadata_path: Path,
+    period_quarters: Optional[int] = PENALTY_PERIOD_QUARTERS,
+) -> Iterator[UtilityProfile]:
+    """history_profiles for a sample file plus fleet metadata file."""
+    unmatched: List[str] = []
+    history = ComplianceHistory.from_samples(samples_path)
+    yield from history_profiles(history, load_metadata(metadata_path), period_quarters, unmatched)
+    if unmatched:
+        print(
+            f"Warning: {len(unmatched):,} sampled utilities have no row in {metadata_path} "
+            f"(e.g. {unmatched[0]}); skipped",
+            file=sys.stderr,
+        )
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Vectorized (columnar) exposure engine
+
+Evaluates the same model as calculate_regulatory_penalties,
+calculate_litigation_exposure and calculate_treatment_costs, but over
+whole fleets at once: population, flow and years are 1-D arrays and the
+PFAS results are a utility × compound concentration matrix whose columns
+follow COMPOUNDS (the keys of EPA_LIMITS, then PFBS). A concentration of
+0 means "not detected", which the scalar model treats the same as an
+absent PFASResult.
+
+The Hazard Index is the matrix–vector product of the concentration
+matrix with the HBWC weight vector, so scoring a fleet stays one array
+operation per step. It counts as one more violation wherever it exceeds
+its MCL.
+
+Results match the scalar path value-for-value; the only possible
+difference is floating-point summation order of the exceedance factors
+when a profile lists its compounds in a different order than COMPOUNDS.
+
+ProfileBatch holds a fleet in this columnar form directly, with the
+exceedance computed once, for fleets too large to keep as objects.
+
+Requirements:
+    pip install numpy
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utility_exposure_calculator import (
+    EPA_LIMITS,
+    EPA_PENALTY_RATE,
+    HAZARD_INDEX_MCL,
+    HAZARD_INDEX_MIN_COMPOUNDS,
+    HAZARD_INDEX_WEIGHTS,
+    MODEL_COMPOUNDS,
+    PER_CAPITA_LIABILITY,
+    PFASResult,
+    UtilityProfile,
+    treatment_npv_per_mgd,
+)
+from technology_catalog import get_catalog
+
+
+# Column order of the concentration matrix
+COMPOUNDS = MODEL_COMPOUNDS
+
+
+def compound_limits(compounds: Sequence[str] = COMPOUNDS) -> np.ndarray:
+    """MCL vector aligned with the concentration matrix columns."""
+    return np.array([EPA_LIMITS.get(c, np.inf) for c in compounds], dtype=np.float64)
+
+
+def profiles_to_arrays(
+    profiles: Iterable[UtilityProfile],
+    compounds: Sequence[str] = COMPOUNDS,
+) -> Dict[str, np.ndarray]:
+    """
+    Convert UtilityProfile objects to the columnar inputs of score_fleet.
+
+    Compounds outside `compounds` are dropped (they carry no MCL or
+    Hazard Index weight and so never affect the scalar result either).
+    """
+    column = {compound: j for j, compound in enumerate(compounds)}
+    population = []
+    flow = []
+    years = []
+    rows = []
+    for profile in profiles:
+        population.append(profile.population_served)
+        flow.append(profile.daily_flow_mgd)
+        years.append(profile.years_of_exposure)
+        row = [0.0] * len(compounds)
+        for result in profile.pfas_results:
+            j = column.get(result.compound)
+            if j is None:
+                continue
+            if row[j]:
+                raise ValueError(f"{profile.name}: duplicate result for {result.compound}")
+            row[j] = result.concentration_ppt
+        rows.append(row)
+
+    return {
+        "population_served": np.array(population, dtype=np.int64),
+        "daily_flow_mgd": np.array(flow, dtype=np.float64),
+        "years_of_exposure": np.array(years, dtype=np.int64),
+        "concentrations": np.array(rows, dtype=np.float64).reshape(len(rows), len(compounds)),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# COLUMNAR CALCULATIONS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def exceedance_totals(concentrations: np.ndarray, limits: np.ndarray):
+    """
+    Violation counts and summed exceedance factors per utility.
+
+    Works compound by compound on a transposed (contiguous) copy, which
+    keeps the scalar path's summation order and avoids utility × compound
+    temporaries.
+    """
+    by_compound = np.ascontiguousarray(concentrations.T)
+    n = by_compound.shape[1]
+    violations = np.zeros(n, dtype=np.int64)
+    total_exceedance = np.zeros(n)
+    factor = np.empty(n)
+    for levels, limit in zip(by_compound, limits):
+        violations += levels > limit
+        if limit == 0:
+            # Mirror PFASResult.exceedance_factor for a zero limit
+            factor[:] = np.where(levels > 0, np.inf, 0.0)
+        else:
+            np.divide(levels, limit, out=factor)
+            factor -= 1.0
+            np.maximum(factor, 0.0, out=factor)
+        total_exceedance += factor
+    return violations, total_exceedance
+
+
+def hazard_index(concentrations: np.ndarray, compounds: Sequence[str] = COMPOUNDS) -> np.ndarray:
+    """
+    Hazard Index per utility: concentrations @ HBWC weights, over the
+    last axis (0 where fewer than two mixture compounds are detected).
+
+    The product is accumulated column by column in HAZARD_INDEX_HBWC order
+    (a gaxpy) rather than through BLAS, whose fused multiply-adds would
+    differ from the scalar mixture_hazard_index in the last bit right at
+    the MCL.
+    """
+    column = {compound: j for j, compound in enumerate(compounds)}
+    concentrations = np.asarray(concentrations, dtype=np.float64)
+    total = np.zeros(concentrations.shape[:-1])
+    present = np.zeros(concentrations.shape[:-1], dtype=np.int64)
+    for compound, weight in HAZARD_INDEX_WEIGHTS.items():
+        j = column.get(compound)
+        if j is None:
+            continue
+        levels = concentrations[..., j]
+        detected = levels > 0
+        total += np.where(detected, levels, 0.0) * weight
+        present += detected
+    total[present < HAZARD_INDEX_MIN_COMPOUNDS] = 0.0
+    return total
+
+
+def mcl_violations(concentrations: np.ndarray, compounds: Sequence[str] = COMPOUNDS):
+    """
+    Violation counts (compound MCLs plus the Hazard Index), summed
+    exceedance factors and Hazard Index per utility.
+    """
+    violations, total_exceedance = exceedance_totals(concentrations, compound_limits(compounds))
+    index = hazard_index(concentrations, compounds)
+    violations += index > HAZARD_INDEX_MCL
+    return violations, total_exceedance, index
+
+
+def regulatory_penalties(violations: np.ndarray, violation_days: int = 365) -> np.ndarray:
+    """Annual MCL penalties: one daily penalty per violation."""
+    return violations * (EPA_PENALTY_RATE * violation_days)
+
+
+def litigation_exposure(
+    population_served: np.ndarray,
+    years_of_exposure: np.ndarray,
+    total_exceedance: np.ndarray,
+    in_compliance: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Low/mid/high litigation exposure, zero for utilities in compliance."""
+    # Zeroing the affected population zeroes every estimate below it
+    affected = np.where(in_compliance, 0, (population_served * 0.8).astype(np.int64))
+    exceedance_mult = np.minimum(1 + total_exceedance * 0.1, 3.0)
+    duration_mult = np.minimum(1 + years_of_exposure * 0.05, 2.0)
+
+    # Same operand order as the scalar model so results are bit-identical;
+    # in-place products avoid one temporary per estimate
+    low = affected * float(PER_CAPITA_LIABILITY["low"])
+    low *= exceedance_mult
+    mid = affected * float(PER_CAPITA_LIABILITY["mid"])
+    mid *= exceedance_mult
+    mid *= duration_mult
+    high = affected * float(PER_CAPITA_LIABILITY["high"])
+    high *= exceedance_mult
+    high *= duration_mult
+
+    return {
+        "affected_population": affected,
+        "low": low,
+        "mid": mid,
+        "high": high,
+        "exceedance_multiplier": exceedance_mult,
+        "duration_multiplier": duration_mult,
+    }
+
+
+def treatment_costs(
+    daily_flow_mgd: np.ndarray,
+    technology: str = "gac",
+    years: int = 20,
+    discount_rate: Optional[float] = None,
+    escalation_rate: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Capital plus undiscounted O&M, as in calculate_treatment_costs.
+
+    With a discount_rate, the closed-form per-MGD NPV is evaluated once
+    and scaled by each utility's flow (as calculate_treatment_npv does).
+    """
+    if discount_rate is not None:
+        per_mgd = treatment_npv_per_mgd(technology, years, discount_rate, escalation_rate)
+        return {
+            "capital": per_mgd["capital"] * daily_flow_mgd,
+            "annual_om": per_mgd["annual_om"] * daily_flow_mgd,
+            "total_om": per_mgd["total_om"] * daily_flow_mgd,
+            "total": per_mgd["total"] * daily_flow_mgd,
+        }
+
+    tech = get_catalog().technology(technology)
+
+    capital = tech.capital_per_mgd * daily_flow_mgd
+    annual_om = 365 * daily_flow_mgd * 1000 * tech.om_per_1000gal
+    total_om = annual_om * years
+    return {
+        "capital": capital,
+        "annual_om": annual_om,
+        "total_om": total_om,
+        "total": capital + total_om,
+    }
+
+
+def score_exceedance(
+    population_served: np.ndarray,
+    daily_flow_mgd: np.ndarray,
+    years_of_exposure: np.ndarray,
+    violations: np.ndarray,
+    total_exceedance: np.ndarray,
+    technology: str = "gac",
+    treatment_years: int = 20,
+    violation_days: int = 365,
+    discount_rate: Optional[float] = None,
+    escalation_rate: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """Score a fleet whose violation counts and exceedance are already known."""
+    in_compliance = violations == 0
+
+    regulatory = regulatory_penalties(violations, violation_days)
+    litigation = litigation_exposure(population_served, years_of_exposure, total_exceedance, in_compliance)
+    treatment = treatment_costs(daily_flow_mgd, technology, treatment_years, discount_rate, escalation_rate)
+
+    totals = {}
+    for estimate in ("low", "mid", "high"):
+        total = regulatory + litigation[estimate]
+        total += treatment["total"]
+        totals[estimate] = total
+
+    return {
+        "in_compliance": in_compliance,
+        "violations": violations,
+        "total_exceedance_factor": total_exceedance,
+        "regulatory_total": regulatory,
+        "affected_population": litigation["affected_population"],
+        "litigation_low": litigation["low"],
+        "litigation_mid": litigation["mid"],
+        "litigation_high": litigation["high"],
+        "treatment_capital": treatment["capital"],
+        "treatment_annual_om": treatment["annual_om"],
+        "treatment_total": treatment["total"],
+        "total_low": totals["low"],
+        "total_mid": totals["mid"],
+        "total_high": totals["high"],
+    }
+
+
+def score_fleet(
+    population_served: np.ndarray,
+    daily_flow_mgd: np.ndarray,
+    years_of_exposure: np.ndarray,
+    concentrations: np.ndarray,
+    technology: str = "gac",
+    treatment_years: int = 20,
+    violation_days: int = 365,
+    discount_rate: Optional[float] = None,
+    escalation_rate: float = 0.0,
+    compounds: Sequence[str] = COMPOUNDS,
+) -> Dict[str, np.ndarray]:
+    """
+    Score a whole fleet with array operations.
+
+    Returns a dict of 1-D arrays (one entry per utility) mirroring the
+    numeric fields of generate_liability_report.
+    """
+    concentrations = np.asarray(concentrations, dtype=np.float64)
+    if concentrations.ndim != 2 or concentrations.shape[1] != len(compounds):
+        raise ValueError(
+            f"concentrations must be shaped (utilities, {len(compounds)}), got {concentrations.shape}"
+        )
+
+    violations, total_exceedance, index = mcl_violations(concentrations, compounds)
+    scores = score_exceedance(
+        np.asarray(population_served),
+        np.asarray(daily_flow_mgd, dtype=np.float64),
+        np.asarray(years_of_exposure),
+        violations,
+        total_exceedance,
+        technology, treatment_years, violation_days, discount_rate, escalation_rate,
+    )
+    scores["hazard_index"] = index
+    return scores
+
+
+def score_profiles(profiles: Iterable[UtilityProfile], **kwargs) -> Dict[str, np.ndarray]:
+    """Convenience wrapper: columnarize profiles and score them."""
+    return score_fleet(**profiles_to_arrays(profiles), **kwargs)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ARRAY-BACKED FLEET CONTAINER
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class ProfileBatch:
+    """
+    A fleet held as columns instead of one UtilityProfile per utility.
+
+    Uses a few dozen bytes per utility for the numeric columns, and the
+    limits, violation counts and exceedance factors are computed once at
+    construction, so repeated scoring (different technologies, horizons
+    or violation days) skips the concentration matrix entirely.
+    Indexing returns an equivalent UtilityProfile.
+    """
+    population_served: np.ndarray
+    daily_flow_mgd: np.ndarray
+    years_of_exposure: np.ndarray
+    concentrations: np.ndarray
+    names: Optional[List[str]] = None
+    utility_ids: Optional[List[Optional[str]]] = None
+    states: Optional[List[Optional[str]]] = None
+    compounds: Tuple[str, ...] = COMPOUNDS
+    limits: np.ndarray = field(init=False, repr=False)
+    violations: np.ndarray = field(init=False, repr=False)
+    total_exceedance: np.ndarray = field(init=False, repr=False)
+    hazard_index: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.compounds = tuple(self.compounds)
+        self.population_served = np.asarray(self.population_served, dtype=np.int64)
+        self.daily_flow_mgd = np.asarray(self.daily_flow_mgd, dtype=np.float64)
+        self.years_of_exposure = np.asarray(self.years_of_exposure, dtype=np.int64)
+        self.concentrations = np.asarray(self.concentrations, dtype=np.float64)
+        n = len(self.population_served)
+        if self.concentrations.shape != (n, len(self.compounds)):
+            raise ValueError(
+                f"concentrations must be shaped ({n}, {len(self.compounds)}), got {self.concentrations.shape}"
+            )
+        for label, column in (("daily_flow_mgd", self.daily_flow_mgd), ("years_of_exposure", self.years_of_exposure)):
+            if len(column) != n:
+                raise ValueError(f"{label} has {len(column)} entries, expected {n}")
+        for label in ("names", "utility_ids", "states"):
+            column = getattr(self, label)
+            if column is not None and len(column) != n:
+                raise ValueError(f"{label} has {len(column)} entries, expected {n}")
+        self.limits = compound_limits(self.compounds)
+        self.violations, self.total_exceedance, self.hazard_index = mcl_violations(
+            self.concentrations, self.compounds
+        )
+
+    @classmethod
+    def from_profiles(cls, profiles: Iterable[UtilityProfile], compounds: Sequence[str] = COMPOUNDS) -> "ProfileBatch":
+        """Columnarize UtilityProfile objects (names, ids and states are kept)."""
+        profiles = list(profiles)
+        return cls(
+            **profiles_to_arrays(profiles, compounds),
+            names=[p.name for p in profiles],
+            utility_ids=[p.utility_id for p in profiles],
+            states=[p.state for p in profiles],
+            compounds=tuple(compounds),
+        )
+
+    def __len__(self) -> int:
+        return len(self.population_served)
+
+    @property
+    def in_compliance(self) -> np.ndarray:
+        return self.violations == 0
+
+    def profile(self, i: int) -> UtilityProfile:
+        """Materialize utility i as a UtilityProfile (non-detects are omitted)."""
+        row = self.concentrations[i]
+        return UtilityProfile(
+            name=self.names[i] if self.names is not None else f"Utility {i}",
+            population_served=int(self.population_served[i]),
+            daily_flow_mgd=float(self.daily_flow_mgd[i]),
+            pfas_results=[
+                PFASResult(compound, float(level))
+                for compound, level in zip(self.compounds, row)
+                if level
+            ],
+            years_of_exposure=int(self.years_of_exposure[i]),
+            utility_id=self.utility_ids[i] if self.utility_ids is not None else None,
+            state=self.states[i] if self.states is not None else None,
+        )
+
+    __getitem__ = profile
+
+    def __iter__(self) -> Iterator[UtilityProfile]:
+        return (self.profile(i) for i in range(len(self)))
+
+    def score(self, **kwargs) -> Dict[str, np.ndarray]:
+        """score_fleet for this batch, reusing the precomputed exceedance."""
+        scores = score_exceedance(
+            self.population_served,
+            self.daily_flow_mgd,
+            self.years_of_exposure,
+            self.violations,
+            self.total_exceedance,
+            **kwargs,
+        )
+        scores["hazard_index"] = self.hazard_index
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the numeric columns (including precomputed ones)."""
+        return sum(
+            column.nbytes
+            for column in (
+                self.population_served, self.daily_flow_mgd, self.years_of_exposure,
+                self.concentrations, self.violations, self.total_exceedance, self.hazard_index,
+            )
+        )
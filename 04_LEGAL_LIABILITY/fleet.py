@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Fleet (batch) mode for the PFAS Liability Exposure Calculator
+
+Scores many utilities in one process instead of launching the calculator
+once per water system. Input rows are streamed from CSV or Parquet into
+UtilityProfile objects, each profile is run through
+generate_liability_report, and one output row per utility is written as
+JSONL, CSV or Arrow (see report_output.py). Neither side holds the fleet
+in memory.
+
+Input columns (header names are case-insensitive):
+    name, utility_id (or pwsid), state,
+    population_served (or population), daily_flow_mgd (or flow),
+    years_of_exposure (or years),
+    PFOA, PFOS, PFHxS, PFNA, HFPO-DA (or genx), PFBS   # concentrations in ppt
+
+Blank or zero concentrations are treated as "not detected", exactly like
+omitting the corresponding --pfoa/--pfos/... flag on the command line.
+
+With --workers N, profiles are scored in chunks across a process pool.
+Output keeps input order, at most a few chunks per worker are in flight at
+any time, and every report carries the same run timestamp, so a run's
+output does not depend on the number of workers.
+
+Usage:
+    python utility_exposure_calculator.py --input fleet.csv --output reports.jsonl
+    python utility_exposure_calculator.py --input fleet.parquet --output summary.csv
+    python utility_exposure_calculator.py --input fleet.csv --output reports.arrow
+    python utility_exposure_calculator.py --input fleet.csv --workers 8
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import csv
+import itertools
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from utility_exposure_calculator import (
+    MODEL_COMPOUNDS,
+    PFASResult,
+    UtilityProfile,
+    generate_liability_report,
+)
+from report_output import (
+    FORMAT_EXTENSIONS,
+    WRITERS,
+    dumps,
+    flatten_report,
+    jsonl_line,
+    loads,
+    write_arrow_rows,
+    write_csv_rows,
+    write_lines,
+    write_report_rows,
+)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# INPUT SCHEMA
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Header aliases -> UtilityProfile field
+FIELD_ALIASES = {
+    "name": "name",
+    "utility_name": "name",
+    "pwsname": "name",
+    "utility_id": "utility_id",
+    "pwsid": "utility_id",
+    "state": "state",
+    "population_served": "population_served",
+    "population": "population_served",
+    "daily_flow_mgd": "daily_flow_mgd",
+    "flow_mgd": "daily_flow_mgd",
+    "flow": "daily_flow_mgd",
+    "years_of_exposure": "years_of_exposure",
+    "years": "years_of_exposure",
+}
+
+# Header aliases -> compound name used in EPA_LIMITS / HAZARD_INDEX_HBWC
+COMPOUND_ALIASES = {compound.lower(): compound for compound in MODEL_COMPOUNDS}
+COMPOUND_ALIASES["genx"] = "HFPO-DA"
+
+REQUIRED_FIELDS = ("population_served", "daily_flow_mgd")
+
+# Batch size for Parquet record batches
+PARQUET_BATCH_ROWS = 8192
+
+# Profiles per process-pool task, and tasks in flight per worker
+PARALLEL_CHUNK_SIZE = 1000
+PARALLEL_PREFETCH = 2
+
+# Profiles looked up per cache query batch (see score_cached)
+CACHE_CHUNK_SIZE = 10_000
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# READERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _column_map(
+    header: Sequence[str],
+    require_compounds: bool = True,
+) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    Resolve a header row once into (index, field) and (index, compound) pairs.
+
+    Unrecognized columns are ignored so that exports with extra metadata
+    can be fed in unchanged.
+    """
+    fields = []
+    compounds = []
+    for index, column in enumerate(header):
+        key = column.strip().lower()
+        if key in FIELD_ALIASES:
+            fields.append((index, FIELD_ALIASES[key]))
+        elif key in COMPOUND_ALIASES:
+            compounds.append((index, COMPOUND_ALIASES[key]))
+
+    found = {field for _, field in fields}
+    missing = [field for field in REQUIRED_FIELDS if field not in found]
+    if missing:
+        raise ValueError(f"Fleet input is missing required column(s): {', '.join(missing)}")
+    if require_compounds and not compounds:
+        raise ValueError(
+            "Fleet input has no PFAS concentration columns "
+            f"(expected any of: {', '.join(MODEL_COMPOUNDS)})"
+        )
+    return fields, compounds
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _profile_from_values(
+    values: Sequence[Any],
+    fields: List[Tuple[int, str]],
+    compounds: List[Tuple[int, str]],
+    row_number: int,
+) -> UtilityProfile:
+    """Build one UtilityProfile from a positional row using a resolved column map."""
+    data = {}
+    for index, field in fields:
+        value = values[index]
+        if not _is_blank(value):
+            data[field] = value
+
+    for field in REQUIRED_FIELDS:
+        if field not in data:
+            raise ValueError(f"row {row_number}: missing value for '{field}'")
+
+    try:
+        pfas_results = []
+        for index, compound in compounds:
+            value = values[index]
+            if _is_blank(value):
+                continue
+            concentration = float(value)
+            if concentration > 0:
+                pfas_results.append(PFASResult(compound, concentration))
+
+        profile = UtilityProfile(
+            name=str(data.get("name", f"Utility {row_number}")),
+            population_served=int(float(data["population_served"])),
+            daily_flow_mgd=float(data["daily_flow_mgd"]),
+            pfas_results=pfas_results,
+            years_of_exposure=int(float(data.get("years_of_exposure", 5))),
+            utility_id=str(data["utility_id"]) if "utility_id" in data else None,
+            state=str(data["state"]) if "state" in data else None,
+        )
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"row {row_number}: {exc}") from None
+
+    return profile
+
+
+def profile_from_row(row: Dict[str, Any], row_number: int = 1) -> UtilityProfile:
+    """
+    Build a UtilityProfile from a single mapping of column name -> value.
+
+    Compounds missing from the mapping are "not detected".
+    """
+    header = list(row)
+    fields, compounds = _column_map(header, require_compounds=False)
+    return _profile_from_values([row[column] for column in header], fields, compounds, row_number)
+
+
+def read_fleet_csv(path: Path) -> Iterator[UtilityProfile]:
+    """Stream UtilityProfile objects from a CSV file, one row at a time."""
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return
+        fields, compounds = _column_map(header)
+        for row_number, values in enumerate(reader, start=2):
+            if not any(value.strip() for value in values):
+                continue
+            if len(values) < len(header):
+                values = values + [""] * (len(header) - len(values))
+            try:
+                yield _profile_from_values(values, fields, compounds, row_number)
+            except ValueError as exc:
+                raise ValueError(f"{path}: {exc}") from None
+
+
+def read_fleet_parquet(path: Path, batch_rows: int = PARQUET_BATCH_ROWS) -> Iterator[UtilityProfile]:
+    """Stream UtilityProfile objects from a Parquet file, one record batch at a time."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet input requires pyarrow (pip install pyarrow)") from None
+
+    parquet_file = pq.ParquetFile(path)
+    header = parquet_file.schema_arrow.names
+    fields, compounds = _column_map(header)
+    wanted = sorted({index for index, _ in fields} | {index for index, _ in compounds})
+    columns = [header[index] for index in wanted]
+    # Re-index the column map onto the pruned column list
+    position = {index: offset for offset, index in enumerate(wanted)}
+    fields = [(position[index], field) for index, field in fields]
+    compounds = [(position[index], compound) for index, compound in compounds]
+
+    row_number = 1
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+        for values in zip(*(column.to_pylist() for column in batch.columns)):
+            row_number += 1
+            try:
+                yield _profile_from_values(values, fields, compounds, row_number)
+            except ValueError as exc:
+                raise ValueError(f"{path}: {exc}") from None
+
+
+def read_fleet(path: Path) -> Iterator[UtilityProfile]:
+    """Stream UtilityProfile objects from a CSV, Parquet or binary (.npy) fleet file."""
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        return read_fleet_parquet(path)
+    if path.suffix.lower() == ".npy":
+        from fleet_binary import read_fleet_binary
+        return read_fleet_binary(path)
+    return read_fleet_csv(path)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WRITERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def write_jsonl(reports: Iterable[Dict[str, Any]], handle: TextIO) -> int:
+    """Write one JSON report per line. Returns the number of rows written."""
+    return write_lines(map(jsonl_line, reports), handle)
+
+
+def write_csv(reports: Iterable[Dict[str, Any]], handle: TextIO) -> int:
+    """Write one flattened row per report. Returns the number of rows written."""
+    return write_report_rows(map(flatten_report, reports), handle)
+
+
+def infer_format(output: Optional[Path]) -> str:
+    """Pick an output format from the output file extension (JSONL by default)."""
+    if output is None:
+        return "jsonl"
+    return FORMAT_EXTENSIONS.get(Path(output).suffix.lower(), "jsonl")
+
+
+def write_rows(
+    rows: Iterable[Dict[str, Any]],
+    output_path: Optional[Path] = None,
+    output_format: Optional[str] = None,
+) -> int:
+    """
+    Stream flat rows (e.g. Monte Carlo or sweep results) as JSONL, CSV
+    or Arrow.
+
+    The CSV header (Arrow schema) is taken from the first row (batch).
+    Writes to stdout when output_path is None or "-". Returns the number
+    of rows written.
+    """
+    if output_path is not None and str(output_path) == "-":
+        output_path = None
+    output_format = output_format or infer_format(output_path)
+
+    def _write(handle: TextIO) -> int:
+        if output_format == "jsonl":
+            return write_jsonl(rows, handle)
+        if output_format == "arrow":
+            return write_arrow_rows(rows, handle)
+        return write_csv_rows(rows, handle)
+
+    if output_path is None:
+        return _write(sys.stdout)
+    with open(output_path, "w", newline="", encoding="utf-8") as handle:
+        return _write(handle)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PIPELINE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def iter_reports(
+    profiles: Iterable[UtilityProfile],
+    generated_at: Optional[str] = None,
+    report_options: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily generate one liability report per profile.
+
+    report_options are passed through to generate_liability_report
+    (technology, years, violation_days, discount_rate, ...).
+    """
+    options = report_options or {}
+    for profile in profiles:
+        yield generate_liability_report(profile, generated_at=generated_at, **options)
+
+
+def _score_chunk(
+    profiles: List[UtilityProfile],
+    generated_at: Optional[str],
+    render: Optional[Callable[[Dict[str, Any]], Any]],
+    report_options: Optional[Dict[str, Any]],
+) -> List[Any]:
+    """Process-pool task: score (and optionally render) one chunk of profiles."""
+    reports = iter_reports(profiles, generated_at, report_options)
+    if render is not None:
+        return [render(report) for report in reports]
+    return list(reports)
+
+
+def score_parallel(
+    profiles: Iterable[UtilityProfile],
+    workers: int,
+    generated_at: Optional[str] = None,
+    chunk_size: int = PARALLEL_CHUNK_SIZE,
+    render: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    report_options: Optional[Dict[str, Any]] = None,
+) -> Iterator[Any]:
+    """
+    Score profiles across a process pool, yielding reports in input order.
+
+    Input is consumed lazily: only workers × PARALLEL_PREFETCH chunks are
+    submitted ahead of the consumer, so memory stays bounded for fleets of
+    any size. All reports share one generated_at timestamp (taken once
+    here if not given). If render is given (a picklable module-level
+    function), workers yield render(report) instead of the report.
+    """
+    generated_at = generated_at or datetime.now().isoformat()
+    if workers <= 1:
+        reports = iter_reports(profiles, generated_at, report_options)
+        yield from (map(render, reports) if render is not None else reports)
+        return
+
+    iterator = iter(profiles)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while True:
+            while len(pending) < workers * PARALLEL_PREFETCH:
+                chunk = list(itertools.islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_score_chunk, chunk, generated_at, render, report_options))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def score_cached(
+    profiles: Iterable[UtilityProfile],
+    cache: Any,
+    workers: int = 1,
+    generated_at: Optional[str] = None,
+    report_options: Optional[Dict[str, Any]] = None,
+    chunk_size: int = CACHE_CHUNK_SIZE,
+    render: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Iterator[Any]:
+    """
+    Like score_parallel, but through a report_cache.ReportCache.
+
+    Profiles are looked up a chunk at a time; only the misses are scored
+    (across one process pool when workers > 1) and stored. Hits are
+    stamped with the run's generated_at. Output keeps input order. With
+    render=jsonl_line, hits are copied out as stored, without decoding.
+    """
+    generated_at = generated_at or datetime.now().isoformat()
+    options = report_options or {}
+    as_text = render is jsonl_line
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        iterator = iter(profiles)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                break
+            keys = [cache.key(profile, options) for profile in chunk]
+            found = cache.lookup(keys)
+            misses = [profile for profile, key in zip(chunk, keys) if key not in found]
+            if pool is not None and len(misses) > PARALLEL_CHUNK_SIZE:
+                futures = [
+                    pool.submit(_score_chunk, misses[i:i + PARALLEL_CHUNK_SIZE], generated_at, None, options)
+                    for i in range(0, len(misses), PARALLEL_CHUNK_SIZE)
+                ]
+                scored = iter([report for future in futures for report in future.result()])
+            else:
+                scored = iter_reports(misses, generated_at, options)
+            for key in keys:
+                text = found.get(key)
+                if text is None:
+                    report = next(scored)
+                    text = dumps(report)
+                    cache.store(key, text, generated_at)
+                else:
+                    report = None
+                    text = cache.stamp(text, generated_at)
+                if as_text:
+                    yield text + "\n"
+                    continue
+                if report is None:
+                    report = loads(text)
+                yield render(report) if render is not None else report
+            cache.flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def run_fleet(
+    input_path: Path,
+    output_path: Optional[Path] = None,
+    output_format: Optional[str] = None,
+    workers: int = 1,
+    report_options: Optional[Dict[str, Any]] = None,
+    profiles: Optional[Iterable[UtilityProfile]] = None,
+    cache: Any = None,
+) -> int:
+    """
+    Score every utility in a fleet file and stream the results out.
+
+    Pass profiles to score another source (e.g. aggregated lab samples)
+    instead of reading input_path, and a report_cache.ReportCache to
+    reuse the reports of unchanged utilities. Writes to stdout when
+    output_path is None or "-". Returns the number of utilities scored.
+    """
+    if output_path is not None and str(output_path) == "-":
+        output_path = None
+    output_format = output_format or infer_format(output_path)
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown output format '{output_format}' (choose from: {', '.join(WRITERS)})")
+
+    render, writer = WRITERS[output_format]
+    if profiles is None:
+        profiles = read_fleet(input_path)
+    if cache is not None:
+        rendered = score_cached(profiles, cache, workers, report_options=report_options, render=render)
+    else:
+        rendered = score_parallel(profiles, workers, render=render, report_options=report_options)
+
+    if output_path is None:
+        return writer(rendered, sys.stdout)
+    with open(output_path, "w", newline="", encoding="utf-8") as handle:
+        return writer(rendered, handle)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Binary fleet files: memory-mapped input for repeated scoring
+
+Rescoring the same large fleet under different assumptions spends most
+of each run parsing CSV into UtilityProfile objects. This format stores
+the fleet once as a NumPy structured array in a .npy file, one
+fixed-width record per utility:
+
+    population_served   int64
+    daily_flow_mgd      float64
+    years_of_exposure   int64
+    concentrations      float64 × compounds (ppt, 0 = not detected);
+                        the field title lists the compounds in order
+    name, utility_id, state   UTF-8 bytes, as wide as the longest value
+
+load_fleet() maps the file with np.memmap and returns an
+exposure_engine.ProfileBatch whose columns are views into the mapping:
+nothing is parsed or copied, and pages are read from disk (or the page
+cache, on later runs) as scoring touches them. Text columns are decoded
+only for the utilities that are materialized as profiles.
+
+Fleet mode reads .npy input like any other fleet file (--input
+fleet.npy), and "score" runs the vectorized engine straight off the
+mapping.
+
+Usage:
+    python fleet_binary.py convert fleet.csv fleet.npy
+    python fleet_binary.py score fleet.npy --technology ro --output scores.csv
+    python utility_exposure_calculator.py --input fleet.npy --output reports.jsonl
+
+    batch = load_fleet("fleet.npy")
+    for technology in ("gac", "ix", "ro"):
+        totals = batch.score(technology=technology)["total_mid"]
+
+Requirements:
+    pip install numpy
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from exposure_engine import COMPOUNDS, ProfileBatch, profiles_to_arrays
+from utility_exposure_calculator import UtilityProfile
+
+# Profiles converted per chunk
+CONVERT_CHUNK_ROWS = 65_536
+
+TEXT_FIELDS = ("name", "utility_id", "state")
+
+NPY_MAGIC = b"\x93NUMPY"
+
+
+def fleet_dtype(
+    compounds: Sequence[str] = COMPOUNDS,
+    widths: Optional[Dict[str, int]] = None,
+) -> np.dtype:
+    """Record layout of a binary fleet file (widths: text field -> bytes)."""
+    widths = widths or {}
+    return np.dtype([
+        ("population_served", "<i8"),
+        ("daily_flow_mgd", "<f8"),
+        ("years_of_exposure", "<i8"),
+        ((",".join(compounds), "concentrations"), "<f8", (len(compounds),)),
+        *[(field, f"S{max(1, widths.get(field, 1))}") for field in TEXT_FIELDS],
+    ])
+
+
+def file_compounds(records: np.ndarray) -> List[str]:
+    """Compound order of a binary fleet file's concentration columns."""
+    title = records.dtype.fields["concentrations"][2]
+    return title.split(",") if title else []
+
+
+class TextColumn:
+    """Read-only sequence of str over a fixed-width bytes column, decoded on access."""
+    __slots__ = ("values",)
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        value = self.values[i].decode("utf-8")
+        return value or None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CONVERSION
+# ─────────────────────────────────────────────────────────────────────────────
+
+def convert_fleet(
+    input_path: Path,
+    output_path: Path,
+    compounds: Sequence[str] = COMPOUNDS,
+    chunk_rows: int = CONVERT_CHUNK_ROWS,
+) -> int:
+    """
+    Convert a CSV or Parquet fleet file to a binary fleet file. Returns
+    the number of utilities.
+
+    Reads the input twice (once to size the file and its text fields,
+    once to fill it), so memory stays at one chunk of profiles.
+    """
+    from fleet import read_fleet
+
+    count = 0
+    widths = dict.fromkeys(TEXT_FIELDS, 1)
+    for profile in read_fleet(input_path):
+        count += 1
+        for field in TEXT_FIELDS:
+            value = getattr(profile, field)
+            if value:
+                widths[field] = max(widths[field], len(value.encode("utf-8")))
+
+    records = np.lib.format.open_memmap(
+        output_path, mode="w+", dtype=fleet_dtype(compounds, widths), shape=(count,)
+    )
+    profiles = iter(read_fleet(input_path))
+    start = 0
+    while True:
+        chunk: List[UtilityProfile] = list(itertools.islice(profiles, chunk_rows))
+        if not chunk:
+            break
+        view = records[start:start + len(chunk)]
+        for column, values in profiles_to_arrays(chunk, compounds).items():
+            view[column] = values
+        for field in TEXT_FIELDS:
+            view[field] = [(getattr(profile, field) or "").encode("utf-8") for profile in chunk]
+        start += len(chunk)
+    if start != count:
+        raise ValueError(f"{input_path} changed while it was being converted")
+    records.flush()
+    del records
+    return count
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOADING
+# ─────────────────────────────────────────────────────────────────────────────
+
+def open_records(path: Path, mmap: bool = True) -> np.ndarray:
+    """The records of a binary fleet file, memory-mapped read-only (or read into memory)."""
+    with open(path, "rb") as handle:
+        if handle.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError(f"{path}: not a .npy file (convert it with: fleet_binary.py convert)")
+    records = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+    if records.dtype.names is None or "concentrations" not in records.dtype.names:
+        raise ValueError(f"{path}: not a binary fleet file (no concentrations field)")
+    return records
+
+
+def load_fleet(path: Path, mmap: bool = True) -> ProfileBatch:
+    """
+    A binary fleet file as a ProfileBatch whose numeric columns are views
+    of the (memory-mapped) records.
+    """
+    records = open_records(path, mmap)
+    compounds = file_compounds(records)
+    if len(compounds) != records.dtype.fields["concentrations"][0].shape[0]:
+        raise ValueError(f"{path}: concentration columns don't match the compounds in the file header")
+    return ProfileBatch(
+        population_served=records["population_served"],
+        daily_flow_mgd=records["daily_flow_mgd"],
+        years_of_exposure=records["years_of_exposure"],
+        concentrations=records["concentrations"],
+        names=TextColumn(records["name"]),
+        utility_ids=TextColumn(records["utility_id"]),
+        states=TextColumn(records["state"]),
+        compounds=tuple(compounds),
+    )
+
+
+def read_fleet_binary(path: Path) -> Iterator[UtilityProfile]:
+    """Stream UtilityProfile objects from a binary fleet file (fleet.read_fleet for .npy)."""
+    yield from load_fleet(path)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def score_rows(batch: ProfileBatch, scores: Dict[str, np.ndarray]) -> Iterator[Dict[str, object]]:
+    """One flat row per utility of ProfileBatch.score output."""
+    columns = [name for name in scores if scores[name].ndim == 1]
+    for i in range(len(batch)):
+        row = {"utility_id": batch.utility_ids[i], "state": batch.states[i]}
+        row.update((name, scores[name][i].item()) for name in columns)
+        yield row
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="Convert a CSV or Parquet fleet file to .npy")
+    convert.add_argument("input", type=Path)
+    convert.add_argument("output", type=Path)
+
+    score = commands.add_parser("score", help="Score a .npy fleet with the vectorized engine")
+    score.add_argument("input", type=Path)
+    score.add_argument("--technology", default="gac", help="Treatment technology (default: gac)")
+    score.add_argument("--horizon", type=int, default=20, help="Treatment cost horizon in years (default: 20)")
+    score.add_argument("--violation-days", type=int, default=365, help="Days of MCL violation (default: 365)")
+    score.add_argument("--discount-rate", type=float, help="Discount treatment costs to NPV at this rate")
+    score.add_argument("--escalation", type=float, default=0.0, help="Annual cost escalation (default: 0)")
+    score.add_argument("--output", default="-", help="Output file (default: stdout)")
+    score.add_argument("--format", choices=["jsonl", "csv", "arrow"],
+                       help="Output format (default: from --output extension, else jsonl)")
+    args = parser.parse_args(argv)
+
+    try:
+        start = time.perf_counter()
+        if args.command == "convert":
+            count = convert_fleet(args.input, args.output)
+            print(f"{count:,} utilities -> {args.output} ({args.output.stat().st_size / 1e6:.1f} MB) "
+                  f"in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+            return
+        from fleet import write_rows
+        batch = load_fleet(args.input)
+        scores = batch.score(
+            technology=args.technology,
+            treatment_years=args.horizon,
+            violation_days=args.violation_days,
+            discount_rate=args.discount_rate,
+            escalation_rate=args.escalation,
+        )
+        scored = time.perf_counter() - start
+        write_rows(score_rows(batch, scores), args.output, args.format)
+    except (OSError, ValueError, KeyError, ImportError) as exc:
+        print(f"Error: {exc}")
+        return
+    print(f"Scored {len(batch):,} utilities in {scored:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
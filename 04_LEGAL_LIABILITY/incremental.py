@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Incremental re-scoring for streaming lab results
+
+Keeps a report per utility and updates it in place when a single sample
+result arrives, instead of regenerating every report:
+
+    fleet = IncrementalFleet(read_fleet("fleet.csv"))
+    fleet.subscribe(lambda change: print(change.key, change.sections))
+    fleet.update_result("PWS0000042", "PFOA", 6.3)
+
+Each utility carries its violation count (updated as a delta) and summed
+exceedance factor. An update replaces one PFASResult and recomputes only
+the report sections it can affect:
+
+    pfas_levels            always (the changed compound's entry)
+    hazard_index           when the compound is a Hazard Index component
+    regulatory_penalties   when the compound or the Hazard Index violates
+                           before or after
+    litigation_exposure    when compliance or the summed exceedance changes
+    treatment_costs        only with the breakthrough O&M model, when the
+                           compound has an MCL (media life depends on it)
+    total_exposure         when any of the above changed
+
+The summed exceedance is re-added over the utility's own results rather
+than adjusted by the difference, so an updated report is identical to
+generate_liability_report on the updated profile (floating-point deltas
+would drift). Work per update is bounded by the number of compounds one
+utility reports, independent of fleet size.
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utility_exposure_calculator import (
+    EPA_LIMITS,
+    HAZARD_INDEX_HBWC,
+    HAZARD_INDEX_MCL,
+    PFASResult,
+    UtilityProfile,
+    calculate_regulatory_penalties,
+    calculate_treatment_costs,
+    generate_liability_report,
+    hazard_index_section,
+    litigation_from_exceedance,
+    pfas_level,
+)
+
+
+# Litigation section of a utility in compliance (as calculate_litigation_exposure)
+COMPLIANT_LITIGATION = {
+    "low": 0,
+    "mid": 0,
+    "high": 0,
+    "note": "In compliance - reduced litigation risk",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ReportChange:
+    """Change event emitted after every update_result call."""
+    key: str  # utility_id, or name for utilities without one
+    compound: str
+    previous_ppt: float  # 0 = not detected
+    concentration_ppt: float
+    sections: Tuple[str, ...]  # report sections that were recomputed
+    previous_total: Dict[str, float]
+    report: Dict[str, Any]
+
+    @property
+    def compliance_changed(self) -> bool:
+        return "compliance_status" in self.sections
+
+
+class _UtilityState:
+    """Mutable per-utility scoring state."""
+    __slots__ = ("profile", "index", "violations", "total_exceedance", "hazard_index", "report")
+
+    def __init__(self, profile: UtilityProfile, report: Dict[str, Any]):
+        self.profile = profile
+        # compound -> position in profile.pfas_results
+        self.index = {}
+        for i, result in enumerate(profile.pfas_results):
+            if result.compound in self.index:
+                raise ValueError(f"{profile.name}: duplicate result for {result.compound}")
+            self.index[result.compound] = i
+        self.violations = sum(r.exceeds_mcl for r in profile.pfas_results)
+        self.total_exceedance = profile.total_exceedance_factor
+        self.hazard_index = report["hazard_index"]["value"]
+        self.report = report
+
+    @property
+    def in_compliance(self) -> bool:
+        return self.violations == 0 and self.hazard_index <= HAZARD_INDEX_MCL
+
+
+class IncrementalFleet:
+    """
+    A fleet of live reports that can be updated one sample at a time.
+
+    report_options are passed to generate_liability_report (technology,
+    years, violation_days, discount_rate, escalation_rate, om_model).
+    """
+
+    def __init__(
+        self,
+        profiles: Iterable[UtilityProfile],
+        report_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.report_options = dict(report_options or {})
+        self.violation_days = self.report_options.get("violation_days", 365)
+        # calculate_treatment_costs arguments, when treatment depends on the levels
+        self.treatment_options = None
+        if self.report_options.get("om_model", "flat") != "flat":
+            self.treatment_options = {
+                name: self.report_options[name]
+                for name in ("technology", "years", "discount_rate", "escalation_rate", "om_model")
+                if name in self.report_options
+            }
+        self._listeners: List[Callable[[ReportChange], None]] = []
+        self._states: Dict[str, _UtilityState] = {}
+        for profile in profiles:
+            self.add(profile)
+
+    @staticmethod
+    def key(profile: UtilityProfile) -> str:
+        return profile.utility_id or profile.name
+
+    def add(self, profile: UtilityProfile) -> Dict[str, Any]:
+        """Score a new utility in full and start tracking it."""
+        key = self.key(profile)
+        if key in self._states:
+            raise ValueError(f"Duplicate utility '{key}'")
+        report = generate_liability_report(profile, **self.report_options)
+        self._states[key] = _UtilityState(profile, report)
+        return report
+
+    # ── Events ───────────────────────────────────────────────────────────────
+
+    def subscribe(self, listener: Callable[[ReportChange], None]) -> Callable[[], None]:
+        """Call listener with every ReportChange; returns an unsubscribe function."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+
+    def update_result(
+        self,
+        utility_id: str,
+        compound: str,
+        concentration_ppt: float,
+        sampled_at: Optional[str] = None,
+    ) -> ReportChange:
+        """
+        Record a new result for one compound at one utility.
+
+        A concentration of 0 (or less) means "not detected" and removes the
+        compound from the profile. sampled_at stamps the report (default:
+        now). Raises KeyError for an unknown utility.
+        """
+        try:
+            state = self._states[utility_id]
+        except KeyError:
+            raise KeyError(f"Unknown utility '{utility_id}'") from None
+        profile = state.profile
+        report = state.report
+        results = profile.pfas_results
+
+        position = state.index.get(compound)
+        old = results[position] if position is not None else None
+        new = PFASResult(compound, float(concentration_ppt)) if concentration_ppt > 0 else None
+        previous_total = dict(report["total_exposure"])
+
+        # Profile and pfas_levels, keeping the original compound order
+        if new is None and old is None:
+            sections = []
+        elif new is None:
+            del results[position]
+            del report["pfas_levels"][position]
+            state.index = {r.compound: i for i, r in enumerate(results)}
+            sections = ["pfas_levels"]
+        elif old is None:
+            state.index[compound] = len(results)
+            results.append(new)
+            report["pfas_levels"].append(pfas_level(new))
+            sections = ["pfas_levels"]
+        else:
+            results[position] = new
+            report["pfas_levels"][position] = pfas_level(new)
+            sections = ["pfas_levels"]
+
+        was_compliant = state.in_compliance
+        state.violations += (new is not None and new.exceeds_mcl) - (old is not None and old.exceeds_mcl)
+        previous_exceedance = state.total_exceedance
+        state.total_exceedance = sum(r.exceedance_factor for r in results)
+        previous_index = state.hazard_index
+        if sections and compound in HAZARD_INDEX_HBWC:
+            report["hazard_index"] = hazard_index_section(profile)
+            state.hazard_index = report["hazard_index"]["value"]
+            sections.append("hazard_index")
+        in_compliance = state.in_compliance
+
+        if in_compliance != was_compliant:
+            report["compliance_status"] = in_compliance
+            sections.append("compliance_status")
+
+        if (
+            (old is not None and old.exceeds_mcl)
+            or (new is not None and new.exceeds_mcl)
+            or (
+                state.hazard_index != previous_index
+                and max(state.hazard_index, previous_index) > HAZARD_INDEX_MCL
+            )
+        ):
+            days = profile.violation_days if profile.violation_days is not None else self.violation_days
+            report["regulatory_penalties"] = calculate_regulatory_penalties(profile, days)
+            sections.append("regulatory_penalties")
+
+        if in_compliance != was_compliant or (
+            not in_compliance and state.total_exceedance != previous_exceedance
+        ):
+            report["litigation_exposure"] = (
+                dict(COMPLIANT_LITIGATION) if in_compliance else litigation_from_exceedance(
+                    profile.population_served, profile.years_of_exposure, state.total_exceedance
+                )
+            )
+            sections.append("litigation_exposure")
+
+        if self.treatment_options is not None and sections and compound in EPA_LIMITS:
+            report["treatment_costs"] = calculate_treatment_costs(profile, **self.treatment_options)
+            sections.append("treatment_costs")
+
+        if any(section in sections for section in ("regulatory_penalties", "litigation_exposure", "treatment_costs")):
+            regulatory = report["regulatory_penalties"]["total"]
+            litigation = report["litigation_exposure"]
+            treatment = report["treatment_costs"]["total"]
+            report["total_exposure"] = {
+                "low": regulatory + litigation["low"] + treatment,
+                "mid": regulatory + litigation["mid"] + treatment,
+                "high": regulatory + litigation["high"] + treatment,
+            }
+            sections.append("total_exposure")
+
+        report["report_generated"] = sampled_at or datetime.now().isoformat()
+        change = ReportChange(
+            key=utility_id,
+            compound=compound,
+            previous_ppt=old.concentration_ppt if old is not None else 0.0,
+            concentration_ppt=new.concentration_ppt if new is not None else 0.0,
+            sections=tuple(sections),
+            previous_total=previous_total,
+            report=report,
+        )
+        for listener in list(self._listeners):
+            listener(change)
+        return change
+
+    def apply(self, updates: Iterable[Tuple[str, str, float]]) -> List[ReportChange]:
+        """Apply (utility_id, compound, ppt) updates in order."""
+        return [self.update_result(*update) for update in updates]
+
+    # ── Access ───────────────────────────────────────────────────────────────
+
+    def report(self, utility_id: str) -> Dict[str, Any]:
+        """Current report of one utility (updated in place; copy to keep a snapshot)."""
+        return self._states[utility_id].report
+
+    def profile(self, utility_id: str) -> UtilityProfile:
+        return self._states[utility_id].profile
+
+    def reports(self) -> Iterator[Dict[str, Any]]:
+        return (state.report for state in self._states.values())
+
+    def __contains__(self, utility_id: object) -> bool:
+        return utility_id in self._states
+
+    def __len__(self) -> int:
+        return len(self._states)
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Stage timings and profiling hooks for the liability report pipeline
+
+When a fleet run is slow, this tells whether the time goes to penalties,
+litigation, treatment or serializing the output. Inside instrumented(),
+the pipeline functions are swapped for timing wrappers that count calls
+and bucket each call's latency into a power-of-two histogram:
+
+    penalties   calculate_regulatory_penalties
+    litigation  calculate_litigation_exposure
+    treatment   calculate_treatment_costs
+    report      generate_liability_report (includes the three above)
+    output      jsonl_line / flatten_report (fleet), format_json /
+                print_report (single report)
+
+Outside it the original functions are back in place, so an
+uninstrumented run costs nothing at all. Fleet worker pools started
+inside it (--workers N) install the same wrappers in each worker, and
+every chunk a worker scores comes back with its stage stats, which are
+merged in when the block ends: totals then add up time across workers.
+
+profiling() adds a whole-run profile, chosen by the file extension:
+
+    .collapsed, .folded   sampled stacks, one "frame;frame;... count" line
+                          per distinct stack (flamegraph.pl, speedscope)
+    anything else         cProfile statistics (python -m pstats, snakeviz)
+
+Usage:
+    python utility_exposure_calculator.py --input fleet.csv --output reports.jsonl --stats
+    python utility_exposure_calculator.py --input fleet.csv --profile run.prof
+    python utility_exposure_calculator.py --input fleet.csv --profile run.collapsed
+    flamegraph.pl run.collapsed > run.svg
+
+    with instrumented() as stats:
+        list(iter_reports(profiles))
+    print(format_stage_stats(stats))
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Stage -> (module, function) pairs timed under that stage name
+STAGES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "penalties": (("utility_exposure_calculator", "calculate_regulatory_penalties"),),
+    "litigation": (("utility_exposure_calculator", "calculate_litigation_exposure"),),
+    "treatment": (("utility_exposure_calculator", "calculate_treatment_costs"),),
+    "report": (("utility_exposure_calculator", "generate_liability_report"),),
+    "output": (
+        ("report_output", "jsonl_line"),
+        ("report_output", "flatten_report"),
+        ("utility_exposure_calculator", "format_json"),
+        ("utility_exposure_calculator", "print_report"),
+    ),
+}
+
+# Histogram buckets: bucket b holds latencies of 2**(b-1) to 2**b - 1 ns
+HISTOGRAM_BUCKETS = 48
+
+# Interval between stack samples for .collapsed profiles
+SAMPLE_INTERVAL = 0.001
+
+COLLAPSED_SUFFIXES = (".collapsed", ".folded")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STAGE STATISTICS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class StageStats:
+    """Call count, total time and a log2 latency histogram for one stage."""
+    __slots__ = ("calls", "total_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def record(self, ns: int) -> None:
+        self.calls += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[min(ns.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, q: float) -> int:
+        """Upper bound (ns) of the bucket holding the q-th percentile call."""
+        rank = max(1, -(-self.calls * q // 100))
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min((1 << bucket) - 1, self.max_ns)
+        return self.max_ns
+
+    def snapshot(self) -> Dict[str, Any]:
+        us = lambda ns: round(ns / 1000, 3)  # noqa: E731
+        return {
+            "calls": self.calls,
+            "total_s": round(self.total_ns / 1e9, 6),
+            "mean_us": us(self.total_ns / self.calls) if self.calls else 0.0,
+            "p50_us": us(self.percentile(50)),
+            "p90_us": us(self.percentile(90)),
+            "p99_us": us(self.percentile(99)),
+            "max_us": us(self.max_ns),
+            # Upper bound in ns -> calls, non-empty buckets only
+            "histogram_ns": {(1 << b) - 1: n for b, n in enumerate(self.buckets) if n},
+        }
+
+    def merge(self, other: "StageStats") -> None:
+        """Add other's calls (e.g. a pool worker's) to these."""
+        self.calls += other.calls
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def reset(self) -> None:
+        self.calls = self.total_ns = self.max_ns = 0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+
+# Timing wrapper -> wrapped function, for every wrapper installed (forked
+# pool workers inherit the parent's and must not time calls twice)
+_ORIGINALS: Dict[Callable, Callable] = {}
+
+# Stage stats of this pool worker (set by _worker_init)
+_worker_stats: Optional[Dict[str, StageStats]] = None
+
+
+def _timed(function: Callable, stats: StageStats) -> Callable:
+    perf_counter_ns = time.perf_counter_ns
+    record = stats.record
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(perf_counter_ns() - start)
+
+    _ORIGINALS[wrapper] = function
+    return wrapper
+
+
+class _TimedPool(ProcessPoolExecutor):
+    """
+    Process pool whose workers time the stages too (see instrumented).
+
+    Each task returns its result with the worker's stage stats for it;
+    the stats are set aside in collected and the caller gets the plain
+    result.
+    """
+
+    def __init__(self, collected: List[Dict[str, StageStats]], max_workers: Optional[int] = None,
+                 mp_context: Any = None, initializer: Optional[Callable] = None, initargs: Tuple = (),
+                 **kwargs):
+        super().__init__(max_workers, mp_context, _worker_init, (initializer, initargs), **kwargs)
+        self.collected = collected
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        outer: Future = Future()
+        outer.set_running_or_notify_cancel()
+
+        def unpack(inner: Future) -> None:
+            try:
+                result, worker_stats = inner.result()
+            except BaseException as error:  # including CancelledError
+                outer.set_exception(error)
+                return
+            self.collected.append(worker_stats)
+            outer.set_result(result)
+
+        super().submit(_timed_task, fn, *args, **kwargs).add_done_callback(unpack)
+        return outer
+
+
+def _worker_init(initializer: Optional[Callable], initargs: Tuple) -> None:
+    """Pool initializer: time the stages in this worker for the rest of its life."""
+    global _worker_stats
+    _worker_stats = {stage: StageStats() for stage in STAGES}
+    _install(_worker_stats)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _timed_task(fn: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, StageStats]]:
+    """Pool task: fn's result and this worker's stage stats for the call."""
+    for stage_stats in _worker_stats.values():
+        stage_stats.reset()
+    return fn(*args, **kwargs), _worker_stats
+
+
+def _install(stats: Dict[str, StageStats]) -> Callable[[], None]:
+    """Swap timing wrappers recording into stats in; returns the function that swaps them out."""
+    import fleet
+    import utility_exposure_calculator  # noqa: F401  (STAGES modules must be loaded)
+
+    modules = [module for module in list(sys.modules.values()) if module is not None]
+    patched: List[Tuple[Any, str, Any]] = []
+    wrappers = {}
+    for stage, functions in STAGES.items():
+        for module_name, name in functions:
+            # The calculator run as a script is also loaded as __main__
+            source = getattr(sys.modules[module_name], "__file__", None)
+            for module in modules:
+                if getattr(module, "__name__", None) == module_name or (
+                    source and getattr(module, "__file__", None) == source
+                ):
+                    original = getattr(module, name)
+                    original = _ORIGINALS.get(original, original)
+                    wrappers[original] = _timed(original, stats[stage])
+
+    writers = dict(fleet.WRITERS)
+
+    def restore() -> None:
+        for module, name, value in reversed(patched):
+            setattr(module, name, value)
+        fleet.WRITERS.update(writers)
+        for wrapper in wrappers.values():
+            _ORIGINALS.pop(wrapper, None)
+
+    try:
+        for module in modules:
+            namespace = getattr(module, "__dict__", {})
+            for name, value in list(namespace.items()):
+                try:
+                    wrapper = wrappers.get(_ORIGINALS.get(value, value))
+                except TypeError:  # unhashable attribute
+                    continue
+                if wrapper is not None:
+                    patched.append((module, name, value))
+                    setattr(module, name, wrapper)
+        fleet.WRITERS.update({
+            fmt: (wrappers.get(_ORIGINALS.get(render, render), render), writer)
+            for fmt, (render, writer) in writers.items()
+        })
+    except BaseException:
+        restore()
+        raise
+    return restore
+
+
+@contextlib.contextmanager
+def instrumented() -> Iterator[Dict[str, StageStats]]:
+    """
+    Time every STAGES function while the block runs; yields stage -> StageStats.
+
+    Each function is replaced wherever a loaded module holds it under its
+    name (e.g. fleet's own generate_liability_report import), as are the
+    renderers in fleet.WRITERS, and fleet's process pools time their
+    workers. Worker stats are merged in and everything is restored on exit.
+    """
+    import fleet
+
+    stats = {stage: StageStats() for stage in STAGES}
+    collected: List[Dict[str, StageStats]] = []
+    pool = fleet.ProcessPoolExecutor
+    restore = _install(stats)
+    try:
+        fleet.ProcessPoolExecutor = functools.partial(_TimedPool, collected)
+        yield stats
+    finally:
+        fleet.ProcessPoolExecutor = pool
+        restore()
+        for worker_stats in collected:
+            for stage, stage_stats in worker_stats.items():
+                stats[stage].merge(stage_stats)
+
+
+def format_stage_stats(stats: Dict[str, StageStats], histograms: bool = True) -> str:
+    """Stage table (calls, total, mean and percentile latencies), then each stage's histogram."""
+    lines = [
+        f"{'Stage':<12}{'Calls':>10}{'Total s':>10}{'Mean µs':>10}"
+        f"{'p50 µs':>10}{'p90 µs':>10}{'p99 µs':>10}{'Max µs':>10}"
+    ]
+    for stage, stage_stats in stats.items():
+        s = stage_stats.snapshot()
+        lines.append(
+            f"{stage:<12}{s['calls']:>10,}{s['total_s']:>10.3f}{s['mean_us']:>10.1f}"
+            f"{s['p50_us']:>10.1f}{s['p90_us']:>10.1f}{s['p99_us']:>10.1f}{s['max_us']:>10.1f}"
+        )
+    if "report" in stats:
+        lines.append("(report includes penalties, litigation and treatment)")
+    if histograms:
+        for stage, stage_stats in stats.items():
+            if not stage_stats.calls:
+                continue
+            lines.append(f"\n{stage} latency")
+            peak = max(stage_stats.buckets)
+            for bucket, count in enumerate(stage_stats.buckets):
+                if count:
+                    bar = "#" * max(1, round(40 * count / peak))
+                    lines.append(f"  < {(1 << bucket) / 1000:>10,.1f} µs {count:>10,}  {bar}")
+    return "\n".join(lines)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PROFILES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's call stack every interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        labels = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path) -> int:
+        """Write "stack count" lines; returns the number of samples."""
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in sorted(self.stacks.items()):
+                handle.write(f"{stack} {count}\n")
+        return sum(self.stacks.values())
+
+
+@contextlib.contextmanager
+def profiling(path: Optional[Path]) -> Iterator[None]:
+    """Profile the block into path (collapsed stacks or pstats, by extension); no-op for None."""
+    if path is None:
+        yield
+        return
+    path = Path(path)
+    if path.suffix.lower() in COLLAPSED_SUFFIXES:
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            samples = sampler.write(path)
+            print(f"Profile: {samples:,} stack samples -> {path}", file=sys.stderr)
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"Profile: cProfile stats -> {path} (python -m pstats {path})", file=sys.stderr)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo uncertainty mode for the PFAS Liability Exposure Calculator
+
+The point model uses fixed low/mid/high per-capita liabilities, a fixed
+80% affected-population share and fixed 0.1/0.05 exceedance/duration
+coefficients. Here those parameters (plus the number of violation days)
+are sampled from configurable distributions and each utility gets
+percentiles of its regulatory, litigation and total exposure.
+
+Per draw, for a utility that is out of compliance:
+
+    litigation = population × share × per_capita × exceedance_mult × duration_mult
+    regulatory = violating compounds × EPA_PENALTY_RATE × violation_days
+    total      = regulatory + litigation + treatment (deterministic)
+
+with the same 3.0 / 2.0 caps on the multipliers as the point model. The
+affected population is not truncated to whole people, and a single
+per-capita draw replaces the separate low/mid/high estimates.
+
+Every utility sees the same parameter draws, so results are correlated
+across the fleet and independent of how utilities are split across
+worker processes. Draws are generated once; utilities are evaluated in
+blocks sized to a memory budget and draws in fixed-size chunks, so
+1M draws × 10k utilities runs in bounded memory.
+
+Distribution config (JSON, overrides the defaults per parameter):
+    {
+        "affected_share": ["triangular", 0.6, 0.8, 1.0],
+        "per_capita_liability": ["lognormal", 3.9, 0.4],
+        "violation_days": ["fixed", 365]
+    }
+
+Supported distributions: fixed(value), uniform(low, high),
+triangular(left, mode, right), normal(mean, sd), lognormal(mu, sigma).
+
+Requirements:
+    pip install numpy
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from exposure_engine import COMPOUNDS, mcl_violations, profiles_to_arrays, treatment_costs
+from utility_exposure_calculator import EPA_PENALTY_RATE, PER_CAPITA_LIABILITY, UtilityProfile
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PARAMETER DISTRIBUTIONS
+# ─────────────────────────────────────────────────────────────────────────────
+
+DEFAULT_DISTRIBUTIONS = {
+    "per_capita_liability": (
+        "triangular",
+        PER_CAPITA_LIABILITY["low"],
+        PER_CAPITA_LIABILITY["mid"],
+        PER_CAPITA_LIABILITY["high"],
+    ),
+    "affected_share": ("triangular", 0.6, 0.8, 1.0),
+    "exceedance_coefficient": ("triangular", 0.05, 0.1, 0.15),
+    "duration_coefficient": ("triangular", 0.025, 0.05, 0.075),
+    "violation_days": ("uniform", 180, 365),
+}
+
+# Number of parameters each distribution takes
+DISTRIBUTION_ARITY = {
+    "fixed": 1,
+    "uniform": 2,
+    "triangular": 3,
+    "normal": 2,
+    "lognormal": 2,
+}
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+# Draws evaluated per vectorized step, and per-block buffer budget
+DRAW_CHUNK = 65536
+MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+
+
+def load_distributions(path: Optional[Path] = None) -> Dict[str, tuple]:
+    """Default distributions, overridden by a JSON config file if given."""
+    distributions = dict(DEFAULT_DISTRIBUTIONS)
+    if path is None:
+        return distributions
+
+    with open(path) as handle:
+        overrides = json.load(handle)
+    for name, spec in overrides.items():
+        if name not in DEFAULT_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown Monte Carlo parameter '{name}' "
+                f"(choose from: {', '.join(DEFAULT_DISTRIBUTIONS)})"
+            )
+        kind, *params = spec
+        if kind not in DISTRIBUTION_ARITY:
+            raise ValueError(
+                f"{name}: unknown distribution '{kind}' "
+                f"(choose from: {', '.join(DISTRIBUTION_ARITY)})"
+            )
+        if len(params) != DISTRIBUTION_ARITY[kind]:
+            raise ValueError(f"{name}: '{kind}' takes {DISTRIBUTION_ARITY[kind]} parameter(s)")
+        distributions[name] = (kind, *(float(p) for p in params))
+    return distributions
+
+
+def _draw(rng: np.random.Generator, spec: tuple, size: int) -> np.ndarray:
+    kind, *params = spec
+    if kind == "fixed":
+        return np.full(size, params[0], dtype=np.float64)
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1], size)
+    if kind == "triangular":
+        left, mode, right = params
+        if left == right:
+            return np.full(size, mode, dtype=np.float64)
+        return rng.triangular(left, mode, right, size)
+    if kind == "normal":
+        return rng.normal(params[0], params[1], size)
+    if kind == "lognormal":
+        return rng.lognormal(params[0], params[1], size)
+    raise ValueError(f"Unknown distribution '{kind}'")
+
+
+def sample_parameters(
+    draws: int,
+    distributions: Optional[Dict[str, tuple]] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Sample every model parameter `draws` times.
+
+    Each parameter has its own child seed, so overriding one distribution
+    does not change the draws of the others.
+    """
+    distributions = distributions or DEFAULT_DISTRIBUTIONS
+    children = np.random.SeedSequence(seed).spawn(len(DEFAULT_DISTRIBUTIONS))
+    samples = {}
+    for child, name in zip(children, DEFAULT_DISTRIBUTIONS):
+        samples[name] = _draw(np.random.default_rng(child), distributions[name], draws)
+
+    # Keep physically meaningful ranges whatever the configured tails
+    np.clip(samples["affected_share"], 0.0, 1.0, out=samples["affected_share"])
+    for name in ("per_capita_liability", "exceedance_coefficient", "duration_coefficient", "violation_days"):
+        np.maximum(samples[name], 0.0, out=samples[name])
+    return samples
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SIMULATION
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Per-process copy of the parameter draws (set by the pool initializer)
+_WORKER_SAMPLES: Dict[str, np.ndarray] = {}
+
+
+def _init_worker(samples: Dict[str, np.ndarray]) -> None:
+    global _WORKER_SAMPLES
+    _WORKER_SAMPLES = samples
+
+
+def _simulate_block(
+    block: Dict[str, np.ndarray],
+    percentiles: Sequence[float],
+    samples: Optional[Dict[str, np.ndarray]] = None,
+    draw_chunk: int = DRAW_CHUNK,
+) -> Dict[str, np.ndarray]:
+    """
+    Litigation and total exposure percentiles for one block of utilities.
+
+    Every utility in the block must be out of compliance.
+    """
+    samples = samples if samples is not None else _WORKER_SAMPLES
+    draws = len(samples["affected_share"])
+    n = len(block["population_served"])
+
+    population = block["population_served"].astype(np.float64)[:, None]
+    exceedance = block["total_exceedance"][:, None]
+    years = block["years_of_exposure"].astype(np.float64)[:, None]
+    violations = block["violations"].astype(np.float64)[:, None]
+
+    litigation = np.empty((n, draws))
+    total = np.empty((n, draws))
+    for start in range(0, draws, draw_chunk):
+        stop = min(start + draw_chunk, draws)
+        share = samples["affected_share"][start:stop]
+        per_capita = samples["per_capita_liability"][start:stop]
+        exceedance_mult = np.minimum(1 + exceedance * samples["exceedance_coefficient"][start:stop], 3.0)
+        duration_mult = np.minimum(1 + years * samples["duration_coefficient"][start:stop], 2.0)
+
+        chunk = litigation[:, start:stop]
+        np.multiply(population, share * per_capita, out=chunk)
+        chunk *= exceedance_mult
+        chunk *= duration_mult
+
+        np.multiply(violations, EPA_PENALTY_RATE * samples["violation_days"][start:stop], out=total[:, start:stop])
+        total[:, start:stop] += chunk
+
+    total += block["treatment_total"][:, None]
+    # The buffers are scratch space, so let percentile partition them in place
+    return {
+        "litigation": np.percentile(litigation, percentiles, axis=1, overwrite_input=True).T,
+        "total": np.percentile(total, percentiles, axis=1, overwrite_input=True).T,
+    }
+
+
+def simulate_fleet(
+    population_served: np.ndarray,
+    daily_flow_mgd: np.ndarray,
+    years_of_exposure: np.ndarray,
+    concentrations: np.ndarray,
+    draws: int,
+    distributions: Optional[Dict[str, tuple]] = None,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    workers: int = 1,
+    memory_budget: int = MEMORY_BUDGET_BYTES,
+    technology: str = "gac",
+    treatment_years: int = 20,
+    discount_rate: Optional[float] = None,
+    escalation_rate: float = 0.0,
+    compounds: Sequence[str] = COMPOUNDS,
+) -> Dict[str, np.ndarray]:
+    """
+    Exposure percentiles per utility.
+
+    Returns arrays shaped (utilities, len(percentiles)) for "regulatory",
+    "litigation" and "total", plus the "percentiles" themselves.
+    """
+    if draws < 1:
+        raise ValueError("Monte Carlo needs at least one draw")
+    samples = sample_parameters(draws, distributions, seed)
+
+    violations, total_exceedance, _ = mcl_violations(np.asarray(concentrations, dtype=np.float64), compounds)
+    fleet = {
+        "population_served": np.asarray(population_served),
+        "years_of_exposure": np.asarray(years_of_exposure),
+        "violations": violations,
+        "total_exceedance": total_exceedance,
+        "treatment_total": treatment_costs(
+            np.asarray(daily_flow_mgd, dtype=np.float64),
+            technology, treatment_years, discount_rate, escalation_rate,
+        )["total"],
+    }
+
+    # Regulatory exposure is linear in violation days, so its percentiles
+    # follow directly from the day percentiles without a per-utility buffer
+    day_percentiles = np.percentile(samples["violation_days"], percentiles)
+    regulatory = violations[:, None] * (EPA_PENALTY_RATE * day_percentiles)[None, :]
+
+    # Utilities in compliance have no litigation or penalty exposure, so
+    # their percentiles are known without simulating
+    n = len(violations)
+    exposed = np.flatnonzero(violations > 0)
+    litigation = np.zeros((n, len(percentiles)))
+    total = np.repeat(fleet["treatment_total"][:, None], len(percentiles), axis=1)
+
+    # Two (block × draws) float64 buffers per block
+    block_size = max(1, memory_budget // (2 * 8 * draws))
+    blocks = [
+        {key: values[exposed[start:start + block_size]] for key, values in fleet.items()}
+        for start in range(0, len(exposed), block_size)
+    ]
+
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(samples,)
+        ) as pool:
+            results = list(pool.map(_simulate_block, blocks, [percentiles] * len(blocks)))
+    else:
+        results = [_simulate_block(block, percentiles, samples) for block in blocks]
+
+    if results:
+        litigation[exposed] = np.concatenate([r["litigation"] for r in results])
+        total[exposed] = np.concatenate([r["total"] for r in results])
+
+    return {
+        "percentiles": np.asarray(percentiles, dtype=np.float64),
+        "regulatory": regulatory,
+        "litigation": litigation,
+        "total": total,
+    }
+
+
+def simulate_profiles(profiles: Iterable[UtilityProfile], draws: int, **kwargs) -> Dict[str, np.ndarray]:
+    """Convenience wrapper: columnarize profiles and simulate them."""
+    return simulate_fleet(**profiles_to_arrays(profiles), draws=draws, **kwargs)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# OUTPUT
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _label(percentile: float) -> str:
+    return f"p{percentile:g}"
+
+
+def monte_carlo_rows(
+    profiles: Sequence[UtilityProfile],
+    results: Dict[str, np.ndarray],
+) -> List[Dict[str, Any]]:
+    """One flat row per utility: identity columns plus <metric>_p<q> columns."""
+    labels = [_label(q) for q in results["percentiles"]]
+    rows = []
+    for i, profile in enumerate(profiles):
+        row = {
+            "name": profile.name,
+            "utility_id": profile.utility_id,
+            "state": profile.state,
+        }
+        for metric in ("regulatory", "litigation", "total"):
+            for j, label in enumerate(labels):
+                row[f"{metric}_{label}"] = float(results[metric][i, j])
+        rows.append(row)
+    return rows
+
+
+def print_monte_carlo(row: Dict[str, Any], draws: int, percentiles: Sequence[float]) -> None:
+    """Print the exposure percentiles of a single utility."""
+    from utility_exposure_calculator import format_currency
+
+    labels = [_label(q) for q in percentiles]
+    print("\n" + "="*70)
+    print("   PFAS LIABILITY EXPOSURE - MONTE CARLO")
+    print("="*70)
+    print(f"\nUtility: {row['name']}")
+    print(f"Draws: {draws:,}")
+    print("\n" + "-"*70)
+    print(f"{'Component':<16}" + "".join(f"{label.upper():>14}" for label in labels))
+    print("-"*70)
+    for metric in ("regulatory", "litigation", "total"):
+        values = "".join(f"{format_currency(row[f'{metric}_{label}']):>14}" for label in labels)
+        print(f"{metric.capitalize():<16}{values}")
+    print("\n" + "="*70 + "\n")
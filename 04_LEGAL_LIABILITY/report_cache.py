@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of liability reports
+
+Nightly fleet runs mostly score utilities whose inputs haven't changed.
+This cache stores each report in a SQLite file under a hash of everything
+the report depends on, so an unchanged utility costs one hash and one
+indexed lookup instead of a generate_liability_report call:
+
+    key      sha256 of the UtilityProfile fields (results in order) and
+             the report options (technology, years, violation_days, ...)
+    version  sha256 of the model constants (EPA_LIMITS, EPA_PENALTY_RATE,
+             PER_CAPITA_LIABILITY, the Hazard Index weights), the
+             technology catalog fingerprint (treatment costs) and the
+             calculator and breakthrough model sources
+
+The version is stored in the file; opening a cache with a different
+version drops every entry, so edited constants, a different --cost-table
+or a changed formula never serve stale reports. The file is bounded in
+size: once it grows past max_bytes, the least recently used reports are
+evicted (down to EVICT_TO of the limit).
+
+Reports are stored as the JSON text fleet mode writes, with the
+report_generated value left blank and filled in with the current run's
+timestamp on a hit. A JSONL run copies hits straight to its output:
+decoding a report costs about as much as generating it. Recency is kept
+in a narrow table of its own so LRU updates don't rewrite reports.
+
+Usage:
+    python utility_exposure_calculator.py --input fleet.csv --output reports.jsonl \\
+        --cache reports.sqlite
+
+    with ReportCache("reports.sqlite") as cache:
+        report = cache.report(profile, technology="ro")
+        print(cache.stats())
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import utility_exposure_calculator as model
+from report_output import dumps, loads
+from technology_catalog import TechnologyCatalog, get_catalog
+from utility_exposure_calculator import UtilityProfile, generate_liability_report
+
+
+DEFAULT_MAX_BYTES = 1 << 30  # 1 GiB of stored reports
+
+# Eviction trims the cache to this fraction of max_bytes, so it doesn't
+# run again on the very next store
+EVICT_TO = 0.9
+
+# Keys per SELECT ... IN (...) lookup (below SQLite's parameter limit)
+LOOKUP_BATCH = 500
+
+# Bump when the cached report layout changes in a way the source hash
+# can't see (e.g. a change in a module other than the calculator)
+CACHE_FORMAT = 2
+
+# Stored in place of the report_generated value, which is set per run
+_GENERATED = '"report_generated":'
+_PLACEHOLDER = _GENERATED + '""'
+
+# reports keeps its rowid: WITHOUT ROWID tables read ~1.5 KB rows about
+# three times slower
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS reports (key BLOB PRIMARY KEY, report TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS usage (
+    key BLOB PRIMARY KEY,
+    used INTEGER NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def model_version(catalog: Optional[TechnologyCatalog] = None) -> str:
+    """Hash of every model input that isn't part of a profile or the options."""
+    catalog = catalog or get_catalog()
+    constants = json.dumps(
+        {
+            "format": CACHE_FORMAT,
+            "epa_limits": model.EPA_LIMITS,
+            "epa_penalty_rate": model.EPA_PENALTY_RATE,
+            "per_capita_liability": model.PER_CAPITA_LIABILITY,
+            "hazard_index_hbwc": model.HAZARD_INDEX_HBWC,
+            "hazard_index_mcl": model.HAZARD_INDEX_MCL,
+            "catalog": catalog.fingerprint,
+        },
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(constants.encode())
+    calculator = Path(model.__file__)
+    for source in (calculator, calculator.with_name("breakthrough_model.py")):
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def profile_key(profile: UtilityProfile, options: Mapping[str, Any]) -> bytes:
+    """
+    Stable 32-byte key of one profile scored with one set of report options.
+
+    Hashes the repr of plain tuples: floats repr as their shortest
+    round-trip form, and 1 and 1.0 stay distinct (as they do in a report).
+    """
+    violation_days = profile.violation_days
+    payload = repr((
+        profile.name,
+        profile.utility_id,
+        profile.state,
+        profile.population_served,
+        profile.daily_flow_mgd,
+        profile.years_of_exposure,
+        [(r.compound, r.concentration_ppt) for r in profile.pfas_results],
+        sorted(violation_days.items()) if violation_days is not None else None,
+        sorted(options.items()),
+    ))
+    return hashlib.sha256(payload.encode()).digest()
+
+
+def report_json(report: Dict[str, Any]) -> str:
+    """A report as fleet mode's JSONL writes it (without the newline)."""
+    return dumps(report)
+
+
+class ReportCache:
+    """
+    SQLite-backed report cache (see module docstring).
+
+    Lookups are immediate; stores and LRU updates are buffered and written
+    in one transaction by flush(), which close() (or leaving a with block)
+    calls.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        version: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.version = version or model_version()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidated = 0
+        self._pending: Dict[bytes, str] = {}  # key -> report text to store
+        self._touched: List[bytes] = []  # keys hit since the last flush
+
+        self._db = sqlite3.connect(self.path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.executescript(SCHEMA)
+            stored = self._meta("version")
+            if stored != self.version:
+                if stored is not None:
+                    self.invalidated = self._db.execute("SELECT COUNT(*) FROM usage").fetchone()[0]
+                self._db.execute("DELETE FROM reports")
+                self._db.execute("DELETE FROM usage")
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+        self._bytes, self._clock = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) FROM usage"
+        ).fetchone()
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    # ── Lookups ──────────────────────────────────────────────────────────────
+
+    key = staticmethod(profile_key)
+
+    @staticmethod
+    def stamp(text: str, generated_at: str) -> str:
+        """Stored report text with report_generated set to generated_at."""
+        # Only the constant disclaimer follows report_generated
+        head, _, tail = text.rpartition(_PLACEHOLDER)
+        return f"{head}{_GENERATED}{json.dumps(generated_at)}{tail}"
+
+    def lookup(self, keys: Sequence[bytes]) -> Dict[bytes, str]:
+        """Stored report texts for keys (see stamp); missing keys are absent."""
+        found = {}
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            found.update(self._db.execute(
+                f"SELECT key, report FROM reports WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            ))
+        self._touched.extend(found)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get_many(self, keys: Sequence[bytes], generated_at: Optional[str] = None) -> Dict[bytes, Dict[str, Any]]:
+        """Reports found for keys, stamped with generated_at (default: now)."""
+        generated_at = generated_at or datetime.now().isoformat()
+        return {key: loads(self.stamp(text, generated_at)) for key, text in self.lookup(keys).items()}
+
+    def get(self, profile: UtilityProfile, generated_at: Optional[str] = None, **options) -> Optional[Dict[str, Any]]:
+        """Cached report for profile and options, or None."""
+        key = profile_key(profile, options)
+        return self.get_many([key], generated_at).get(key)
+
+    def store(self, key: bytes, text: str, generated_at: str) -> None:
+        """Buffer report_json(report) of a report generated at generated_at."""
+        head, _, tail = text.rpartition(_GENERATED + json.dumps(generated_at))
+        self._pending[key] = f"{head}{_PLACEHOLDER}{tail}"
+        self.stores += 1
+
+    def put(self, key: bytes, report: Dict[str, Any]) -> None:
+        """Buffer a report for storage under key."""
+        self.store(key, report_json(report), report["report_generated"])
+
+    def report(self, profile: UtilityProfile, generated_at: Optional[str] = None, **options) -> Dict[str, Any]:
+        """generate_liability_report through the cache."""
+        generated_at = generated_at or datetime.now().isoformat()
+        key = profile_key(profile, options)
+        cached = self.get_many([key], generated_at).get(key)
+        if cached is not None:
+            return cached
+        report = generate_liability_report(profile, generated_at=generated_at, **options)
+        self.put(key, report)
+        return report
+
+    # ── Maintenance ──────────────────────────────────────────────────────────
+
+    def flush(self) -> None:
+        """Write buffered stores and LRU updates, then evict down to max_bytes."""
+        if not self._pending and not self._touched:
+            return
+        self._clock += 1
+        with self._db:
+            if self._touched:
+                self._db.executemany(
+                    "UPDATE usage SET used = ? WHERE key = ?",
+                    [(self._clock, key) for key in self._touched],
+                )
+            if self._pending:
+                keys = list(self._pending)
+                for start in range(0, len(keys), LOOKUP_BATCH):
+                    batch = keys[start:start + LOOKUP_BATCH]
+                    self._bytes -= self._db.execute(
+                        f"SELECT COALESCE(SUM(size), 0) FROM usage WHERE key IN ({','.join('?' * len(batch))})",
+                        batch,
+                    ).fetchone()[0]
+                self._db.executemany("INSERT OR REPLACE INTO reports VALUES (?, ?)", self._pending.items())
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO usage VALUES (?, ?, ?)",
+                    [(key, self._clock, len(text)) for key, text in self._pending.items()],
+                )
+                self._bytes += sum(len(text) for text in self._pending.values())
+            if self._bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * EVICT_TO))
+        self._pending.clear()
+        self._touched.clear()
+
+    def _evict(self, target: int) -> None:
+        victims = []
+        cursor = self._db.execute("SELECT key, size FROM usage ORDER BY used")
+        for key, size in cursor:
+            if self._bytes <= target:
+                break
+            victims.append((key,))
+            self._bytes -= size
+        cursor.close()
+        self._db.executemany("DELETE FROM reports WHERE key = ?", victims)
+        self._db.executemany("DELETE FROM usage WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self) -> None:
+        """Drop every cached report."""
+        self._pending.clear()
+        self._touched.clear()
+        with self._db:
+            self._db.execute("DELETE FROM reports")
+            self._db.execute("DELETE FROM usage")
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        entries = self._db.execute("SELECT COUNT(*) FROM usage").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "invalidated": self.invalidated,
+            "entries": entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "version": self.version[:12],
+        }
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> "ReportCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """One-line summary for the CLI."""
+    return (
+        f"Cache: {stats['hits']:,} hits, {stats['misses']:,} misses ({stats['hit_rate']:.1%}), "
+        f"{stats['entries']:,} entries / {stats['bytes'] / 1e6:,.1f} MB, "
+        f"{stats['evictions']:,} evicted, {stats['invalidated']:,} invalidated"
+    )
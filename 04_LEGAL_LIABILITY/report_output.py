@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Report serialization for fleet output: NDJSON, flat CSV and Arrow
+
+At fleet scale, turning reports into text costs more than computing
+them. This module is the one place reports are serialized:
+
+    jsonl   compact NDJSON, one report per line, written as it is scored
+    csv     one flat row per report (REPORT_COLUMNS)
+    arrow   the same flat rows as an Arrow IPC file, in record batches
+
+JSON is encoded by orjson when it is installed (about five times faster)
+and by the standard library otherwise. Both write compact text with no
+spaces after separators; they differ only in that orjson writes
+non-ASCII characters as UTF-8 where the standard library escapes them.
+Numbers are written as numbers: NumPy scalars become plain ints and
+floats, and anything else that isn't JSON raises TypeError rather than
+being stringified.
+
+The flat schema has the summary fields first (utility, compliance,
+totals), then the treatment cost breakdown, then one concentration and
+one penalty column per compound (empty when not detected / not in
+violation), so every row of every fleet has the same columns.
+
+Usage:
+    python utility_exposure_calculator.py --input fleet.csv --output reports.jsonl
+    python utility_exposure_calculator.py --input fleet.csv --output reports.csv
+    python utility_exposure_calculator.py --input fleet.csv --output reports.arrow
+
+Requirements:
+    pip install orjson pyarrow    # optional: faster JSON, Arrow output
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import csv
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+from utility_exposure_calculator import HAZARD_INDEX, MODEL_COMPOUNDS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+# Reports per Arrow record batch
+ARROW_BATCH_ROWS = 8192
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# JSON
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _number(value: Any) -> Any:
+    """JSON fallback for NumPy scalars (anything with .item()); everything else is an error."""
+    item = getattr(value, "item", None)
+    if item is not None:
+        return item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_compact = json.JSONEncoder(separators=(",", ":"), default=_number).encode
+_indented = json.JSONEncoder(indent=2, default=_number).encode
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """obj as compact JSON text (or indented two spaces)."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_number, option=option).decode()
+    return _indented(obj) if indent else _compact(obj)
+
+
+loads: Callable[[Any], Any] = orjson.loads if orjson is not None else json.loads
+
+
+def jsonl_line(report: Dict[str, Any]) -> str:
+    """One report as an NDJSON line."""
+    return dumps(report) + "\n"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FLAT SCHEMA
+# ─────────────────────────────────────────────────────────────────────────────
+
+def column_key(compound: str) -> str:
+    """Column name prefix of a compound (HFPO-DA -> hfpo_da)."""
+    return compound.lower().replace("-", "_").replace(" ", "_")
+
+
+# (column, type) in output order; type is one of str, int, float, bool
+REPORT_COLUMNS: List[Tuple[str, str]] = [
+    ("name", "str"),
+    ("utility_id", "str"),
+    ("state", "str"),
+    ("population_served", "int"),
+    ("daily_flow_mgd", "float"),
+    ("years_of_exposure", "int"),
+    ("compliance_status", "bool"),
+    ("hazard_index", "float"),
+    ("regulatory_penalties", "float"),
+    ("litigation_low", "float"),
+    ("litigation_mid", "float"),
+    ("litigation_high", "float"),
+    ("treatment_total", "float"),
+    ("total_low", "float"),
+    ("total_mid", "float"),
+    ("total_high", "float"),
+    ("treatment_technology", "str"),
+    ("treatment_capital", "float"),
+    ("treatment_annual_om", "float"),
+    ("treatment_years", "int"),
+    *[(f"{column_key(compound)}_ppt", "float") for compound in MODEL_COMPOUNDS],
+    *[(f"{column_key(compound)}_penalty", "float") for compound in (*MODEL_COMPOUNDS, HAZARD_INDEX)],
+    ("report_generated", "str"),
+]
+
+COLUMN_NAMES = [name for name, _ in REPORT_COLUMNS]
+
+_PPT_COLUMNS = {compound: f"{column_key(compound)}_ppt" for compound in MODEL_COMPOUNDS}
+_PENALTY_COLUMNS = {
+    compound: f"{column_key(compound)}_penalty" for compound in (*MODEL_COMPOUNDS, HAZARD_INDEX)
+}
+
+
+def flatten_report(report: Dict[str, Any]) -> Dict[str, Any]:
+    """A liability report as one REPORT_COLUMNS row (None where a field doesn't apply)."""
+    utility = report["utility"]
+    litigation = report["litigation_exposure"]
+    treatment = report["treatment_costs"]
+    total = report["total_exposure"]
+    penalties = report["regulatory_penalties"]
+    row = dict.fromkeys(COLUMN_NAMES)
+    row.update({
+        "name": utility["name"],
+        "utility_id": utility.get("utility_id"),
+        "state": utility.get("state"),
+        "population_served": utility["population_served"],
+        "daily_flow_mgd": utility["daily_flow_mgd"],
+        "years_of_exposure": utility["years_of_exposure"],
+        "compliance_status": report["compliance_status"],
+        "hazard_index": report["hazard_index"]["value"],
+        "regulatory_penalties": penalties["total"],
+        "litigation_low": litigation["low"],
+        "litigation_mid": litigation["mid"],
+        "litigation_high": litigation["high"],
+        "treatment_total": treatment["total"],
+        "total_low": total["low"],
+        "total_mid": total["mid"],
+        "total_high": total["high"],
+        "treatment_technology": treatment.get("technology"),
+        "treatment_capital": treatment.get("capital"),
+        "treatment_annual_om": treatment.get("annual_om"),
+        "treatment_years": treatment.get("years"),
+        "report_generated": report.get("report_generated"),
+    })
+    for level in report["pfas_levels"]:
+        column = _PPT_COLUMNS.get(level["compound"])
+        if column is not None:
+            row[column] = level["concentration_ppt"]
+    for compound, penalty in penalties["per_compound"].items():
+        column = _PENALTY_COLUMNS.get(compound)
+        if column is not None:
+            row[column] = penalty["annual_penalty"]
+    return row
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WRITERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def write_lines(lines: Iterable[str], handle: TextIO) -> int:
+    """Write pre-serialized NDJSON lines as they arrive. Returns the number of rows written."""
+    count = 0
+    write = handle.write
+    for line in lines:
+        write(line)
+        count += 1
+    return count
+
+
+def write_csv_rows(
+    rows: Iterable[Dict[str, Any]],
+    handle: TextIO,
+    columns: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    Write flat rows as CSV. Columns default to the first row's keys (an
+    empty input then writes nothing). Returns the number of rows written.
+    """
+    writer = None
+    count = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(handle, fieldnames=list(columns or row))
+            writer.writeheader()
+        writer.writerow(row)
+        count += 1
+    if writer is None and columns is not None:
+        csv.DictWriter(handle, fieldnames=list(columns)).writeheader()
+    return count
+
+
+def write_report_rows(rows: Iterable[Dict[str, Any]], handle: TextIO) -> int:
+    """Write flatten_report rows as CSV (header even for an empty fleet)."""
+    return write_csv_rows(rows, handle, COLUMN_NAMES)
+
+
+def arrow_schema(columns: Sequence[Tuple[str, str]] = REPORT_COLUMNS):
+    """pyarrow schema of (column, type) pairs (all columns nullable)."""
+    import pyarrow as pa
+
+    types = {"str": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_()}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def write_arrow_rows(
+    rows: Iterable[Dict[str, Any]],
+    handle: Any,
+    schema: Any = None,
+    batch_rows: int = ARROW_BATCH_ROWS,
+) -> int:
+    """
+    Write flat rows as an Arrow IPC file, batch_rows at a time. handle is a
+    binary file or a text file with a .buffer (e.g. stdout). The schema is
+    inferred from the first batch if not given. Returns the number of rows
+    written.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Arrow output requires pyarrow (pip install pyarrow)") from None
+
+    if hasattr(handle, "buffer"):
+        handle.flush()
+        handle = handle.buffer
+    sink = pa.PythonFile(handle, mode="w")
+    writer = None
+    count = 0
+    batch: List[Dict[str, Any]] = []
+    rows = iter(rows)
+    while True:
+        batch.clear()
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_rows:
+                break
+        if batch:
+            record_batch = pa.RecordBatch.from_pylist(batch, schema=schema)
+            if writer is None:
+                schema = record_batch.schema
+                writer = pa.ipc.new_file(sink, schema)
+            writer.write_batch(record_batch)
+            count += len(batch)
+        if len(batch) < batch_rows:
+            break
+    if writer is None:
+        if schema is None:
+            return 0
+        writer = pa.ipc.new_file(sink, schema)
+    writer.close()
+    sink.flush()
+    return count
+
+
+def write_report_arrow(rows: Iterable[Dict[str, Any]], handle: Any) -> int:
+    """Write flatten_report rows as an Arrow IPC file with the REPORT_COLUMNS schema."""
+    return write_arrow_rows(rows, handle, arrow_schema())
+
+
+# Output format -> (per-report renderer, writer for rendered items).
+# Rendering runs inside fleet's pool workers so only small strings/rows
+# cross the process boundary.
+WRITERS = {
+    "jsonl": (jsonl_line, write_lines),
+    "csv": (flatten_report, write_report_rows),
+    "arrow": (flatten_report, write_report_arrow),
+}
+
+# Output file extension -> format (anything else is jsonl)
+FORMAT_EXTENSIONS = {
+    ".csv": "csv",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
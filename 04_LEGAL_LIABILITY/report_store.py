@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Partitioned Parquet store of fleet reports, with filtered queries
+
+Questions like "every utility with mid exposure over $50M and PFOS above
+3× its MCL" shouldn't mean loading every JSON report. With --store, a
+fleet run writes its reports as flat rows (report_output.REPORT_COLUMNS
+plus one exceedance ratio per MCL compound) to a Hive-partitioned
+Parquet dataset:
+
+    STORE/state=CA/run_date=2026-10-18/part-20261018T161705-0-0.parquet
+
+Each run adds its own files (named after its timestamp), so a store
+keeps every run; report_generated tells same-day runs apart.
+
+Queries only read what they need. Filters on state and run_date skip
+whole directories, filters on other columns skip row groups whose
+min/max statistics can't match, and only the requested columns are
+decoded. Everything is local files; nothing needs a server.
+
+Filters are "COLUMN OP VALUE" with OP one of > >= < <= == != and VALUE a
+number (K/M/B suffixes and a leading $ allowed, an x suffix for ratios)
+or a string; several filters must all hold. Quote filters with single
+quotes in the shell: in double quotes, "$50M" becomes "0M".
+
+Usage:
+    python utility_exposure_calculator.py --input fleet.csv --store reports/
+    python report_store.py reports/ --where 'total_mid > $50M' --where 'pfos_exceedance > 3x'
+    python report_store.py reports/ --state CA,TX --columns name,total_mid --output ca_tx.csv
+    python report_store.py reports/ --where 'total_mid > 50e6' --count --explain
+
+    for row in query_rows("reports", ["total_mid > 50e6"], columns=["name", "total_mid"]):
+        print(row)
+
+Requirements:
+    pip install pyarrow
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import argparse
+import itertools
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from report_output import REPORT_COLUMNS, column_key, flatten_report
+from utility_exposure_calculator import EPA_LIMITS, UtilityProfile
+
+# Partition columns, outermost first
+PARTITIONS = ("state", "run_date")
+
+# Rows converted to Arrow at a time, and rows per dataset write (each
+# write adds one file per partition it touches); the largest row group
+STORE_BATCH_ROWS = 8192
+STORE_CHUNK_ROWS = 262_144
+ROW_GROUP_ROWS = 65_536
+
+
+# MCL compound -> (concentration column, concentration / MCL column);
+# an exceedance of 3.0 is three times the MCL
+EXCEEDANCE_COLUMNS = {
+    compound: (f"{column_key(compound)}_ppt", f"{column_key(compound)}_exceedance") for compound in EPA_LIMITS
+}
+
+STORE_COLUMNS: List[Tuple[str, str]] = [
+    *REPORT_COLUMNS,
+    *[(column, "float") for _, column in EXCEEDANCE_COLUMNS.values()],
+    ("run_date", "str"),
+]
+
+_OPERATORS = (">=", "<=", "==", "!=", ">", "<")
+_FILTER = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(>=|<=|==|!=|>|<|=)\s*(.+?)\s*$")
+_SCALE = {"k": 1e3, "m": 1e6, "b": 1e9}
+
+
+def store_schema():
+    """pyarrow schema of the stored rows (partition columns included)."""
+    from report_output import arrow_schema
+
+    return arrow_schema(STORE_COLUMNS)
+
+
+def schema_of(schema, names: Sequence[str]):
+    """The fields of schema named in names, as a schema."""
+    import pyarrow as pa
+
+    return pa.schema([schema.field(name) for name in names])
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.dataset  # noqa: F401
+    except ImportError:
+        raise ImportError("The report store requires pyarrow (pip install pyarrow)") from None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WRITING
+# ─────────────────────────────────────────────────────────────────────────────
+
+def store_row(report: Dict[str, Any]) -> Dict[str, Any]:
+    """A report as one stored row: its flat row, MCL exceedance ratios and run date."""
+    row = flatten_report(report)
+    for compound, (ppt, column) in EXCEEDANCE_COLUMNS.items():
+        level = row[ppt]
+        row[column] = level / EPA_LIMITS[compound] if level is not None else None
+    generated = row["report_generated"]
+    row["run_date"] = generated[:10] if generated else None
+    return row
+
+
+def _batches(rows: Iterable[Dict[str, Any]], schema, batch_rows: int) -> Iterator[Any]:
+    import pyarrow as pa
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_rows:
+            yield pa.RecordBatch.from_pylist(batch, schema=schema)
+            batch = []
+    if batch:
+        yield pa.RecordBatch.from_pylist(batch, schema=schema)
+
+
+def write_store(rows: Iterable[Dict[str, Any]], root: Path, run_id: str) -> int:
+    """
+    Append store_row rows to the dataset at root as part-<run_id>-*.parquet
+    files. Returns the number of rows written.
+
+    Rows are pulled in the calling thread (they may come from a report
+    cache bound to it) and written a chunk at a time, so memory stays
+    bounded for fleets of any size.
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = store_schema()
+    partitioning = ds.partitioning(schema_of(schema, PARTITIONS), flavor="hive")
+    count = 0
+    chunks = 0
+    batches = []
+    for batch in itertools.chain(_batches(rows, schema, STORE_BATCH_ROWS), [None]):
+        if batch is not None:
+            batches.append(batch)
+            count += batch.num_rows
+            if sum(item.num_rows for item in batches) < STORE_CHUNK_ROWS:
+                continue
+        if not batches:
+            break
+        ds.write_dataset(
+            pa.Table.from_batches(batches, schema),
+            root,
+            format="parquet",
+            partitioning=partitioning,
+            basename_template=f"part-{run_id}-{chunks}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            min_rows_per_group=ROW_GROUP_ROWS,
+            max_rows_per_group=ROW_GROUP_ROWS,
+        )
+        chunks += 1
+        batches = []
+    return count
+
+
+def run_token(generated_at: str) -> str:
+    """A file-name-safe run id from a report timestamp (2026-10-18T16:17:05.1 -> 20261018T161705)."""
+    return re.sub(r"[^0-9T]", "", generated_at.split(".")[0])
+
+
+def store_fleet(
+    profiles: Iterable[UtilityProfile],
+    root: Path,
+    workers: int = 1,
+    report_options: Optional[Dict[str, Any]] = None,
+    cache: Any = None,
+) -> int:
+    """
+    Score profiles (as fleet.run_fleet does) into the store at root.
+    Returns the number of utilities stored.
+    """
+    from datetime import datetime
+
+    from fleet import score_cached, score_parallel
+
+    _require_pyarrow()
+    generated_at = datetime.now().isoformat()
+    if cache is not None:
+        rows = score_cached(profiles, cache, workers, generated_at, report_options, render=store_row)
+    else:
+        rows = score_parallel(profiles, workers, generated_at, render=store_row, report_options=report_options)
+    return write_store(rows, Path(root), run_token(generated_at))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# QUERIES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def open_store(root: Path):
+    """The store at root as a pyarrow dataset (raises ValueError if there is none)."""
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    root = Path(root)
+    if not root.is_dir():
+        raise ValueError(f"No report store at {root}")
+    schema = store_schema()
+    return ds.dataset(
+        root,
+        schema=schema,
+        format="parquet",
+        partitioning=ds.partitioning(schema_of(schema, PARTITIONS), flavor="hive"),
+    )
+
+
+def parse_number(text: str) -> float:
+    """A numeric filter value: 25, 1.5e6, $50M, 2.5B, 3x (raises ValueError)."""
+    number = text.strip().lstrip("$").replace(",", "").replace("_", "")
+    scale = 1.0
+    if number[-1:].lower() in _SCALE:
+        scale = _SCALE[number[-1].lower()]
+        number = number[:-1]
+    elif number[-1:].lower() in ("x", "×"):
+        number = number[:-1]
+    try:
+        value = float(number)
+    except ValueError:
+        raise ValueError(f"'{text}' is not a number") from None
+    if value == 0 and scale != 1.0:
+        # What the shell leaves of "$50M" inside double quotes
+        raise ValueError(f"'{text}' is zero; single-quote $ amounts in the shell ('total_mid > $50M')")
+    return value * scale
+
+
+def parse_filter(text: str):
+    """A "COLUMN OP VALUE" filter as a pyarrow expression (raises ValueError)."""
+    import pyarrow.dataset as ds
+
+    match = _FILTER.match(text)
+    if not match:
+        raise ValueError(f"Filter '{text}': expected COLUMN OP VALUE (OP one of {' '.join(_OPERATORS)})")
+    column, operator, raw = match.groups()
+    if column not in dict(STORE_COLUMNS):
+        raise ValueError(f"Filter '{text}': unknown column '{column}'")
+    kind = dict(STORE_COLUMNS)[column]
+    if kind == "str":
+        value = raw[1:-1] if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "'\"" else raw
+    elif kind == "bool":
+        if raw.lower() not in ("true", "false", "1", "0"):
+            raise ValueError(f"Filter '{text}': '{raw}' is not true or false")
+        value = raw.lower() in ("true", "1")
+    else:
+        try:
+            value = parse_number(raw)
+        except ValueError as exc:
+            raise ValueError(f"Filter '{text}': {exc}") from None
+    field = ds.field(column)
+    return {
+        ">": field > value,
+        ">=": field >= value,
+        "<": field < value,
+        "<=": field <= value,
+        "==": field == value,
+        "=": field == value,
+        "!=": field != value,
+    }[operator]
+
+
+def build_filter(
+    where: Sequence[str] = (),
+    states: Optional[Sequence[str]] = None,
+    run_dates: Optional[Sequence[str]] = None,
+):
+    """All where filters, states and run dates combined with AND (None for no filter)."""
+    import pyarrow.dataset as ds
+
+    expressions = [parse_filter(text) for text in where]
+    if states:
+        expressions.append(ds.field("state").isin(list(states)))
+    if run_dates:
+        expressions.append(ds.field("run_date").isin(list(run_dates)))
+    expression = None
+    for item in expressions:
+        expression = item if expression is None else expression & item
+    return expression
+
+
+def _check_columns(columns: Optional[Sequence[str]]) -> Optional[List[str]]:
+    if columns is None:
+        return None
+    names = {name for name, _ in STORE_COLUMNS}
+    unknown = [column for column in columns if column not in names]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    return list(columns)
+
+
+def query_batches(
+    root: Path,
+    where: Sequence[str] = (),
+    columns: Optional[Sequence[str]] = None,
+    states: Optional[Sequence[str]] = None,
+    run_dates: Optional[Sequence[str]] = None,
+) -> Iterator[Any]:
+    """Matching rows of the store as pyarrow record batches of the requested columns."""
+    dataset = open_store(root)
+    scanner = dataset.scanner(
+        columns=_check_columns(columns),
+        filter=build_filter(where, states, run_dates),
+    )
+    yield from scanner.to_batches()
+
+
+def query_rows(
+    root: Path,
+    where: Sequence[str] = (),
+    columns: Optional[Sequence[str]] = None,
+    states: Optional[Sequence[str]] = None,
+    run_dates: Optional[Sequence[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Matching rows of the store as dicts of the requested columns (all by default)."""
+    for batch in query_batches(root, where, columns, states, run_dates):
+        yield from batch.to_pylist()
+
+
+def count_rows(
+    root: Path,
+    where: Sequence[str] = (),
+    states: Optional[Sequence[str]] = None,
+    run_dates: Optional[Sequence[str]] = None,
+) -> int:
+    """Number of matching rows (reads only the filtered columns)."""
+    return open_store(root).count_rows(filter=build_filter(where, states, run_dates))
+
+
+def explain(
+    root: Path,
+    where: Sequence[str] = (),
+    states: Optional[Sequence[str]] = None,
+    run_dates: Optional[Sequence[str]] = None,
+) -> Dict[str, int]:
+    """How much of the store a query reads: files and row groups, total and after pruning."""
+    dataset = open_store(root)
+    expression = build_filter(where, states, run_dates)
+    fragments = list(dataset.get_fragments())
+    matched = list(dataset.get_fragments(filter=expression)) if expression is not None else fragments
+    row_groups = sum(fragment.num_row_groups for fragment in fragments)
+    if expression is None:
+        read = row_groups
+    else:
+        read = sum(len(fragment.split_by_row_group(expression, schema=dataset.schema)) for fragment in matched)
+    return {
+        "files": len(fragments),
+        "files_read": len(matched),
+        "row_groups": row_groups,
+        "row_groups_read": read,
+    }
+
+
+def format_explain(plan: Dict[str, int]) -> str:
+    return (
+        f"Read {plan['files_read']:,} of {plan['files']:,} files, "
+        f"{plan['row_groups_read']:,} of {plan['row_groups']:,} row groups"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        epilog="Columns: " + ", ".join(name for name, _ in STORE_COLUMNS),
+    )
+    parser.add_argument("store", type=Path, help="Store directory (written with --store)")
+    parser.add_argument("--where", action="append", default=[], metavar="FILTER",
+                        help="Row filter, e.g. 'total_mid > $50M' (single-quoted in the shell; "
+                             "repeatable; all must hold)")
+    parser.add_argument("--state", help="Comma-separated states")
+    parser.add_argument("--run-date", help="Comma-separated run dates (YYYY-MM-DD)")
+    parser.add_argument("--columns", help="Comma-separated columns to return (default: all)")
+    parser.add_argument("--output", default="-", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv", "arrow"],
+                        help="Output format (default: from --output extension, else jsonl)")
+    parser.add_argument("--count", action="store_true", help="Print the number of matching rows only")
+    parser.add_argument("--explain", action="store_true",
+                        help="Print the files and row groups the query reads (stderr)")
+    args = parser.parse_args(argv)
+
+    split = lambda text: [part.strip() for part in text.split(",") if part.strip()] if text else None  # noqa: E731
+    states, run_dates, columns = split(args.state), split(args.run_date), split(args.columns)
+    try:
+        if args.explain:
+            print(format_explain(explain(args.store, args.where, states, run_dates)), file=sys.stderr)
+        if args.count:
+            print(count_rows(args.store, args.where, states, run_dates))
+            return
+        from fleet import write_rows
+        rows = query_rows(args.store, args.where, columns, states, run_dates)
+        count = write_rows(rows, args.output, args.format)
+    except (OSError, ValueError, ImportError) as exc:
+        print(f"Error: {exc}")
+        return
+    print(f"{count:,} rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Streaming ingestion of lab sample files (EPA UCMR 5 style)
+
+Reads long-format sample exports (one row per sample, compound and date)
+and reduces them to one concentration per utility and compound, then
+joins utility metadata (population, flow, years) from a fleet file and
+yields UtilityProfile objects lazily.
+
+Reducers:
+    max     highest result
+    mean    mean of all results (non-detects count as 0)
+    raa     running annual average: mean of the quarterly means of the
+            sampled quarters among the four calendar quarters ending at
+            the latest sampled one, non-detects as 0 (how compliance
+            with the 2024 PFAS MCLs is determined)
+
+Samples are streamed; the reducer keeps a small accumulator per utility
+and compound (for raa, at most four quarters), so memory grows with the
+number of utilities, never with the number of samples. Files already
+sorted by utility can use presorted=True (--presorted), which emits each
+utility as soon as its rows end and holds one utility at a time.
+
+Input columns (case-insensitive; UCMR5_All.txt names or short aliases):
+    PWSID (utility_id)              required
+    Contaminant (compound)          required; unknown compounds are skipped
+    AnalyticalResultValue (value)   required; in Units
+    AnalyticalResultsSign (sign)    "<" = below the reporting level
+    Units (unit)                    µg/L (UCMR default) or ng/L / ppt
+    CollectionDate (date)           YYYY-MM-DD or MM/DD/YYYY; needed for raa
+    PWSName (name), State (state)   optional metadata
+
+Tab-separated (UCMR5_All.txt) and comma-separated files are both
+accepted; the delimiter is detected from the header.
+
+Usage:
+    python utility_exposure_calculator.py --samples UCMR5_All.txt \\
+        --input fleet.csv --reduce raa --output reports.jsonl
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import csv
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from fleet import COMPOUND_ALIASES, read_fleet
+from utility_exposure_calculator import PFASResult, UtilityProfile
+
+
+# Header aliases -> sample field
+SAMPLE_ALIASES = {
+    "pwsid": "utility_id",
+    "utility_id": "utility_id",
+    "contaminant": "compound",
+    "compound": "compound",
+    "analyticalresultvalue": "value",
+    "value": "value",
+    "concentration": "value",
+    "analyticalresultssign": "sign",
+    "sign": "sign",
+    "units": "units",
+    "unit": "units",
+    "collectiondate": "date",
+    "date": "date",
+    "pwsname": "name",
+    "name": "name",
+    "state": "state",
+}
+
+REQUIRED_SAMPLE_FIELDS = ("utility_id", "compound", "value")
+
+# Unit -> multiplier to ppt (ng/L); UCMR 5 reports µg/L
+UNIT_TO_PPT = {
+    "µg/l": 1000.0,
+    "μg/l": 1000.0,
+    "ug/l": 1000.0,
+    "ppb": 1000.0,
+    "ng/l": 1.0,
+    "ppt": 1.0,
+}
+DEFAULT_UNIT = "µg/l"
+
+REDUCERS = ("max", "mean", "raa")
+
+# Quarters in a running annual average
+RAA_QUARTERS = 4
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PARSING
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _quarter(date: str) -> int:
+    """Calendar quarter index (year * 4 + quarter) of an ISO or US date."""
+    date = date.strip()
+    if "/" in date:
+        month, _, rest = date.partition("/")
+        year = rest.rpartition("/")[2][:4]
+    else:
+        year, month = date[:4], date[5:7]
+    month = int(month)
+    if not 1 <= month <= 12:
+        raise ValueError(f"month {month} out of range")
+    return int(year) * 4 + (month - 1) // 3
+
+
+def _sample_columns(header: Sequence[str]) -> Dict[str, int]:
+    columns = {}
+    for index, column in enumerate(header):
+        field = SAMPLE_ALIASES.get(column.strip().lower())
+        if field and field not in columns:
+            columns[field] = index
+    missing = [field for field in REQUIRED_SAMPLE_FIELDS if field not in columns]
+    if missing:
+        raise ValueError(f"Sample file is missing required column(s): {', '.join(missing)}")
+    return columns
+
+
+def iter_samples(path: Path, need_dates: bool = False) -> Iterator[Tuple[str, str, float, int, Optional[str], Optional[str]]]:
+    """
+    Stream (utility_id, compound, ppt, quarter, name, state) per sample row.
+
+    Non-detects yield 0 ppt; rows for compounds outside COMPOUND_ALIASES
+    are skipped. quarter is -1 when the file has no date column or the
+    row's date is blank; with need_dates either raises ValueError.
+    """
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as handle:
+        first = handle.readline()
+        delimiter = "\t" if first.count("\t") > first.count(",") else ","
+        header = next(csv.reader([first], delimiter=delimiter))
+        columns = _sample_columns(header)
+        if need_dates and "date" not in columns:
+            raise ValueError(f"{path}: the raa reducer needs a CollectionDate column")
+
+        i_id, i_compound, i_value = columns["utility_id"], columns["compound"], columns["value"]
+        i_sign, i_units, i_date = columns.get("sign"), columns.get("units"), columns.get("date")
+        i_name, i_state = columns.get("name"), columns.get("state")
+        width = max(columns.values()) + 1
+        # Per-file caches: a few distinct names / units / dates repeat millions of times
+        compounds = {}
+        unit_scale = {}
+        quarters = {}
+
+        for row_number, row in enumerate(csv.reader(handle, delimiter=delimiter), start=2):
+            if len(row) < width:
+                if not any(row):
+                    continue
+                raise ValueError(f"{path}:{row_number}: expected at least {width} columns")
+            cell = row[i_compound]
+            try:
+                compound = compounds[cell]
+            except KeyError:
+                compound = compounds[cell] = COMPOUND_ALIASES.get(cell.strip().lower())
+            if compound is None:
+                continue
+
+            raw = row[i_value].strip()
+            if not raw or (i_sign is not None and row[i_sign].strip() == "<"):
+                ppt = 0.0
+            else:
+                unit = row[i_units] if i_units is not None else DEFAULT_UNIT
+                scale = unit_scale.get(unit)
+                if scale is None:
+                    scale = UNIT_TO_PPT.get(unit.strip().lower() or DEFAULT_UNIT)
+                    if scale is None:
+                        raise ValueError(f"{path}:{row_number}: unknown unit '{unit}'")
+                    unit_scale[unit] = scale
+                try:
+                    # Rounded so µg/L -> ppt doesn't surface as 4.3000000000000004
+                    ppt = round(float(raw) * scale, 6)
+                except ValueError:
+                    raise ValueError(f"{path}:{row_number}: bad result value '{raw}'") from None
+
+            quarter = -1
+            if i_date is not None:
+                date = row[i_date]
+                quarter = quarters.get(date)
+                if quarter is None:
+                    try:
+                        quarter = _quarter(date) if date.strip() else -1
+                    except ValueError:
+                        raise ValueError(f"{path}:{row_number}: bad collection date '{date}'") from None
+                    quarters[date] = quarter
+                if quarter < 0 and need_dates:
+                    raise ValueError(f"{path}:{row_number}: missing collection date")
+
+            yield (
+                row[i_id].strip(),
+                compound,
+                ppt,
+                quarter,
+                row[i_name] if i_name is not None else None,
+                row[i_state] if i_state is not None else None,
+            )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REDUCTION
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _Utility:
+    """Per-utility accumulators: compound -> reducer state."""
+    __slots__ = ("name", "state", "compounds")
+
+    def __init__(self, name: Optional[str], state: Optional[str]):
+        self.name = name
+        self.state = state
+        self.compounds: Dict[str, Any] = {}
+
+
+def _accumulate(utility: _Utility, compound: str, ppt: float, quarter: int, reducer: str) -> None:
+    acc = utility.compounds.get(compound)
+    if reducer == "max":
+        if acc is None or ppt > acc:
+            utility.compounds[compound] = ppt
+    elif reducer == "mean":
+        if acc is None:
+            utility.compounds[compound] = [ppt, 1]
+        else:
+            acc[0] += ppt
+            acc[1] += 1
+    else:
+        # raa: {quarter: [sum, count]}; quarters before the latest window are
+        # ignored on arrival and pruned once more than RAA_QUARTERS are held
+        if acc is None:
+            utility.compounds[compound] = {quarter: [ppt, 1]}
+            return
+        bucket = acc.get(quarter)
+        if bucket is not None:
+            bucket[0] += ppt
+            bucket[1] += 1
+            return
+        latest = max(acc)
+        if quarter <= latest - RAA_QUARTERS:
+            return  # older than the averaging window
+        acc[quarter] = [ppt, 1]
+        if quarter > latest and len(acc) > RAA_QUARTERS:
+            for old in [q for q in acc if q <= quarter - RAA_QUARTERS]:
+                del acc[old]
+
+
+def _reduce(acc: Any, reducer: str) -> float:
+    if reducer == "max":
+        return acc
+    if reducer == "mean":
+        return acc[0] / acc[1]
+    # Stale quarters may linger (pruning is lazy); only the latest window counts
+    first = max(acc) - RAA_QUARTERS
+    quarterly = [total / count for quarter, (total, count) in sorted(acc.items()) if quarter > first]
+    return sum(quarterly) / len(quarterly)
+
+
+def reduce_utility(utility: _Utility, reducer: str) -> Dict[str, float]:
+    """compound -> reduced concentration (ppt), in first-seen compound order."""
+    return {compound: _reduce(acc, reducer) for compound, acc in utility.compounds.items()}
+
+
+def aggregate_samples(
+    samples: Iterable[Tuple[str, str, float, int, Optional[str], Optional[str]]],
+    reducer: str = "raa",
+    presorted: bool = False,
+) -> Iterator[Tuple[str, Optional[str], Optional[str], Dict[str, float]]]:
+    """
+    Group sample tuples by utility and reduce them.
+
+    Yields (utility_id, name, state, {compound: ppt}). With presorted,
+    each utility is yielded as soon as the next one starts (rows must be
+    grouped by utility_id); otherwise after the whole input is read, in
+    first-seen order.
+    """
+    if reducer not in REDUCERS:
+        raise ValueError(f"Unknown reducer '{reducer}' (choose from: {', '.join(REDUCERS)})")
+    utilities: Dict[str, _Utility] = {}
+    current = None
+    for utility_id, compound, ppt, quarter, name, state in samples:
+        utility = utilities.get(utility_id)
+        if utility is None:
+            if presorted and current is not None:
+                done = utilities.pop(current)
+                yield current, done.name, done.state, reduce_utility(done, reducer)
+            utility = utilities[utility_id] = _Utility(name, state)
+            current = utility_id
+        elif presorted and utility_id != current:
+            raise ValueError(f"Samples are not grouped by utility ('{utility_id}' reappears)")
+        _accumulate(utility, compound, ppt, quarter, reducer)
+
+    for utility_id, utility in utilities.items():
+        yield utility_id, utility.name, utility.state, reduce_utility(utility, reducer)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PROFILES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_metadata(path: Path) -> Dict[str, UtilityProfile]:
+    """Fleet file rows (population, flow, years) keyed by utility_id."""
+    metadata = {}
+    for profile in read_fleet(path):
+        if profile.utility_id is None:
+            raise ValueError(f"{path}: metadata rows need a utility_id (PWSID) column")
+        metadata[profile.utility_id] = profile
+    return metadata
+
+
+def read_sample_profiles(
+    samples_path: Path,
+    metadata: Dict[str, UtilityProfile],
+    reducer: str = "raa",
+    presorted: bool = False,
+    unmatched: Optional[List[str]] = None,
+) -> Iterator[UtilityProfile]:
+    """
+    Lazily yield one UtilityProfile per sampled utility with metadata.
+
+    Population, flow and years come from the metadata profile, the name
+    from the sample file's PWSName when present; the PFAS results are the
+    reduced sample concentrations (non-detect-only compounds are dropped,
+    as in fleet input). Utilities without metadata are skipped and, if
+    given, appended to `unmatched`.
+    """
+    samples = iter_samples(samples_path, need_dates=reducer == "raa")
+    for utility_id, name, state, levels in aggregate_samples(samples, reducer, presorted):
+        base = metadata.get(utility_id)
+        if base is None:
+            if unmatched is not None:
+                unmatched.append(utility_id)
+            continue
+        yield UtilityProfile(
+            name=name or base.name,
+            population_served=base.population_served,
+            daily_flow_mgd=base.daily_flow_mgd,
+            pfas_results=[PFASResult(c, ppt) for c, ppt in levels.items() if ppt > 0],
+            years_of_exposure=base.years_of_exposure,
+            utility_id=utility_id,
+            state=base.state or state,
+        )
+
+
+def sample_profiles(
+    samples_path: Path,
+    metadata_path: Path,
+    reducer: str = "raa",
+    presorted: bool = False,
+) -> Iterator[UtilityProfile]:
+    """read_sample_profiles with metadata from a fleet file; reports skipped utilities on stderr."""
+    unmatched: List[str] = []
+    yield from read_sample_profiles(samples_path, load_metadata(metadata_path), reducer, presorted, unmatched)
+    if unmatched:
+        print(
+            f"Warning: {len(unmatched):,} sampled utilities have no row in {metadata_path} "
+            f"(e.g. {unmatched[0]}); skipped",
+            file=sys.stderr,
+        )
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Scenario sweep / sensitivity grid for the PFAS Liability Exposure Calculator
+
+Evaluates the Cartesian grid of treatment technology × horizon (years) ×
+violation days for each utility and returns a tidy table: one row per
+(utility, technology, years, violation_days) cell.
+
+Each report component depends on only part of the grid, so it is
+computed once per distinct value of the axes it depends on:
+
+    litigation exposure   once per utility (affected population,
+                          exceedance and duration multipliers)
+    regulatory penalties  once per violation_days value
+    treatment costs       once per (technology, years) pair
+
+and grid cells only add the memoized components together, so the
+per-cell cost is a few additions plus building the output row. Every
+cell matches generate_liability_report with the same arguments.
+
+Sweep spec (CLI):
+    --sweep tech=gac,ix,ro,novel years=5..40 violation_days=90,180,365
+    --sweep years=5..40:5                  # range with a step
+Axes left out take the calculator's --technology, --horizon and
+--violation-days (by default gac, 20 years, 365 days). With
+--violation-days data the days come from each utility's sample history
+(UtilityProfile.violation_days) and cannot be swept.
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+from itertools import product
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from technology_catalog import get_catalog
+from utility_exposure_calculator import (
+    UtilityProfile,
+    calculate_litigation_exposure,
+    calculate_regulatory_penalties,
+    calculate_treatment_costs,
+)
+
+
+# Axis name -> (value parser, default values)
+SWEEP_AXES = {
+    "tech": (str, ["gac"]),
+    "years": (int, [20]),
+    "violation_days": (int, [365]),
+}
+
+# Spelling alternatives accepted on the command line
+AXIS_ALIASES = {
+    "technology": "tech",
+    "horizon": "years",
+    "days": "violation_days",
+}
+
+
+def _parse_values(axis: str, text: str) -> List[Any]:
+    """Parse 'a,b,c', 'lo..hi' or 'lo..hi:step' (ranges are inclusive)."""
+    parse, _ = SWEEP_AXES[axis]
+    values = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ".." in part and parse is int:
+            bounds, _, step = part.partition(":")
+            low, _, high = bounds.partition("..")
+            step = int(step) if step else 1
+            if step <= 0:
+                raise ValueError(f"{axis}: range step must be positive")
+            values.extend(range(int(low), int(high) + 1, step))
+        else:
+            values.append(parse(part))
+    if not values:
+        raise ValueError(f"{axis}: no values given")
+    return values
+
+
+def parse_sweep(tokens: Sequence[str], defaults: Optional[Dict[str, Any]] = None) -> Dict[str, List[Any]]:
+    """
+    Parse 'axis=values' tokens into a grid of axis -> list of values.
+
+    Axes not in tokens take their value from defaults (axis -> one value),
+    else from SWEEP_AXES. Raises ValueError for unknown axes, malformed
+    values or technologies missing from the technology catalog.
+    """
+    defaults = defaults or {}
+    grid = {
+        axis: [defaults[axis]] if axis in defaults else list(default)
+        for axis, (_, default) in SWEEP_AXES.items()
+    }
+    for token in tokens:
+        name, sep, text = token.partition("=")
+        if not sep:
+            raise ValueError(f"Sweep spec '{token}' must look like axis=values")
+        axis = AXIS_ALIASES.get(name.strip(), name.strip())
+        if axis not in SWEEP_AXES:
+            raise ValueError(f"Unknown sweep axis '{name}' (choose from: {', '.join(SWEEP_AXES)})")
+        try:
+            grid[axis] = _parse_values(axis, text)
+        except ValueError as exc:
+            raise ValueError(f"Bad sweep values '{token}': {exc}") from None
+
+    catalog = get_catalog()
+    for tech in grid["tech"]:
+        catalog.technology(tech)  # raises ValueError for unknown names
+    return grid
+
+
+def sweep_profile(
+    profile: UtilityProfile,
+    grid: Dict[str, List[Any]],
+    discount_rate: Optional[float] = None,
+    escalation_rate: float = 0.0,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one tidy row per grid cell for a single utility.
+
+    A discount_rate prices treatment as NPV (see calculate_treatment_npv).
+    The violation_days value "data" takes the profile's data-derived days.
+    """
+    litigation = calculate_litigation_exposure(profile)
+    compliant = profile.in_compliance
+    regulatory = {}
+    for days in grid["violation_days"]:
+        if days == "data" and profile.violation_days is None:
+            raise ValueError(f"{profile.name}: no violation days from sample data")
+        by_compound = profile.violation_days if days == "data" else days
+        regulatory[days] = calculate_regulatory_penalties(profile, by_compound)["total"]
+    treatment = {
+        (tech, years): calculate_treatment_costs(profile, tech, years, discount_rate, escalation_rate)
+        for tech, years in product(grid["tech"], grid["years"])
+    }
+
+    name, utility_id, state = profile.name, profile.utility_id, profile.state
+    low, mid, high = litigation["low"], litigation["mid"], litigation["high"]
+
+    for (tech, years), days in product(treatment, grid["violation_days"]):
+        costs = treatment[tech, years]
+        penalty = regulatory[days]
+        total = costs["total"]
+        yield {
+            "name": name,
+            "utility_id": utility_id,
+            "state": state,
+            "technology": tech,
+            "years": years,
+            "violation_days": days,
+            "compliance_status": compliant,
+            "regulatory_penalties": penalty,
+            "litigation_low": low,
+            "litigation_mid": mid,
+            "litigation_high": high,
+            "treatment_capital": costs["capital"],
+            "treatment_total": total,
+            "total_low": penalty + low + total,
+            "total_mid": penalty + mid + total,
+            "total_high": penalty + high + total,
+        }
+
+
+def sweep_fleet(
+    profiles: Iterable[UtilityProfile],
+    grid: Dict[str, List[Any]],
+    discount_rate: Optional[float] = None,
+    escalation_rate: float = 0.0,
+) -> Iterator[Dict[str, Any]]:
+    """Stream the tidy sweep table for a whole fleet."""
+    for profile in profiles:
+        yield from sweep_profile(profile, grid, discount_rate, escalation_rate)
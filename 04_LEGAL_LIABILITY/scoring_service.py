@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Local HTTP/JSON scoring service
+
+Keeps the calculator warm in one long-lived process so dashboards don't
+pay interpreter startup, imports and cost table parsing on every call.
+Standard library only (asyncio); meant for localhost, not the internet.
+
+Routes:
+    POST /report    one utility  -> one liability report
+    POST /reports   many         -> {"reports": [...]}
+    GET  /health    liveness and cost table in use
+    GET  /metrics   request counts and latency percentiles per route
+
+Request bodies use the fleet input columns (see fleet.py), plus optional
+report options:
+
+    POST /report
+    {"name": "Springfield", "population": 100000, "flow": 10,
+     "PFOA": 25, "PFOS": 15, "options": {"technology": "ro"}}
+
+    POST /reports
+    {"utilities": [{...}, {...}], "options": {"discount_rate": 0.03}}
+
+Options: technology, years, violation_days, discount_rate, escalation_rate,
+om_model.
+
+At most --concurrency requests are scored at once, each in a worker
+thread of a pool that size, so /health and new connections stay
+responsive while reports are computed; up to --queue more wait for a
+slot and anything beyond that is refused with 503, so a burst can't pile
+up unbounded work.
+
+Usage:
+    python utility_exposure_calculator.py serve --port 8765
+    curl -s localhost:8765/report -d '{"population": 100000, "flow": 10, "PFOA": 25}'
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fleet import profile_from_row
+from report_output import dumps, loads
+from technology_catalog import get_catalog, set_catalog
+from utility_exposure_calculator import generate_liability_report
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CONCURRENCY = 8
+DEFAULT_QUEUE = 256
+
+# Request limits
+MAX_BODY_BYTES = 32 * 1024 * 1024
+MAX_BATCH = 100_000
+MAX_HEADER_LINES = 100
+IDLE_TIMEOUT = 30.0  # seconds a keep-alive connection may sit idle
+
+# Latency samples kept per route for percentiles
+LATENCY_WINDOW = 10_000
+
+ROUTES = ("/report", "/reports", "/health", "/metrics")
+
+REPORT_OPTIONS = ("technology", "years", "violation_days", "discount_rate", "escalation_rate", "om_model")
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class RequestError(Exception):
+    """Client error carrying an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# METRICS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+class RouteMetrics:
+    """Counters plus a sliding window of latencies for one route."""
+    __slots__ = ("requests", "errors", "utilities", "latencies")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.utilities = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float, status: int, utilities: int = 0) -> None:
+        self.requests += 1
+        self.errors += status >= 400
+        self.utilities += utilities
+        self.latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        ms = lambda seconds: round(seconds * 1e3, 3)  # noqa: E731
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "utilities": self.utilities,
+            "latency_ms": {
+                "p50": ms(percentile(ordered, 50)),
+                "p90": ms(percentile(ordered, 90)),
+                "p99": ms(percentile(ordered, 99)),
+                "max": ms(ordered[-1]) if ordered else 0.0,
+                "mean": ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+                "window": len(ordered),
+            },
+        }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SERVICE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def report_options(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Validated generate_liability_report keyword arguments from a request body."""
+    options = body.get("options") or {}
+    if not isinstance(options, dict):
+        raise RequestError(400, "'options' must be an object")
+    unknown = [key for key in options if key not in REPORT_OPTIONS]
+    if unknown:
+        raise RequestError(400, f"Unknown option '{unknown[0]}' (choose from: {', '.join(REPORT_OPTIONS)})")
+    if "technology" in options and options["technology"] not in get_catalog():
+        raise RequestError(
+            400, f"Unknown technology '{options['technology']}' (choose from: {', '.join(get_catalog().names())})"
+        )
+    return options
+
+
+def score_one(row: Dict[str, Any], options: Dict[str, Any], index: int = 1) -> Dict[str, Any]:
+    if not isinstance(row, dict):
+        raise RequestError(400, f"utility {index}: expected an object")
+    try:
+        return generate_liability_report(profile_from_row(row, index), **options)
+    except (TypeError, ValueError) as exc:
+        raise RequestError(400, f"utility {index}: {exc}") from None
+
+
+def score_many(rows: List[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+    return {"reports": [score_one(row, options, i) for i, row in enumerate(rows, start=1)]}
+
+
+class ScoringService:
+    """Routes, admission control and metrics for the HTTP server."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, queue: int = DEFAULT_QUEUE):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.queue = queue
+        self.pending = 0  # requests running or waiting for a slot
+        self.rejected = 0
+        self.started = time.time()
+        self.metrics: Dict[str, RouteMetrics] = {}
+        self._slots = asyncio.Semaphore(concurrency)
+        self._executor = ThreadPoolExecutor(concurrency, thread_name_prefix="score")
+
+    def warm_up(self) -> None:
+        """Load the cost table and run one report so first requests are fast."""
+        get_catalog()
+        score_one({"population_served": 1000, "daily_flow_mgd": 0.1, "PFOA": 10.0}, {})
+
+    def close(self) -> None:
+        """Stop the scoring threads (after the server stopped accepting)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        """Handle one request; returns (status, JSON payload)."""
+        route = path.split("?", 1)[0]
+        # Unknown paths share one bucket so scanners can't grow the metrics
+        metrics = self.metrics.setdefault(route if route in ROUTES else "other", RouteMetrics())
+        start = time.perf_counter()
+        status, payload, utilities = 500, {"error": "Internal error"}, 0
+        try:
+            if route == "/health":
+                self._require(method, "GET")
+                status, payload = 200, {
+                    "status": "ok",
+                    "uptime_s": round(time.time() - self.started, 1),
+                    "cost_table": get_catalog().source,
+                }
+            elif route == "/metrics":
+                self._require(method, "GET")
+                status, payload = 200, self.snapshot()
+            elif route in ("/report", "/reports"):
+                self._require(method, "POST")
+                status, payload, utilities = await self._score(route, body)
+            else:
+                raise RequestError(404, f"No route {route}")
+        except RequestError as exc:
+            status, payload = exc.status, {"error": str(exc)}
+        except Exception as exc:  # keep serving; report the failure to the client
+            status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            metrics.record(time.perf_counter() - start, status, utilities)
+        return status, payload
+
+    @staticmethod
+    def _require(method: str, expected: str) -> None:
+        if method != expected:
+            raise RequestError(405, f"Use {expected}")
+
+    async def _score(self, route: str, body: bytes) -> Tuple[int, Dict[str, Any], int]:
+        try:
+            data = loads(body or b"null")
+        except ValueError as exc:
+            raise RequestError(400, f"Invalid JSON: {exc}") from None
+        if not isinstance(data, dict):
+            raise RequestError(400, "Request body must be a JSON object")
+        options = report_options(data)
+
+        if self.pending >= self.concurrency + self.queue:
+            self.rejected += 1
+            raise RequestError(503, "Server busy, retry later")
+        self.pending += 1
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                if route == "/report":
+                    return 200, await loop.run_in_executor(self._executor, score_one, data, options), 1
+                rows = data.get("utilities")
+                if not isinstance(rows, list):
+                    raise RequestError(400, "'utilities' must be a list")
+                if len(rows) > MAX_BATCH:
+                    raise RequestError(413, f"At most {MAX_BATCH:,} utilities per request")
+                result = await loop.run_in_executor(self._executor, score_many, rows, options)
+                return 200, result, len(rows)
+        finally:
+            self.pending -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "concurrency": self.concurrency,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "routes": {route: m.snapshot() for route, m in sorted(self.metrics.items())},
+        }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HTTP
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Parse one HTTP/1.1 request (None when the client closed the connection)."""
+    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise RequestError(400, "Malformed request line") from None
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise RequestError(400, "Too many headers")
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise RequestError(400, "Chunked request bodies are not supported; send Content-Length")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError(400, "Bad Content-Length") from None
+    if length > MAX_BODY_BYTES:
+        raise RequestError(413, f"Body larger than {MAX_BODY_BYTES:,} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def _response(status: int, payload: Dict[str, Any], keep_alive: bool) -> bytes:
+    body = dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def _handle_connection(
+    service: ScoringService,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except RequestError as exc:
+                writer.write(_response(exc.status, {"error": str(exc)}, keep_alive=False))
+                await writer.drain()
+                break
+            if request is None:
+                break
+            method, target, headers, body = request
+            keep_alive = headers.get("connection", "").lower() != "close"
+            status, payload = await service.dispatch(method, target, body)
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    queue: int = DEFAULT_QUEUE,
+) -> None:
+    """Run the service until cancelled."""
+    service = ScoringService(concurrency, queue)
+    service.warm_up()
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(service, reader, writer), host, port
+    )
+    bound = ", ".join(f"{a[0]}:{a[1]}" for a in (s.getsockname() for s in server.sockets))
+    print(f"PFAS scoring service listening on {bound} (concurrency {concurrency})", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="utility_exposure_calculator.py serve",
+        description="Serve liability reports over local HTTP/JSON",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"Interface to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Requests scored at once, one worker thread each (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE,
+                        help=f"Requests allowed to wait before 503 (default: {DEFAULT_QUEUE})")
+    parser.add_argument("--cost-table", type=str,
+                        help="Technology cost table CSV (default: cost_comparison.csv)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.cost_table:
+            set_catalog(args.cost_table)
+        asyncio.run(serve(args.host, args.port, args.concurrency, args.queue))
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
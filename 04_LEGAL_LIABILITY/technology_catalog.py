@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Treatment technology catalog
+
+Loads the technology cost and performance table
+(02_CURRENT_SOLUTIONS_FAIL/cost_comparison.csv by default) once, validates
+it and serves indexed lookups by technology and by compound. The
+calculator, the vectorized engine, the scenario sweep and the chart
+generator all read treatment parameters from the same catalog, so a fleet
+run or chart build parses the table once.
+
+A regional or updated cost table can be swapped in without code edits,
+either with --cost-table on the calculator CLI or by setting the
+PFAS_COST_TABLE environment variable (which worker processes inherit).
+
+Columns (one row per technology):
+    Technology                      row key (matched case-insensitively)
+    Capital_per_MGD_USD             up-front capital per MGD of capacity
+    Annual_OM_per_MGD_USD           yearly O&M per MGD
+    Replacement_Interval_Years      media / membrane replacement interval
+    Disposal_Cost_per_Ton_USD       residuals disposal cost
+    <COMPOUND>_Removal_Percent      removal efficiency per compound (0-100)
+    Energy_kWh_per_1000gal          energy intensity
+    OM_per_1000gal_USD              all-in O&M per 1000 gal, including media
+                                    disposal (optional; derived from
+                                    Annual_OM_per_MGD_USD when absent); both
+                                    the simple and the NPV treatment costs
+                                    use this rate
+    Residuals_Tons_per_MGD          spent media / residuals per replacement
+                                    (optional; 0 when absent)
+    Notes                           free text (optional)
+
+Residuals for GAC and IX are calibrated so tons × disposal $/ton ÷ interval
+matches the annual disposal cost of the 10 MGD examples in
+02_CURRENT_SOLUTIONS_FAIL (GAC $0.5M, IX single-use $0.6M, IX regenerable
+$0.3M per year); RO/NF assume ~2.2 t/MGD of membrane elements and the
+novel technology an IX-sized bed.
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import csv
+import hashlib
+import io
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+
+DEFAULT_COST_TABLE = Path(__file__).resolve().parent.parent / "02_CURRENT_SOLUTIONS_FAIL" / "cost_comparison.csv"
+
+# Environment variable naming an alternative cost table
+COST_TABLE_ENV = "PFAS_COST_TABLE"
+
+# Short names accepted for catalog rows (the calculator's historical keys)
+DEFAULT_ALIASES = {
+    "ix": "ix_regenerable",
+    "novel": "novel_projected",
+}
+
+REQUIRED_COLUMNS = (
+    "Technology",
+    "Capital_per_MGD_USD",
+    "Annual_OM_per_MGD_USD",
+    "Replacement_Interval_Years",
+    "Disposal_Cost_per_Ton_USD",
+)
+
+REMOVAL_SUFFIX = "_Removal_Percent"
+
+
+@dataclass(frozen=True)
+class Technology:
+    """One row of the cost table."""
+    key: str  # lower-cased Technology column
+    name: str
+    capital_per_mgd: float
+    annual_om_per_mgd: float
+    om_per_1000gal: float
+    replacement_interval_years: float
+    disposal_cost_per_ton: float
+    residuals_tons_per_mgd: float = 0.0
+    energy_kwh_per_1000gal: Optional[float] = None
+    removal_percent: Dict[str, float] = field(default_factory=dict)
+    notes: str = ""
+
+
+class TechnologyCatalog:
+    """Validated, indexed view of a technology cost table."""
+
+    def __init__(
+        self,
+        technologies: List[Technology],
+        aliases: Optional[Dict[str, str]] = None,
+        source: Optional[str] = None,
+        fingerprint: str = "",
+    ):
+        self._by_key: Dict[str, Technology] = {}
+        for tech in technologies:
+            if tech.key in self._by_key:
+                raise ValueError(f"Duplicate technology '{tech.name}' in cost table")
+            self._by_key[tech.key] = tech
+        # Aliases only apply when their target exists and they don't shadow a row
+        self._aliases = {
+            alias: target
+            for alias, target in (DEFAULT_ALIASES if aliases is None else aliases).items()
+            if target in self._by_key and alias not in self._by_key
+        }
+        # compound -> {technology key -> removal %}
+        self._by_compound: Dict[str, Dict[str, float]] = {}
+        for tech in technologies:
+            for compound, percent in tech.removal_percent.items():
+                self._by_compound.setdefault(compound, {})[tech.key] = percent
+        self.source = source
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path] = DEFAULT_COST_TABLE) -> "TechnologyCatalog":
+        """Parse and validate a cost table CSV."""
+        data = Path(path).read_bytes()
+        text = data.decode("utf-8-sig")
+        reader = csv.DictReader(io.StringIO(text, newline=""))
+        columns = reader.fieldnames or []
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError(f"{path}: cost table is missing column(s) {', '.join(missing)}")
+        removal_columns = {
+            column: column[: -len(REMOVAL_SUFFIX)]
+            for column in columns
+            if column.endswith(REMOVAL_SUFFIX)
+        }
+
+        technologies = []
+        for line, row in enumerate(reader, start=2):
+            name = (row.get("Technology") or "").strip()
+            if not name:
+                continue
+
+            def number(column: str, default: Optional[float] = None) -> Optional[float]:
+                raw = (row.get(column) or "").strip()
+                if not raw:
+                    if default is None and column in REQUIRED_COLUMNS:
+                        raise ValueError(f"{path}:{line}: {name} has no {column}")
+                    return default
+                try:
+                    value = float(raw)
+                except ValueError:
+                    raise ValueError(f"{path}:{line}: {column} '{raw}' is not a number") from None
+                if value < 0:
+                    raise ValueError(f"{path}:{line}: {column} must not be negative")
+                return value
+
+            interval = number("Replacement_Interval_Years")
+            if interval <= 0:
+                raise ValueError(f"{path}:{line}: Replacement_Interval_Years must be positive")
+            annual_om = number("Annual_OM_per_MGD_USD")
+            removal = {}
+            for column, compound in removal_columns.items():
+                percent = number(column)
+                if percent is None:
+                    continue
+                if percent > 100:
+                    raise ValueError(f"{path}:{line}: {column} must be between 0 and 100")
+                removal[compound] = percent
+
+            technologies.append(Technology(
+                key=name.lower(),
+                name=name,
+                capital_per_mgd=number("Capital_per_MGD_USD"),
+                annual_om_per_mgd=annual_om,
+                # 1 MGD for a year = 365,000 thousand gallons
+                om_per_1000gal=number("OM_per_1000gal_USD", annual_om / 365000),
+                replacement_interval_years=interval,
+                disposal_cost_per_ton=number("Disposal_Cost_per_Ton_USD"),
+                residuals_tons_per_mgd=number("Residuals_Tons_per_MGD", 0.0),
+                energy_kwh_per_1000gal=number("Energy_kWh_per_1000gal"),
+                removal_percent=removal,
+                notes=(row.get("Notes") or "").strip(),
+            ))
+
+        if not technologies:
+            raise ValueError(f"{path}: cost table has no technologies")
+        return cls(
+            technologies,
+            source=str(path),
+            fingerprint=hashlib.sha256(data).hexdigest(),
+        )
+
+    # ── Lookups ──────────────────────────────────────────────────────────────
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Catalog key for a technology name or alias (None if unknown)."""
+        key = name.strip().lower()
+        key = self._aliases.get(key, key)
+        return key if key in self._by_key else None
+
+    def technology(self, name: str) -> Technology:
+        """Look up a technology by name or alias; unknown names raise ValueError."""
+        key = self.resolve(name)
+        if key is None:
+            raise ValueError(f"Unknown technology '{name}' (choose from: {', '.join(self.names())})")
+        return self._by_key[key]
+
+    def removal(self, technology: str, compound: str) -> Optional[float]:
+        """Removal percent of a compound by a technology (None if not tabulated)."""
+        key = self.resolve(technology)
+        if key is None:
+            raise ValueError(f"Unknown technology '{technology}' (choose from: {', '.join(self.names())})")
+        return self._by_compound.get(compound, {}).get(key)
+
+    def removal_by_technology(self, compound: str) -> Dict[str, float]:
+        """Removal percent of one compound for every technology that lists it."""
+        return dict(self._by_compound.get(compound, {}))
+
+    @property
+    def compounds(self) -> List[str]:
+        """Compounds with a removal column in the table."""
+        return list(self._by_compound)
+
+    def names(self) -> List[str]:
+        """Accepted technology names: catalog keys plus aliases, sorted."""
+        return sorted(set(self._by_key) | set(self._aliases))
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.resolve(name) is not None
+
+    def __iter__(self) -> Iterator[Technology]:
+        return iter(self._by_key.values())
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SHARED INSTANCE
+# ─────────────────────────────────────────────────────────────────────────────
+
+_catalog: Optional[TechnologyCatalog] = None
+
+
+def get_catalog() -> TechnologyCatalog:
+    """The shared catalog, loaded on first use ($PFAS_COST_TABLE or the default table)."""
+    global _catalog
+    if _catalog is None:
+        _catalog = TechnologyCatalog.from_csv(os.environ.get(COST_TABLE_ENV) or DEFAULT_COST_TABLE)
+    return _catalog
+
+
+def set_catalog(catalog: Union[str, Path, TechnologyCatalog, None]) -> TechnologyCatalog:
+    """
+    Replace the shared catalog with a cost table path or a catalog object.
+
+    A path is also exported as $PFAS_COST_TABLE so worker processes load
+    the same table; None reverts to the default on next use.
+    """
+    global _catalog
+    if catalog is None:
+        os.environ.pop(COST_TABLE_ENV, None)
+        _catalog = None
+        return get_catalog()
+    if not isinstance(catalog, TechnologyCatalog):
+        path = Path(catalog).resolve()
+        catalog = TechnologyCatalog.from_csv(path)
+        os.environ[COST_TABLE_ENV] = str(path)
+    _catalog = catalog
+    return catalog
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Treatment technology selection: per utility and across a capital budget
+
+For every utility and every technology in the catalog, predicts the
+post-treatment concentrations from the cost table's removal percentages,
+re-evaluates compliance, penalties and litigation on them and adds the
+technology's treatment cost:
+
+    exposure(u, t) = penalties(treated) + litigation(treated) + treatment(t)
+
+with "none" (untreated, no treatment cost) as one more option. The
+per-utility optimum is the option with the lowest expected exposure.
+
+Across a fleet with a total capital budget this is a multiple-choice
+knapsack (one option per utility, capital as weight, exposure reduction
+as value). It is solved with the greedy on each utility's convex hull of
+(capital, reduction) options: upgrades are taken in order of reduction
+per capital dollar while they fit; an upgrade that doesn't fit blocks
+that utility's later ones (the result is kept unless funding the first
+unaffordable upgrade alone does better). The greedy stopping point also
+gives the LP relaxation bound, so every allocation reports how far from
+optimal it can be at most.
+
+The cost table only lists removal for PFOS, PFOA and PFBS; the other
+compounds take the removal of the tabulated compounds nearest in chain
+length and head group (REMOVAL_PROXIES, after the chain-length trend in
+assets/generate_charts.py). Compounds with neither are not removed.
+
+Usage:
+    python utility_exposure_calculator.py --population 100000 --flow 10 --pfoa 25 --optimize
+    python utility_exposure_calculator.py --input fleet.csv --output plan.csv --budget 250e6
+
+Requirements:
+    pip install numpy
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from exposure_engine import (
+    COMPOUNDS,
+    litigation_exposure,
+    mcl_violations,
+    profiles_to_arrays,
+    regulatory_penalties,
+    treatment_costs,
+)
+from technology_catalog import Technology, TechnologyCatalog, get_catalog
+from utility_exposure_calculator import PFASResult, UtilityProfile
+
+
+# Option 0 of every utility: leave it untreated
+NO_TREATMENT = "none"
+
+# Untabulated compound -> {tabulated compound: weight}. PFHxS (C6
+# sulfonate) sits halfway between PFBS (C4) and PFOS (C8); PFNA (C9) is
+# removed at least as well as PFOA; HFPO-DA behaves like a short chain.
+REMOVAL_PROXIES = {
+    "PFHxS": {"PFBS": 0.5, "PFOS": 0.5},
+    "PFNA": {"PFOA": 1.0},
+    "HFPO-DA": {"PFBS": 1.0},
+}
+
+
+def removal_fraction(tech: Technology, compound: str) -> float:
+    """Fraction of a compound removed by a technology (0-1)."""
+    percent = tech.removal_percent.get(compound)
+    if percent is None:
+        proxies = REMOVAL_PROXIES.get(compound, {})
+        if not all(p in tech.removal_percent for p in proxies):
+            return 0.0
+        percent = sum(tech.removal_percent[p] * weight for p, weight in proxies.items())
+    return percent / 100
+
+
+def remaining_matrix(
+    catalog: Optional[TechnologyCatalog] = None,
+    compounds: Sequence[str] = COMPOUNDS,
+) -> Dict[str, Any]:
+    """Technology keys and the (technologies, compounds) fraction left after treatment."""
+    technologies = list(catalog or get_catalog())
+    remaining = np.array(
+        [[1 - removal_fraction(tech, c) for c in compounds] for tech in technologies],
+        dtype=np.float64,
+    ).reshape(len(technologies), len(compounds))
+    return {"technologies": [tech.key for tech in technologies], "remaining": remaining}
+
+
+def treated_profile(
+    profile: UtilityProfile,
+    technology: str,
+    catalog: Optional[TechnologyCatalog] = None,
+) -> UtilityProfile:
+    """Copy of a profile with post-treatment concentrations."""
+    tech = (catalog or get_catalog()).technology(technology)
+    return UtilityProfile(
+        name=profile.name,
+        population_served=profile.population_served,
+        daily_flow_mgd=profile.daily_flow_mgd,
+        pfas_results=[
+            PFASResult(r.compound, r.concentration_ppt * (1 - removal_fraction(tech, r.compound)))
+            for r in profile.pfas_results
+        ],
+        years_of_exposure=profile.years_of_exposure,
+        utility_id=profile.utility_id,
+        state=profile.state,
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# EXPOSURE PER OPTION
+# ─────────────────────────────────────────────────────────────────────────────
+
+def option_exposure(
+    population_served: np.ndarray,
+    daily_flow_mgd: np.ndarray,
+    years_of_exposure: np.ndarray,
+    concentrations: np.ndarray,
+    estimate: str = "mid",
+    treatment_years: int = 20,
+    violation_days: int = 365,
+    discount_rate: Optional[float] = None,
+    escalation_rate: float = 0.0,
+    compounds: Sequence[str] = COMPOUNDS,
+    catalog: Optional[TechnologyCatalog] = None,
+) -> Dict[str, Any]:
+    """
+    Expected exposure, capital and compliance of every (utility, option).
+
+    Option 0 is NO_TREATMENT, then the catalog technologies. Each
+    technology's column equals generate_liability_report's total_exposure
+    on treated_profile(profile, technology) with the same technology.
+    """
+    concentrations = np.asarray(concentrations, dtype=np.float64)
+    population_served = np.asarray(population_served)
+    daily_flow_mgd = np.asarray(daily_flow_mgd, dtype=np.float64)
+    years_of_exposure = np.asarray(years_of_exposure)
+    matrix = remaining_matrix(catalog, compounds)
+    options = [NO_TREATMENT, *matrix["technologies"]]
+
+    shape = (len(daily_flow_mgd), len(options))
+    exposure = np.empty(shape)
+    capital = np.zeros(shape)
+    in_compliance = np.empty(shape, dtype=bool)
+    for j, option in enumerate(options):
+        levels = concentrations if j == 0 else concentrations * matrix["remaining"][j - 1]
+        violations, total_exceedance, _ = mcl_violations(levels, compounds)
+        compliant = violations == 0
+        litigation = litigation_exposure(population_served, years_of_exposure, total_exceedance, compliant)
+        total = regulatory_penalties(violations, violation_days) + litigation[estimate]
+        if j:
+            treatment = treatment_costs(daily_flow_mgd, option, treatment_years, discount_rate, escalation_rate)
+            total += treatment["total"]
+            capital[:, j] = treatment["capital"]
+        exposure[:, j] = total
+        in_compliance[:, j] = compliant
+
+    return {
+        "options": options,
+        "exposure": exposure,
+        "capital": capital,
+        "in_compliance": in_compliance,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BUDGET ALLOCATION (MULTIPLE-CHOICE KNAPSACK)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _cross(stack_x, stack_y, length, rows, x, y):
+    """Cross product of (s[-2] -> s[-1]) and (s[-2] -> point) for the given rows."""
+    ox, oy = stack_x[rows, length - 2], stack_y[rows, length - 2]
+    ax, ay = stack_x[rows, length - 1], stack_y[rows, length - 1]
+    return (ax - ox) * (y - oy) - (ay - oy) * (x - ox)
+
+
+def upgrade_steps(capital: np.ndarray, benefit: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Each utility's upper convex hull of (capital, benefit) options,
+    starting at option 0, as upgrade steps with positive benefit.
+
+    Vectorized monotone chain: options are visited in order of capital
+    (ties by benefit) for all utilities at once, popping the points that
+    fall under the hull row by row.
+    """
+    n, k = capital.shape
+    order = np.lexsort((benefit[:, 1:], capital[:, 1:]), axis=-1) + 1
+    xs = np.take_along_axis(capital, order, axis=1)
+    ys = np.take_along_axis(benefit, order, axis=1)
+
+    stack = np.zeros((n, k), dtype=np.int64)  # option index
+    stack_x = np.zeros((n, k))
+    stack_y = np.zeros((n, k))
+    stack_x[:, 0] = capital[:, 0]
+    stack_y[:, 0] = benefit[:, 0]
+    length = np.ones(n, dtype=np.int64)
+    everyone = np.arange(n)
+    for j in range(k - 1):
+        x, y = xs[:, j], ys[:, j]
+        while True:
+            rows = np.flatnonzero(length >= 2)
+            rows = rows[_cross(stack_x, stack_y, length[rows], rows, x[rows], y[rows]) >= 0]
+            if not len(rows):
+                break
+            length[rows] -= 1
+        stack[everyone, length] = order[:, j]
+        stack_x[everyone, length] = x
+        stack_y[everyone, length] = y
+        length += 1
+
+    # Hull slopes decrease, so the steps with a positive gain form a prefix
+    step = np.arange(1, k)
+    valid = step < length[:, None]
+    gain = stack_y[:, 1:] - stack_y[:, :-1]
+    keep = valid & (gain > 0)
+    utility, position = np.nonzero(keep)
+    cost = (stack_x[:, 1:] - stack_x[:, :-1])[keep]
+    gain = gain[keep]
+    with np.errstate(divide="ignore"):
+        efficiency = np.where(cost > 0, gain / np.where(cost > 0, cost, 1), np.inf)
+    return {
+        "utility": utility,
+        "step": position,
+        "option": stack[:, 1:][keep],
+        "cost": cost,
+        "gain": gain,
+        "efficiency": efficiency,
+    }
+
+
+def _greedy_pass(
+    cost: np.ndarray,
+    gain: np.ndarray,
+    utility: np.ndarray,
+    option: np.ndarray,
+    budget: float,
+    taken: np.ndarray,
+    choice: np.ndarray,
+) -> Dict[str, Any]:
+    """
+    Take steps (sorted by efficiency) in order while they fit, on top of
+    the steps already taken; a step that doesn't fit blocks its utility.
+    """
+    spent = float(cost[taken].sum())
+    gained = float(gain[taken].sum())
+    rest = np.flatnonzero(~taken)
+    cumulative = spent + np.cumsum(cost[rest])
+    fits = int(np.searchsorted(cumulative, budget, side="right"))
+    # Steps come in hull order within a utility, so the last one wins
+    choice[utility[rest[:fits]]] = option[rest[:fits]]
+    if fits:
+        spent = float(cumulative[fits - 1])
+        gained += float(gain[rest[:fits]].sum())
+    critical = int(rest[fits]) if fits < len(rest) else None
+
+    blocked = np.zeros(len(choice), dtype=bool)
+    for i in rest[fits:].tolist():
+        u = utility[i]
+        if blocked[u]:
+            continue
+        if spent + cost[i] <= budget:
+            spent += cost[i]
+            gained += gain[i]
+            choice[u] = option[i]
+        else:
+            blocked[u] = True
+    return {"choice": choice, "spent": spent, "gained": gained, "critical": critical}
+
+
+def allocate_budget(exposure: np.ndarray, capital: np.ndarray, budget: float) -> Dict[str, Any]:
+    """
+    Choose one option per utility (option 0 costs nothing) to minimize
+    total exposure with total capital <= budget.
+
+    Returns the chosen option per utility, capital spent, total exposure
+    and the LP bound on the lowest total exposure any allocation within
+    the budget could reach. The greedy is compared with funding the first
+    upgrade it couldn't afford ahead of everything else, so it reduces
+    exposure by at least half of what the optimum does.
+    """
+    benefit = exposure[:, :1] - exposure
+    capital = capital - capital[:, :1]
+    # Options the whole budget can't pay for become copies of option 0
+    unaffordable = capital > budget
+    steps = upgrade_steps(np.where(unaffordable, 0.0, capital), np.where(unaffordable, 0.0, benefit))
+    order = np.lexsort((steps["step"], steps["utility"], -steps["efficiency"]))
+    cost = steps["cost"][order]
+    gain = steps["gain"][order]
+    utility = steps["utility"][order]
+    step = steps["step"][order]
+    option = steps["option"][order]
+
+    n = len(exposure)
+    none = np.zeros(len(cost), dtype=bool)
+    best = _greedy_pass(cost, gain, utility, option, budget, none, np.zeros(n, dtype=np.int64))
+    bound = best["gained"]
+    critical = best["critical"]
+    if critical is not None:
+        # LP relaxation: the greedy prefix plus the fitting part of the critical step
+        prefix = cost[:critical]
+        bound = float(gain[:critical].sum()) + gain[critical] * (budget - prefix.sum()) / cost[critical]
+        alone = (utility == utility[critical]) & (step <= step[critical])
+        if cost[alone].sum() <= budget:
+            choice = np.zeros(n, dtype=np.int64)
+            choice[utility[critical]] = option[critical]
+            other = _greedy_pass(cost, gain, utility, option, budget, alone, choice)
+            if other["gained"] > best["gained"]:
+                best = other
+
+    untreated = float(exposure[:, 0].sum())
+    return {
+        "choice": best["choice"],
+        "capital_spent": best["spent"],
+        "exposure": untreated - best["gained"],
+        "untreated_exposure": untreated,
+        "exposure_bound": untreated - bound,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FLEET ENTRY POINTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def optimize_fleet(
+    population_served: np.ndarray,
+    daily_flow_mgd: np.ndarray,
+    years_of_exposure: np.ndarray,
+    concentrations: np.ndarray,
+    budget: Optional[float] = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Per-utility best option and, with a budget, the fleet allocation.
+
+    kwargs go to option_exposure. Without a budget every utility gets
+    its best option.
+    """
+    result = option_exposure(population_served, daily_flow_mgd, years_of_exposure, concentrations, **kwargs)
+    exposure = result["exposure"]
+    best = exposure.argmin(axis=1)
+    result["best"] = best
+    if budget is None:
+        everyone = np.arange(len(best))
+        result.update(
+            choice=best,
+            capital_spent=float(result["capital"][everyone, best].sum()),
+            exposure_total=float(exposure[everyone, best].sum()),
+            untreated_exposure=float(exposure[:, 0].sum()),
+            exposure_bound=float(exposure[everyone, best].sum()),
+        )
+    else:
+        allocation = allocate_budget(exposure, result["capital"], budget)
+        result.update(
+            choice=allocation["choice"],
+            capital_spent=allocation["capital_spent"],
+            exposure_total=allocation["exposure"],
+            untreated_exposure=allocation["untreated_exposure"],
+            exposure_bound=allocation["exposure_bound"],
+        )
+    result["budget"] = budget
+    return result
+
+
+def optimize_profiles(profiles: Iterable[UtilityProfile], budget: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+    """Convenience wrapper: columnarize profiles and optimize them."""
+    return optimize_fleet(**profiles_to_arrays(profiles), budget=budget, **kwargs)
+
+
+def optimization_rows(profiles: Sequence[UtilityProfile], result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One flat row per utility: allocated and unconstrained best options."""
+    options = result["options"]
+    exposure = result["exposure"]
+    rows = []
+    for i, profile in enumerate(profiles):
+        chosen = int(result["choice"][i])
+        best = int(result["best"][i])
+        rows.append({
+            "name": profile.name,
+            "utility_id": profile.utility_id,
+            "state": profile.state,
+            "technology": options[chosen],
+            "capital": float(result["capital"][i, chosen]),
+            "exposure": float(exposure[i, chosen]),
+            "in_compliance": bool(result["in_compliance"][i, chosen]),
+            "untreated_exposure": float(exposure[i, 0]),
+            "best_technology": options[best],
+            "best_exposure": float(exposure[i, best]),
+        })
+    return rows
+
+
+def format_allocation(result: Dict[str, Any]) -> str:
+    """One-line fleet summary for the CLI."""
+    from utility_exposure_calculator import format_currency
+
+    counts = np.bincount(result["choice"], minlength=len(result["options"]))
+    mix = ", ".join(f"{option} {count:,}" for option, count in zip(result["options"], counts.tolist()) if count)
+    budget = "unlimited" if result["budget"] is None else format_currency(result["budget"])
+    gap = result["exposure_total"] - result["exposure_bound"]
+    return (
+        f"Capital {format_currency(result['capital_spent'])} of {budget}; exposure "
+        f"{format_currency(result['untreated_exposure'])} -> {format_currency(result['exposure_total'])} "
+        f"(within {format_currency(gap)} of optimal); {mix}"
+    )
+
+
+def print_optimization(profile: UtilityProfile, result: Dict[str, Any]) -> None:
+    """Print every option of a single utility, best first."""
+    from utility_exposure_calculator import format_currency
+
+    exposure = result["exposure"][0]
+    print("\n" + "="*70)
+    print("   PFAS TREATMENT TECHNOLOGY SELECTION")
+    print("="*70)
+    print(f"\nUtility: {profile.name}")
+    print("\n" + "-"*70)
+    print(f"{'Technology':<18}{'Capital':>14}{'Exposure':>16}  {'Compliance':<12}")
+    print("-"*70)
+    for j in np.argsort(exposure, kind="stable").tolist():
+        status = "✅ MEETS MCLs" if result["in_compliance"][0, j] else "❌ EXCEEDS"
+        print(f"{result['options'][j]:<18}{format_currency(result['capital'][0, j]):>14}"
+              f"{format_currency(exposure[j]):>16}  {status:<12}")
+    chosen = int(result["choice"][0])
+    print(f"\nRecommended: {result['options'][chosen].upper()}")
+    print("\n" + "="*70 + "\n")
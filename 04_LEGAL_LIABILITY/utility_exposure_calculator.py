@@ -19,12 +19,15 @@ Author: Genesis Platform Inc.
 License: CC BY-NC-ND 4.0
 """
 
-import json
+import sys
+import math
 import argparse
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Mapping, Optional, Tuple, Union
 from datetime import datetime
 
+from technology_catalog import TechnologyCatalog, get_catalog, set_catalog
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CONSTANTS (based on public data)
@@ -39,6 +42,23 @@ EPA_LIMITS = {
     "HFPO-DA": 10.0,  # GenX
 }
 
+# Hazard Index MCL for mixtures of two or more of PFHxS, PFNA, HFPO-DA and
+# PFBS: the sum of each concentration over its health-based water
+# concentration (HBWC, ppt) may not exceed 1 (see 01_THE_PROBLEM/EPA_REGULATIONS_2024.md)
+HAZARD_INDEX_HBWC = {
+    "PFHxS": 9.0,
+    "PFNA": 10.0,
+    "HFPO-DA": 10.0,
+    "PFBS": 2000.0,
+}
+HAZARD_INDEX_WEIGHTS = {compound: 1 / hbwc for compound, hbwc in HAZARD_INDEX_HBWC.items()}
+HAZARD_INDEX_MCL = 1.0
+HAZARD_INDEX_MIN_COMPOUNDS = 2
+HAZARD_INDEX = "Hazard Index"  # penalty / violation_days key
+
+# Every compound the model reads (MCL compounds, then PFBS)
+MODEL_COMPOUNDS = tuple(dict.fromkeys([*EPA_LIMITS, *HAZARD_INDEX_HBWC]))
+
 # Penalty rate (per day, per violation) - 2024 rate
 EPA_PENALTY_RATE = 70117  # dollars
 
@@ -50,50 +70,74 @@ PER_CAPITA_LIABILITY = {
     "high": 100,    # Based on higher-value claims
 }
 
-# Treatment cost estimates (per 1000 gallons treated)
-TREATMENT_COSTS = {
-    "gac": {"capital_per_mgd": 800000, "om_per_1000gal": 0.75},
-    "ix": {"capital_per_mgd": 1200000, "om_per_1000gal": 0.50},
-    "ro": {"capital_per_mgd": 2000000, "om_per_1000gal": 1.50},
-    "novel": {"capital_per_mgd": 600000, "om_per_1000gal": 0.35},  # Projected
-}
+# Treatment technology parameters (capital, O&M, replacement interval,
+# disposal, removal) come from the shared TechnologyCatalog, loaded from
+# 02_CURRENT_SOLUTIONS_FAIL/cost_comparison.csv (or --cost-table).
+
+# O&M models: the cost table's flat O&M at its replacement interval, or
+# media change-outs at the interval predicted from the utility's influent
+# (see breakthrough_model; its curve parameters are illustrative)
+OM_MODELS = ("flat", "breakthrough")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # DATA CLASSES
 # ─────────────────────────────────────────────────────────────────────────────
 
-@dataclass
+# Compounds without an MCL never exceed it
+_NO_LIMIT = float("inf")
+
+# Assigns the derived fields of frozen dataclasses in __post_init__
+_set_frozen = object.__setattr__
+
+
+@dataclass(frozen=True, slots=True)
 class PFASResult:
-    """Individual PFAS measurement result."""
+    """
+    Individual PFAS measurement result.
+    
+    The MCL, exceedance flag and exceedance factor are computed once at
+    construction; results are immutable so they can't go stale.
+    """
     compound: str
     concentration_ppt: float
+    mcl_ppt: float = field(init=False, repr=False, compare=False)
+    exceeds_mcl: bool = field(init=False, repr=False, compare=False)
+    exceedance_factor: float = field(init=False, repr=False, compare=False)
     
-    @property
-    def exceeds_mcl(self) -> bool:
-        limit = EPA_LIMITS.get(self.compound, float("inf"))
-        return self.concentration_ppt > limit
-    
-    @property
-    def exceedance_factor(self) -> float:
-        limit = EPA_LIMITS.get(self.compound, float("inf"))
+    def __post_init__(self):
+        concentration = self.concentration_ppt
+        limit = EPA_LIMITS.get(self.compound, _NO_LIMIT)
         if limit == 0:
-            return float("inf") if self.concentration_ppt > 0 else 0
-        return max(0, (self.concentration_ppt / limit) - 1)
+            factor = float("inf") if concentration > 0 else 0
+        else:
+            factor = max(0, (concentration / limit) - 1)
+        _set_frozen(self, "mcl_ppt", limit)
+        _set_frozen(self, "exceeds_mcl", concentration > limit)
+        _set_frozen(self, "exceedance_factor", factor)
 
 
-@dataclass  
+@dataclass(slots=True)
 class UtilityProfile:
     """Water utility characteristics."""
     name: str
     population_served: int
     daily_flow_mgd: float  # Million gallons per day
-    pfas_results: list  # List of PFASResult
+    pfas_results: List[PFASResult]
     years_of_exposure: int = 5  # Estimated years of undetected exposure
+    utility_id: Optional[str] = None  # e.g. EPA PWSID
+    state: Optional[str] = None  # Two-letter state code
+    # Days in violation per compound, when derived from monitoring data
+    # (see compliance_timeseries); overrides the report's violation_days
+    violation_days: Optional[Dict[str, int]] = None
+    
+    @property
+    def hazard_index(self) -> float:
+        return mixture_hazard_index({r.compound: r.concentration_ppt for r in self.pfas_results})
     
     @property
     def in_compliance(self) -> bool:
-        return not any(r.exceeds_mcl for r in self.pfas_results)
+        return not any(r.exceeds_mcl for r in self.pfas_results) and self.hazard_index <= HAZARD_INDEX_MCL
     
     @property
     def total_exceedance_factor(self) -> float:
@@ -104,38 +148,78 @@ class UtilityProfile:
 # CALCULATION FUNCTIONS
 # ─────────────────────────────────────────────────────────────────────────────
 
+def mixture_hazard_index(levels: Mapping[str, float]) -> float:
+    """
+    Hazard Index of compound -> ppt levels (0 with fewer than two of the
+    mixture compounds detected).
+    
+    Summed in HAZARD_INDEX_HBWC order, as exposure_engine.hazard_index does.
+    """
+    total = 0.0
+    present = 0
+    for compound, weight in HAZARD_INDEX_WEIGHTS.items():
+        level = levels.get(compound, 0.0)
+        if level > 0:
+            total += level * weight
+            present += 1
+    return total if present >= HAZARD_INDEX_MIN_COMPOUNDS else 0.0
+
+
 def calculate_regulatory_penalties(
     profile: UtilityProfile,
-    violation_days: int = 365
+    violation_days: Union[int, Mapping[str, int]] = 365
 ) -> Dict[str, float]:
     """
     Calculate potential EPA MCL violation penalties.
     
-    Penalties are assessed per compound, per day of violation.
+    Penalties are assessed per compound, per day of violation; a Hazard
+    Index above its MCL is one more violation (keyed HAZARD_INDEX).
+    violation_days is either one figure for every violation or a mapping
+    by compound (entries missing from it have 0 days).
     """
     if profile.in_compliance:
         return {"total": 0, "per_compound": {}, "note": "In compliance - no penalties"}
     
     violating_compounds = [r for r in profile.pfas_results if r.exceeds_mcl]
+    hazard_index = profile.hazard_index
     per_compound = {}
+    by_compound = isinstance(violation_days, Mapping)
     
     for result in violating_compounds:
-        penalty = EPA_PENALTY_RATE * violation_days
+        days = violation_days.get(result.compound, 0) if by_compound else violation_days
+        penalty = EPA_PENALTY_RATE * days
         per_compound[result.compound] = {
             "daily_penalty": EPA_PENALTY_RATE,
             "annual_penalty": penalty,
             "concentration_ppt": result.concentration_ppt,
-            "mcl_ppt": EPA_LIMITS[result.compound],
+            "mcl_ppt": result.mcl_ppt,
             "exceedance_factor": result.exceedance_factor,
         }
+        if by_compound:
+            per_compound[result.compound]["violation_days"] = days
+    
+    if hazard_index > HAZARD_INDEX_MCL:
+        days = violation_days.get(HAZARD_INDEX, 0) if by_compound else violation_days
+        per_compound[HAZARD_INDEX] = {
+            "daily_penalty": EPA_PENALTY_RATE,
+            "annual_penalty": EPA_PENALTY_RATE * days,
+            "hazard_index": hazard_index,
+            "mcl": HAZARD_INDEX_MCL,
+            "exceedance_factor": hazard_index / HAZARD_INDEX_MCL - 1,
+        }
+        if by_compound:
+            per_compound[HAZARD_INDEX]["violation_days"] = days
     
     total = sum(p["annual_penalty"] for p in per_compound.values())
+    violations = f"{len(violating_compounds)} compounds"
+    if HAZARD_INDEX in per_compound:
+        violations = f"{violations} and the Hazard Index" if violating_compounds else "the Hazard Index"
     
     return {
         "total": total,
         "per_compound": per_compound,
-        "violation_days": violation_days,
-        "note": f"Penalties for {len(violating_compounds)} compounds exceeding MCL",
+        "violation_days": dict(violation_days) if by_compound else violation_days,
+        "note": f"Penalties for {violations} exceeding MCL",
     }
 
 
@@ -154,15 +238,25 @@ def calculate_litigation_exposure(
             "high": 0,
             "note": "In compliance - reduced litigation risk",
         }
-    
+    return litigation_from_exceedance(
+        profile.population_served, profile.years_of_exposure, profile.total_exceedance_factor
+    )
+
+
+def litigation_from_exceedance(
+    population_served: int,
+    years_of_exposure: int,
+    total_exceedance_factor: float,
+) -> Dict[str, Any]:
+    """Litigation exposure of a utility out of compliance, from its summed exceedance."""
     # Affected population estimate (assume 80% of served population)
-    affected_population = int(profile.population_served * 0.8)
+    affected_population = int(population_served * 0.8)
     
     # Exceedance multiplier (higher exposure = higher damages)
-    exceedance_mult = min(1 + profile.total_exceedance_factor * 0.1, 3.0)
+    exceedance_mult = min(1 + total_exceedance_factor * 0.1, 3.0)
     
     # Duration multiplier
-    duration_mult = min(1 + profile.years_of_exposure * 0.05, 2.0)
+    duration_mult = min(1 + years_of_exposure * 0.05, 2.0)
     
     # Calculate estimates
     low = affected_population * PER_CAPITA_LIABILITY["low"] * exceedance_mult
@@ -180,26 +274,185 @@ def calculate_litigation_exposure(
     }
 
 
+def annuity_factor(years: int, discount_rate: float, escalation_rate: float = 0.0) -> float:
+    """
+    Present value of a payment of 1 at the end of year 1, growing at
+    escalation_rate for `years` years (closed-form growing annuity).
+    """
+    if years <= 0:
+        return 0.0
+    if math.isclose(discount_rate, escalation_rate):
+        return years / (1 + discount_rate)
+    ratio = (1 + escalation_rate) / (1 + discount_rate)
+    return (1 - ratio ** years) / (discount_rate - escalation_rate)
+
+
+def replacement_factor(
+    years: int,
+    interval: float,
+    discount_rate: float,
+    escalation_rate: float = 0.0,
+) -> Tuple[int, float]:
+    """
+    Number of replacements in the horizon and the present value of a
+    replacement costing 1 (in today's dollars) at every `interval` years,
+    including one falling exactly at the end of the horizon.
+    """
+    if interval <= 0:
+        return 0, 0.0
+    count = int(math.floor(years / interval + 1e-9))
+    if count == 0:
+        return 0, 0.0
+    ratio = ((1 + escalation_rate) / (1 + discount_rate)) ** interval
+    if math.isclose(ratio, 1.0):
+        return count, float(count)
+    return count, ratio * (1 - ratio ** count) / (1 - ratio)
+
+
+def treatment_npv_per_mgd(
+    technology: str = "gac",
+    years: int = 20,
+    discount_rate: float = 0.03,
+    escalation_rate: float = 0.0,
+    catalog: Optional[TechnologyCatalog] = None,
+    replacement_interval: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Discounted life-cycle cost of 1 MGD of treatment capacity.
+    
+    Every component is linear in flow, so a utility's NPV is this result
+    scaled by its daily flow; fleets and sweeps can reuse it. A
+    replacement_interval (years) overrides the cost table's.
+    
+    O&M comes from the same OM_per_1000gal_USD rate as the simple sum.
+    That rate includes media disposal at the table's interval, so the
+    disposal share is split off and charged at each replacement instead,
+    plus the used share of the bed still in service at the horizon. With
+    no discounting or escalation the total equals the simple sum.
+    """
+    tech = (catalog or get_catalog()).technology(technology)
+    interval = replacement_interval or tech.replacement_interval_years
+    
+    # 1 MGD for a year = 365,000 thousand gallons
+    flat_om = tech.om_per_1000gal * 365000
+    disposal_per_event = tech.residuals_tons_per_mgd * tech.disposal_cost_per_ton
+    running_om = max(flat_om - disposal_per_event / tech.replacement_interval_years, 0.0)
+    annual_om = max(running_om + disposal_per_event / interval, 0.0) if replacement_interval else flat_om
+    
+    om_factor = annuity_factor(years, discount_rate, escalation_rate)
+    replacements, disposal_factor = replacement_factor(years, interval, discount_rate, escalation_rate)
+    in_service = max(years / interval - replacements, 0.0)
+    disposal_factor += in_service * ((1 + escalation_rate) / (1 + discount_rate)) ** years
+    
+    capital = tech.capital_per_mgd
+    total_om = running_om * om_factor
+    total_disposal = disposal_per_event * disposal_factor
+    return {
+        "technology": tech.key,
+        "capital": capital,
+        "annual_om": annual_om,
+        "total_om": total_om,
+        "replacements": replacements,
+        "disposal_per_replacement": disposal_per_event,
+        "total_disposal": total_disposal,
+        "total": capital + total_om + total_disposal,
+    }
+
+
+def calculate_treatment_npv(
+    profile: UtilityProfile,
+    technology: str = "gac",
+    years: int = 20,
+    discount_rate: float = 0.03,
+    escalation_rate: float = 0.0,
+    om_model: str = "flat",
+) -> Dict[str, Any]:
+    """
+    Calculate discounted treatment costs for PFAS removal.
+    
+    Capital is spent up front; O&M (net of media disposal) escalates
+    yearly and is discounted as a growing annuity; spent media is
+    disposed of at every replacement interval from cost_comparison.csv
+    (or, with the breakthrough O&M model, at the predicted media
+    change-out interval). All sums are closed-form.
+    """
+    changeout = media_changeout(profile, technology, om_model)
+    per_mgd = treatment_npv_per_mgd(technology, years, discount_rate, escalation_rate, replacement_interval=changeout)
+    flow = profile.daily_flow_mgd
+    annual_om = per_mgd["annual_om"] * flow
+    
+    costs = {
+        "technology": per_mgd["technology"],
+        "mode": "npv",
+        "capital": per_mgd["capital"] * flow,
+        "annual_om": annual_om,
+        "years": years,
+        "discount_rate": discount_rate,
+        "escalation_rate": escalation_rate,
+        "total_om": per_mgd["total_om"] * flow,
+        "replacements": per_mgd["replacements"],
+        "disposal_per_replacement": per_mgd["disposal_per_replacement"] * flow,
+        "total_disposal": per_mgd["total_disposal"] * flow,
+        "total": per_mgd["total"] * flow,
+        "cost_per_1000gal": annual_om / (365 * flow * 1000) if flow else 0.0,
+    }
+    if om_model != "flat":
+        costs.update(om_model=om_model, media_changeout_years=changeout)
+    return costs
+
+
+def media_changeout(profile: UtilityProfile, technology: str, om_model: str = "flat") -> Optional[float]:
+    """
+    Media change-out interval (years) under an O&M model: None for the
+    flat model and for technologies without adsorptive media.
+    """
+    if om_model not in OM_MODELS:
+        raise ValueError(f"Unknown O&M model '{om_model}' (choose from: {', '.join(OM_MODELS)})")
+    if om_model == "flat":
+        return None
+    from breakthrough_model import media_changeout_years
+    
+    key = get_catalog().technology(technology).key
+    return media_changeout_years(key, {r.compound: r.concentration_ppt for r in profile.pfas_results})
+
+
 def calculate_treatment_costs(
     profile: UtilityProfile,
     technology: str = "gac",
     years: int = 20,
+    discount_rate: Optional[float] = None,
+    escalation_rate: float = 0.0,
+    om_model: str = "flat",
 ) -> Dict[str, float]:
     """
     Calculate treatment costs for PFAS removal.
     
-    Includes capital costs and 20-year O&M.
+    Includes capital costs and O&M over the given horizon (default 20 years).
+    Unknown technologies raise ValueError.
+    With a discount_rate, returns the discounted NPV from
+    calculate_treatment_npv instead of the simple sum.
+    With om_model="breakthrough", media change-outs (residuals × disposal
+    cost each) happen at the interval predicted from the utility's
+    influent instead of the cost table's Replacement_Interval_Years.
     """
-    if technology not in TREATMENT_COSTS:
-        technology = "gac"
+    if discount_rate is not None:
+        return calculate_treatment_npv(profile, technology, years, discount_rate, escalation_rate, om_model)
     
-    costs = TREATMENT_COSTS[technology]
+    changeout = media_changeout(profile, technology, om_model)
+    tech = get_catalog().technology(technology)
+    flow = profile.daily_flow_mgd
     
     # Capital cost
-    capital = costs["capital_per_mgd"] * profile.daily_flow_mgd
+    capital = tech.capital_per_mgd * flow
     
     # Annual O&M (365 days × MGD × 1000 gal × cost per 1000 gal)
-    annual_om = 365 * profile.daily_flow_mgd * 1000 * costs["om_per_1000gal"]
+    annual_om = 365 * flow * 1000 * tech.om_per_1000gal
+    cost_per_1000gal = tech.om_per_1000gal
+    if changeout is not None:
+        # The flat rate includes change-outs at the table's interval
+        per_changeout = tech.residuals_tons_per_mgd * tech.disposal_cost_per_ton * flow
+        annual_om = max(annual_om + per_changeout * (1 / changeout - 1 / tech.replacement_interval_years), 0.0)
+        cost_per_1000gal = annual_om / (365 * flow * 1000) if flow else 0.0
     
     # Present value of O&M (simple sum, no discounting for educational purposes)
     total_om = annual_om * years
@@ -207,24 +460,71 @@ def calculate_treatment_costs(
     # Total
     total = capital + total_om
     
-    return {
-        "technology": technology,
+    costs = {
+        "technology": technology.lower(),
         "capital": capital,
         "annual_om": annual_om,
         "years": years,
         "total_om": total_om,
         "total": total,
-        "cost_per_1000gal": costs["om_per_1000gal"],
+        "cost_per_1000gal": cost_per_1000gal,
+    }
+    if om_model != "flat":
+        costs.update(om_model=om_model, media_changeout_years=changeout)
+    return costs
+
+
+def pfas_level(result: PFASResult) -> Dict[str, Any]:
+    """One entry of a report's "pfas_levels" section."""
+    return {
+        "compound": result.compound,
+        "concentration_ppt": result.concentration_ppt,
+        "mcl_ppt": EPA_LIMITS.get(result.compound, "N/A"),
+        "exceeds_mcl": result.exceeds_mcl,
+    }
+
+
+def hazard_index_section(profile: UtilityProfile) -> Dict[str, Any]:
+    """The report's "hazard_index" section: value, MCL and per-compound hazard quotients."""
+    levels = {r.compound: r.concentration_ppt for r in profile.pfas_results}
+    value = mixture_hazard_index(levels)
+    return {
+        "value": value,
+        "mcl": HAZARD_INDEX_MCL,
+        "exceeds_mcl": value > HAZARD_INDEX_MCL,
+        "hazard_quotients": {
+            compound: levels[compound] * weight
+            for compound, weight in HAZARD_INDEX_WEIGHTS.items()
+            if levels.get(compound, 0) > 0
+        },
     }
 
 
-def generate_liability_report(profile: UtilityProfile) -> Dict[str, Any]:
+def generate_liability_report(
+    profile: UtilityProfile,
+    generated_at: Optional[str] = None,
+    technology: str = "gac",
+    years: int = 20,
+    violation_days: Union[int, Mapping[str, int]] = 365,
+    discount_rate: Optional[float] = None,
+    escalation_rate: float = 0.0,
+    om_model: str = "flat",
+) -> Dict[str, Any]:
     """
     Generate comprehensive liability exposure report.
+    
+    Pass generated_at (ISO timestamp) to stamp a batch of reports with one
+    run time; otherwise the current time is used. A discount_rate switches
+    treatment costs to the discounted NPV mode, om_model="breakthrough"
+    derives media change-outs from the influent. Days in violation derived
+    from monitoring data (profile.violation_days) take precedence over
+    violation_days.
     """
-    regulatory = calculate_regulatory_penalties(profile)
+    if profile.violation_days is not None:
+        violation_days = profile.violation_days
+    regulatory = calculate_regulatory_penalties(profile, violation_days)
     litigation = calculate_litigation_exposure(profile)
-    treatment = calculate_treatment_costs(profile, "gac", 20)
+    treatment = calculate_treatment_costs(profile, technology, years, discount_rate, escalation_rate, om_model)
     
     # Total exposure estimates
     total_low = regulatory["total"] + litigation["low"] + treatment["total"]
@@ -234,19 +534,14 @@ def generate_liability_report(profile: UtilityProfile) -> Dict[str, Any]:
     return {
         "utility": {
             "name": profile.name,
+            "utility_id": profile.utility_id,
+            "state": profile.state,
             "population_served": profile.population_served,
             "daily_flow_mgd": profile.daily_flow_mgd,
             "years_of_exposure": profile.years_of_exposure,
         },
-        "pfas_levels": [
-            {
-                "compound": r.compound,
-                "concentration_ppt": r.concentration_ppt,
-                "mcl_ppt": EPA_LIMITS.get(r.compound, "N/A"),
-                "exceeds_mcl": r.exceeds_mcl,
-            }
-            for r in profile.pfas_results
-        ],
+        "pfas_levels": [pfas_level(r) for r in profile.pfas_results],
+        "hazard_index": hazard_index_section(profile),
         "compliance_status": profile.in_compliance,
         "regulatory_penalties": regulatory,
         "litigation_exposure": litigation,
@@ -256,7 +551,7 @@ def generate_liability_report(profile: UtilityProfile) -> Dict[str, Any]:
             "mid": total_mid,
             "high": total_high,
         },
-        "report_generated": datetime.now().isoformat(),
+        "report_generated": generated_at or datetime.now().isoformat(),
         "disclaimer": (
             "This report is for educational purposes only and does not constitute "
             "legal advice. Actual liability may vary significantly based on specific "
@@ -277,6 +572,12 @@ def format_currency(amount: float) -> str:
         return f"${amount:,.0f}"
 
 
+def format_json(report: Dict[str, Any]) -> str:
+    """Report as indented JSON (--json)."""
+    from report_output import dumps
+    return dumps(report, indent=True)
+
+
 def print_report(report: Dict[str, Any]) -> None:
     """Print formatted liability report."""
     print("\n" + "="*70)
@@ -299,6 +600,10 @@ def print_report(report: Dict[str, Any]) -> None:
         status = "❌ EXCEEDS" if r["exceeds_mcl"] else "✅ OK"
         print(f"{r['compound']:<12} {r['concentration_ppt']:<15.1f} {r['mcl_ppt']:<12} {status:<12}")
     
+    hi = report["hazard_index"]
+    status = "❌ EXCEEDS" if hi["exceeds_mcl"] else "✅ OK"
+    print(f"{'Hazard Index':<12} {hi['value']:<15.2f} {hi['mcl']:<12} {status:<12}")
+    
     compliance = "✅ IN COMPLIANCE" if report["compliance_status"] else "❌ NOT IN COMPLIANCE"
     print(f"\nOverall Status: {compliance}")
     
@@ -320,14 +625,21 @@ def print_report(report: Dict[str, Any]) -> None:
     print(f"Mid Estimate:  {format_currency(lit['mid'])}")
     print(f"High Estimate: {format_currency(lit['high'])}")
     
+    tx = report["treatment_costs"]
+    npv = tx.get("mode") == "npv"
     print("\n" + "-"*70)
-    print("TREATMENT COSTS (20-Year)")
+    print(f"TREATMENT COSTS ({tx['years']}-Year{' NPV' if npv else ''})")
     print("-"*70)
-    tx = report["treatment_costs"]
     print(f"Technology: {tx['technology'].upper()}")
     print(f"Capital Cost: {format_currency(tx['capital'])}")
     print(f"Annual O&M: {format_currency(tx['annual_om'])}")
-    print(f"Total (20-year): {format_currency(tx['total'])}")
+    if tx.get("media_changeout_years") is not None:
+        print(f"Media Change-out: every {tx['media_changeout_years']:.2f} years (illustrative breakthrough model)")
+    if npv:
+        print(f"Discount / Escalation: {tx['discount_rate']:.1%} / {tx['escalation_rate']:.1%}")
+        print(f"O&M excl. disposal (present value): {format_currency(tx['total_om'])}")
+        print(f"Disposal ({tx['replacements']} replacements, PV): {format_currency(tx['total_disposal'])}")
+    print(f"Total ({tx['years']}-year{' NPV' if npv else ''}): {format_currency(tx['total'])}")
     
     print("\n" + "="*70)
     print("TOTAL LIABILITY EXPOSURE")
@@ -352,7 +664,105 @@ def print_report(report: Dict[str, Any]) -> None:
 # MAIN
 # ─────────────────────────────────────────────────────────────────────────────
 
+def run_monte_carlo(profiles: list, args: argparse.Namespace) -> None:
+    """Run --monte-carlo for one utility (printed) or a fleet (--output rows)."""
+    from monte_carlo import load_distributions, monte_carlo_rows, print_monte_carlo, simulate_profiles
+    
+    try:
+        results = simulate_profiles(
+            profiles,
+            draws=args.monte_carlo,
+            distributions=load_distributions(args.mc_config),
+            seed=args.seed,
+            workers=args.workers,
+            technology=args.technology,
+            treatment_years=args.horizon,
+            discount_rate=args.discount_rate,
+            escalation_rate=args.escalation,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return
+    rows = monte_carlo_rows(profiles, results)
+    
+    if args.input:
+        from fleet import write_rows
+        write_rows(rows, args.output, args.format)
+    elif args.json:
+        from report_output import dumps
+        print(dumps(rows[0], indent=True))
+    else:
+        print_monte_carlo(rows[0], args.monte_carlo, results["percentiles"])
+
+
+def run_sweep(profiles, args: argparse.Namespace) -> None:
+    """Run --sweep over one or more profiles and write the tidy table."""
+    from fleet import write_rows
+    from scenario_sweep import parse_sweep, sweep_fleet
+    
+    defaults = {"tech": args.technology, "years": args.horizon, "violation_days": args.violation_days}
+    grid = parse_sweep(args.sweep, defaults)
+    if args.violation_days == "data" and grid["violation_days"] != ["data"]:
+        raise ValueError("--violation-days data takes each utility's days from --samples; "
+                         "drop the violation_days sweep axis")
+    # Tidy tables read best as CSV unless JSONL output is asked for
+    output_format = args.format or ("jsonl" if args.output.endswith(".jsonl") else "csv")
+    rows = sweep_fleet(profiles, grid, args.discount_rate, args.escalation)
+    write_rows(rows, args.output, output_format)
+
+
+def run_optimizer(profiles: list, args: argparse.Namespace) -> None:
+    """Run --optimize / --budget for one utility (printed) or a fleet (--output rows)."""
+    from technology_optimizer import format_allocation, optimization_rows, optimize_profiles, print_optimization
+    
+    result = optimize_profiles(
+        profiles,
+        budget=args.budget,
+        treatment_years=args.horizon,
+        violation_days=args.violation_days,
+        discount_rate=args.discount_rate,
+        escalation_rate=args.escalation,
+    )
+    
+    if args.input:
+        from fleet import write_rows
+        write_rows(optimization_rows(profiles, result), args.output, args.format)
+        print(format_allocation(result), file=sys.stderr)
+    elif args.json:
+        from report_output import dumps
+        print(dumps(optimization_rows(profiles, result)[0], indent=True))
+    else:
+        print_optimization(profiles[0], result)
+
+
+def write_fleet(profiles, args: argparse.Namespace, report_options: Dict[str, Any], cache=None) -> None:
+    """Score a fleet into --output, or into the --store Parquet dataset."""
+    if args.store:
+        from report_store import store_fleet
+        count = store_fleet(profiles, args.store, args.workers, report_options, cache)
+        print(f"Stored {count:,} reports in {args.store}", file=sys.stderr)
+        return
+    from fleet import run_fleet
+    run_fleet(args.input, args.output, args.format, workers=args.workers,
+              report_options=report_options, profiles=profiles, cache=cache)
+
+
+def violation_days_arg(value: str) -> Union[int, str]:
+    """--violation-days: a day count, or 'data' (derived from sample history)."""
+    if value == "data":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number of days or 'data', got '{value}'") from None
+
+
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        from scoring_service import main as serve_main
+        serve_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         description="PFAS Liability Exposure Calculator for Water Utilities",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -366,15 +776,63 @@ Examples:
   
   # JSON output
   python utility_exposure_calculator.py --population 100000 --flow 10 --pfoa 25 --json
+  
+  # Fleet (batch) mode: one report per row of a CSV or Parquet file
+  python utility_exposure_calculator.py --input fleet.csv --output reports.jsonl
+  
+  # Fleet mode across 8 worker processes (output keeps input order)
+  python utility_exposure_calculator.py --input fleet.csv --output reports.jsonl --workers 8
+  
+  # Sensitivity grid over technology, horizon and violation days
+  python utility_exposure_calculator.py --population 100000 --flow 10 --pfoa 25 \\
+      --sweep tech=gac,ix,ro,novel years=5..40:5 violation_days=90,180,365
+  
+  # Discounted (NPV) treatment costs from cost_comparison.csv
+  python utility_exposure_calculator.py --population 100000 --flow 10 --pfoa 25 \\
+      --technology ix_singleuse --discount-rate 0.03 --escalation 0.02
+  
+  # O&M from media change-outs predicted by the breakthrough-curve model
+  python utility_exposure_calculator.py --population 100000 --flow 10 --pfoa 25 --om-model breakthrough
+  
+  # Regional cost table instead of cost_comparison.csv
+  python utility_exposure_calculator.py --population 100000 --flow 10 --pfoa 25 \\
+      --cost-table costs_northeast.csv --technology ro
+  
+  # Monte Carlo P5/P50/P95 exposure (100k draws, 4 worker processes)
+  python utility_exposure_calculator.py --input fleet.csv --monte-carlo 100000 --seed 1 --workers 4
+  
+  # Lab sample export (UCMR5_All.txt) reduced to running annual averages
+  python utility_exposure_calculator.py --samples UCMR5_All.txt --input fleet.csv --output reports.jsonl
+  
+  # Penalize the days each compound's running annual average actually exceeded the MCL
+  python utility_exposure_calculator.py --samples UCMR5_All.txt --input fleet.csv --violation-days data
+  
+  # Keep each run's reports in a Parquet store, then query it without loading every report
+  python utility_exposure_calculator.py --input fleet.csv --store reports/
+  python report_store.py reports/ --where 'total_mid > $50M' --where 'pfos_exceedance > 3x'
+  
+  # Nightly run reusing the reports of utilities whose inputs didn't change
+  python utility_exposure_calculator.py --input fleet.csv --output reports.jsonl --cache reports.sqlite
+  
+  # Cheapest technology per utility, then the best fleet plan for a $250M capital budget
+  python utility_exposure_calculator.py --population 100000 --flow 10 --pfoa 25 --pfhxs 12 --optimize
+  python utility_exposure_calculator.py --input fleet.csv --output plan.csv --budget 250e6
+  
+  # Where a fleet run's time goes: per-stage latencies, plus a flamegraph-ready profile
+  python utility_exposure_calculator.py --input fleet.csv --output reports.jsonl --stats
+  python utility_exposure_calculator.py --input fleet.csv --output reports.jsonl --profile run.collapsed
+  
+  # Long-lived local HTTP/JSON service (POST /report, /reports; see scoring_service.py)
+  python utility_exposure_calculator.py serve --port 8765
         """
     )
     
     parser.add_argument("--name", type=str, default="Example Utility",
                        help="Utility name")
-    parser.add_argument("--population", type=int, required=True,
-                       help="Population served")
-    parser.add_argument("--flow", type=float, required=True,
-                       help="Daily flow in MGD (million gallons per day)")
+    parser.add_argument("--population", type=int,
+                       help="Population served (required unless --input is given)")
+    parser.add_argument("--flow", type=float,
+                       help="Daily flow in MGD (required unless --input is given)")
     parser.add_argument("--years", type=int, default=5,
                        help="Estimated years of exposure (default: 5)")
     
@@ -389,11 +847,171 @@ Examples:
                        help="PFNA concentration in ppt")
     parser.add_argument("--genx", type=float, default=0,
                        help="HFPO-DA (GenX) concentration in ppt")
+    parser.add_argument("--pfbs", type=float, default=0,
+                       help="PFBS concentration in ppt (Hazard Index only)")
     
     parser.add_argument("--json", action="store_true",
                        help="Output as JSON instead of formatted report")
     
+    # Treatment / penalty assumptions
+    parser.add_argument("--technology", type=str, default="gac",
+                       help="Treatment technology to price (default: gac)")
+    parser.add_argument("--horizon", type=int, default=20,
+                       help="Treatment cost horizon in years (default: 20)")
+    parser.add_argument("--violation-days", type=violation_days_arg, default=365,
+                       help="Days of MCL violation to penalize (default: 365), or 'data' to "
+                            "derive them per compound from --samples running annual averages")
+    parser.add_argument("--discount-rate", type=float,
+                       help="Discount treatment costs to NPV at this rate (e.g. 0.03), "
+                            "using cost_comparison.csv parameters")
+    parser.add_argument("--escalation", type=float, default=0.0,
+                       help="Annual cost escalation for --discount-rate (default: 0)")
+    parser.add_argument("--om-model", choices=OM_MODELS, default="flat",
+                       help="flat: cost table O&M; breakthrough: media change-outs at the interval "
+                            "predicted from the influent with illustrative breakthrough curves "
+                            "(default: flat)")
+    parser.add_argument("--cost-table", type=str,
+                       help="Technology cost table CSV (default: "
+                            "02_CURRENT_SOLUTIONS_FAIL/cost_comparison.csv)")
+    
+    # Fleet (batch) mode
+    parser.add_argument("--input", type=str,
+                       help="Fleet CSV, Parquet or binary .npy file (see fleet_binary.py) with one utility per row")
+    parser.add_argument("--output", type=str, default="-",
+                       help="Fleet output file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv", "arrow"],
+                       help="Fleet output format (default: from --output extension: .csv, "
+                            ".arrow/.feather, else jsonl)")
+    parser.add_argument("--samples", type=str,
+                       help="UCMR5-style lab sample file (one row per sample); --input then "
+                            "supplies utility metadata keyed by utility_id/PWSID")
+    parser.add_argument("--reduce", choices=["raa", "max", "mean"], default="raa",
+                       help="How --samples are reduced per compound (default: raa, "
+                            "running annual average)")
+    parser.add_argument("--presorted", action="store_true",
+                       help="--samples rows are grouped by utility (stream one utility at a time)")
+    parser.add_argument("--cache", type=str, metavar="PATH",
+                       help="SQLite report cache: unchanged utilities reuse their stored report")
+    parser.add_argument("--cache-size", type=int, default=1024, metavar="MB",
+                       help="Evict least recently used reports beyond this size (default: 1024)")
+    parser.add_argument("--store", type=str, metavar="DIR",
+                       help="Add the fleet's reports to a Parquet store partitioned by state and "
+                            "run date, instead of --output (query with report_store.py)")
+    
+    # Monte Carlo uncertainty mode
+    parser.add_argument("--monte-carlo", type=int, metavar="N",
+                       help="Sample N parameter draws and report exposure percentiles")
+    parser.add_argument("--mc-config", type=str,
+                       help="JSON file overriding the Monte Carlo parameter distributions")
+    parser.add_argument("--seed", type=int,
+                       help="Random seed for --monte-carlo (default: unseeded)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Worker processes (default: 1)")
+    
+    # Technology selection
+    parser.add_argument("--optimize", action="store_true",
+                       help="Pick the technology minimizing expected exposure after treatment "
+                            "(removal from the cost table)")
+    parser.add_argument("--budget", type=float, metavar="USD",
+                       help="Total capital budget for a fleet --optimize (implies --optimize)")
+    
+    # Scenario sweep
+    parser.add_argument("--sweep", nargs="+", metavar="AXIS=VALUES",
+                       help="Sweep tech=..., years=lo..hi[:step], violation_days=... "
+                            "and write one table row per grid cell")
+    
+    # Instrumentation
+    parser.add_argument("--stats", action="store_true",
+                       help="Print call counts and latency histograms per pipeline stage "
+                            "(penalties, litigation, treatment, report, output) to stderr")
+    parser.add_argument("--profile", type=str, metavar="PATH",
+                       help="Profile the run: collapsed stacks for a flamegraph if PATH ends "
+                            "in .collapsed or .folded, else cProfile stats (python -m pstats)")
+    
     args = parser.parse_args()
+    if not (args.stats or args.profile):
+        run(parser, args)
+        return
+    
+    from instrumentation import format_stage_stats, instrumented, profiling
+    with profiling(args.profile):
+        if not args.stats:
+            run(parser, args)
+            return
+        with instrumented() as stats:
+            run(parser, args)
+    print(format_stage_stats(stats), file=sys.stderr)
+
+
+def run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Everything main() does after parsing the command line."""
+    try:
+        catalog = set_catalog(args.cost_table) if args.cost_table else get_catalog()
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return
+    if args.technology not in catalog:
+        parser.error(f"unknown --technology '{args.technology}' (choose from: {', '.join(catalog.names())})")
+    
+    if args.om_model != "flat" and (args.sweep or args.monte_carlo is not None or args.optimize
+                                    or args.budget is not None):
+        parser.error(f"--om-model {args.om_model} is not supported with --sweep, --monte-carlo or --optimize")
+    
+    from_data = args.violation_days == "data"
+    if from_data and not args.samples:
+        parser.error("--violation-days data needs --samples with collection dates")
+    # The optimizer prices penalties on post-treatment levels and Monte Carlo
+    # draws its own violation days; neither can use the sampled history's
+    if from_data and (args.monte_carlo is not None or args.optimize or args.budget is not None):
+        parser.error("--violation-days data is not supported with --monte-carlo, --optimize or --budget")
+    
+    report_options = {
+        "technology": args.technology,
+        "years": args.horizon,
+        # Profiles built from the sample history carry their own violation days
+        "violation_days": 365 if from_data else args.violation_days,
+        "discount_rate": args.discount_rate,
+        "escalation_rate": args.escalation,
+        "om_model": args.om_model,
+    }
+    
+    if args.samples and not args.input:
+        parser.error("--samples needs --input with utility metadata (population, flow)")
+    
+    if args.input:
+        from fleet import read_fleet
+        try:
+            if from_data:
+                from compliance_timeseries import timeseries_profiles
+                profiles = timeseries_profiles(args.samples, args.input)
+            elif args.samples:
+                from sample_ingest import sample_profiles
+                profiles = sample_profiles(args.samples, args.input, args.reduce, args.presorted)
+            else:
+                profiles = read_fleet(args.input)
+            if args.sweep:
+                run_sweep(profiles, args)
+            elif args.monte_carlo is not None:
+                run_monte_carlo(list(profiles), args)
+            elif args.optimize or args.budget is not None:
+                run_optimizer(list(profiles), args)
+            elif args.cache:
+                import sqlite3
+                from report_cache import ReportCache, format_stats
+                try:
+                    with ReportCache(args.cache, max_bytes=args.cache_size << 20) as cache:
+                        write_fleet(profiles, args, report_options, cache)
+                        print(format_stats(cache.stats()), file=sys.stderr)
+                except sqlite3.Error as exc:
+                    raise ValueError(f"report cache {args.cache}: {exc}") from None
+            else:
+                write_fleet(profiles, args, report_options)
+        except (OSError, ValueError, ImportError) as exc:
+            print(f"Error: {exc}")
+        return
+    
+    if args.population is None or args.flow is None:
+        parser.error("--population and --flow are required unless --input is given")
     
     # Build PFAS results
     pfas_results = []
@@ -407,6 +1025,8 @@ Examples:
         pfas_results.append(PFASResult("PFNA", args.pfna))
     if args.genx > 0:
         pfas_results.append(PFASResult("HFPO-DA", args.genx))
+    if args.pfbs > 0:
+        pfas_results.append(PFASResult("PFBS", args.pfbs))
     
     if not pfas_results:
         print("Error: At least one PFAS concentration must be provided.")
@@ -422,11 +1042,30 @@ Examples:
         years_of_exposure=args.years,
     )
     
+    if args.sweep:
+        try:
+            run_sweep([profile], args)
+        except ValueError as exc:
+            print(f"Error: {exc}")
+        return
+    
+    if args.monte_carlo is not None:
+        run_monte_carlo([profile], args)
+        return
+    
+    if args.optimize or args.budget is not None:
+        run_optimizer([profile], args)
+        return
+    
     # Generate report
-    report = generate_liability_report(profile)
+    try:
+        report = generate_liability_report(profile, **report_options)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return
     
     if args.json:
-        print(json.dumps(report, indent=2, default=str))
+        print(format_json(report))
     else:
         print_report(report)
 
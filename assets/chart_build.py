@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Incremental, parallel build of the white paper charts
+
+Renders the charts of generate_charts.py in a process pool and skips any
+chart whose inputs haven't changed since its PNG was written, like make
+with a content-hash manifest (.chart_manifest.json next to the PNGs).
+A chart's hash covers:
+
+    - the source of its plot and data functions
+    - the rest of generate_charts.py (style, colors, helpers), which every
+      chart depends on
+    - its data inputs (the cost table for the cost chart, the
+      breakthrough model for the breakthrough curve)
+
+so editing one chart rebuilds only that chart. Each format set keeps its
+own manifest entry per chart, so alternating a default build with a
+--formats build doesn't rebuild everything. Every figure is closed
+after saving, and charts render with the non-interactive Agg backend.
+With --formats, each chart is written in those chart_output formats
+(vector and web rasters from one render) instead of the 300 DPI PNG, and
+the write time and size of every file are logged.
+
+Usage:
+    python chart_build.py                    # build what changed
+    python chart_build.py --jobs 4           # across 4 processes
+    python chart_build.py --force cost       # rebuild one chart regardless
+    python chart_build.py --formats svg,png-web,webp
+
+Requirements:
+    pip install matplotlib numpy pillow   # pillow for --formats
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import generate_charts
+from chart_output import OUTPUT_FORMATS, OutputFormat, format_output_report, parse_formats, render_chart_outputs
+from generate_charts import CHARTS, OUTPUT_DIR
+
+
+MANIFEST_NAME = ".chart_manifest.json"
+
+LIABILITY_DIR = Path(__file__).resolve().parent.parent / "04_LEGAL_LIABILITY"
+
+
+def _cost_table() -> bytes:
+    from technology_catalog import get_catalog
+    return get_catalog().fingerprint.encode()
+
+
+def _breakthrough_model() -> bytes:
+    return (LIABILITY_DIR / "breakthrough_model.py").read_bytes()
+
+
+# Chart name -> data inputs beyond generate_charts.py itself
+CHART_INPUTS: Dict[str, Tuple[Callable[[], bytes], ...]] = {
+    "breakthrough": (_breakthrough_model,),
+    "cost": (_cost_table,),
+}
+
+
+def style_preamble() -> str:
+    """generate_charts.py without its per-chart plot and data functions."""
+    source = Path(generate_charts.__file__).read_text(encoding="utf-8")
+    for plot, data, _ in CHARTS.values():
+        source = source.replace(inspect.getsource(plot), "").replace(inspect.getsource(data), "")
+    return source
+
+
+def chart_hash(name: str, preamble: Optional[str] = None, formats: Optional[Sequence[OutputFormat]] = None) -> str:
+    """Content hash of everything one chart is rendered from."""
+    plot, data, output = CHARTS[name]
+    digest = hashlib.sha256()
+    digest.update(repr(formats).encode())
+    digest.update((preamble if preamble is not None else style_preamble()).encode())
+    digest.update(inspect.getsource(plot).encode())
+    digest.update(inspect.getsource(data).encode())
+    digest.update(output.encode())
+    for read in CHART_INPUTS.get(name, ()):
+        digest.update(read())
+    return digest.hexdigest()
+
+
+def load_manifest(output_dir: Path) -> Dict[str, str]:
+    try:
+        return json.loads((output_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir: Path, manifest: Dict[str, str]) -> None:
+    # Written via a temporary file so an interrupted build can't corrupt it
+    path = output_dir / MANIFEST_NAME
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(temporary, path)
+
+
+def manifest_key(name: str, formats: Optional[Sequence[OutputFormat]] = None) -> str:
+    """A chart's manifest entry: its PNG filename, plus the format names with --formats."""
+    filename = CHARTS[name][2]
+    if formats is None:
+        return filename
+    return f"{filename} [{','.join(output.name for output in formats)}]"
+
+
+def output_paths(name: str, output_dir: Path, formats: Optional[Sequence[OutputFormat]] = None) -> List[Path]:
+    """The files one chart build writes."""
+    filename = CHARTS[name][2]
+    if formats is None:
+        return [Path(output_dir) / filename]
+    return [output.path(output_dir, Path(filename).stem) for output in formats]
+
+
+def render_chart(
+    name: str,
+    output_dir: Path,
+    formats: Optional[Sequence[OutputFormat]] = None,
+) -> Tuple[float, List[Dict[str, Any]]]:
+    """
+    Render one chart (to its PNG, or to formats) and close the figure.
+    Returns the seconds taken and, with formats, chart_output's per-file
+    rows (path, size, write time).
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    start = time.perf_counter()
+    rows: List[Dict[str, Any]] = []
+    if formats is not None:
+        rows = render_chart_outputs(name, output_dir, formats)
+    else:
+        plt = generate_charts.load_pyplot()
+        plot, _, output = CHARTS[name]
+        fig = plot(output_dir / output)
+        plt.close(fig)
+    return time.perf_counter() - start, rows
+
+
+def build_charts(
+    names: Optional[Sequence[str]] = None,
+    output_dir: Path = OUTPUT_DIR,
+    jobs: int = 1,
+    force: bool = False,
+    log: Callable[[str], None] = print,
+    formats: Optional[Sequence[OutputFormat]] = None,
+) -> List[str]:
+    """
+    Render the charts (default: all) whose hash changed or whose output
+    is missing; returns the names rendered. The manifest is updated after
+    each chart, so a failed build keeps the charts that did render.
+    """
+    names = list(names or CHARTS)
+    unknown = [name for name in names if name not in CHARTS]
+    if unknown:
+        raise ValueError(f"Unknown chart '{unknown[0]}' (choose from: {', '.join(CHARTS)})")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = load_manifest(output_dir)
+    preamble = style_preamble()
+    hashes = {name: chart_hash(name, preamble, formats) for name in names}
+    stale = [
+        name for name in names
+        if force or manifest.get(manifest_key(name, formats)) != hashes[name]
+        or not all(path.exists() for path in output_paths(name, output_dir, formats))
+    ]
+    for name in names:
+        if name not in stale:
+            log(f"Up to date: {', '.join(str(path) for path in output_paths(name, output_dir, formats))}")
+    if not stale:
+        return []
+
+    def done(name: str, result: Tuple[float, List[Dict[str, Any]]]) -> None:
+        seconds, rows = result
+        manifest[manifest_key(name, formats)] = hashes[name]
+        save_manifest(output_dir, manifest)
+        log(f"Built {name} in {seconds:.2f} s")
+        if rows:
+            log(format_output_report(rows))
+
+    if jobs <= 1 or len(stale) == 1:
+        for name in stale:
+            done(name, render_chart(name, output_dir, formats))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(stale))) as pool:
+            futures = {name: pool.submit(render_chart, name, output_dir, formats) for name in stale}
+            for name, future in futures.items():
+                done(name, future.result())
+    return stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("charts", nargs="*", metavar="CHART",
+                        help=f"Charts to build (default: all of {', '.join(CHARTS)})")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR,
+                        help="Where charts and the manifest go (default: assets/)")
+    parser.add_argument("--formats", help=f"Comma-separated output formats ({', '.join(OUTPUT_FORMATS)}); "
+                                          "default: the 300 DPI PNG")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        formats = parse_formats(args.formats) if args.formats else None
+        built = build_charts(args.charts, args.output_dir, args.jobs, args.force, formats=formats)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return
+    print(f"{len(built)} of {len(args.charts or CHARTS)} charts built in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Multi-format chart output: vector files and web-sized rasters in one pass
+
+The plot_* functions save a single 300 DPI PNG. This module writes a
+chart as any set of OUTPUT_FORMATS instead:
+
+    png       print PNG (300 DPI)
+    png-web   web PNG (100 DPI, 250 KB budget)        -> <chart>-web.png
+    webp      web WebP (100 DPI, 100 KB budget)
+    svg, pdf  vector
+
+The figure is rasterized once, at the highest DPI requested, and every
+raster format is resampled from that image; the tight bounding box is
+also computed once and shared by all formats. Vector formats are drawn
+by their own matplotlib backends. A raster over its byte budget is
+re-encoded smaller: PNGs drop to a 256-color palette, WebP steps down
+in quality, then both shrink until they fit (down to half their DPI).
+Every write is reported with its time, size and DPI actually used.
+
+Usage:
+    python chart_output.py                                # all charts, all formats
+    python chart_output.py cost --formats svg,webp
+    python chart_output.py --dpi webp=150 --max-bytes webp=150000
+
+Requirements:
+    pip install matplotlib numpy pillow
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import argparse
+import io
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from generate_charts import CHARTS, OUTPUT_DIR, load_pyplot
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    """One output file of a chart: <chart><suffix>.<extension>."""
+    name: str
+    extension: str
+    dpi: Optional[int] = None          # None for vector formats
+    max_bytes: Optional[int] = None    # raster byte budget
+    suffix: str = ""
+
+    @property
+    def vector(self) -> bool:
+        return self.dpi is None
+
+    def path(self, output_dir: Path, stem: str) -> Path:
+        return Path(output_dir) / f"{stem}{self.suffix}.{self.extension}"
+
+
+OUTPUT_FORMATS: Dict[str, OutputFormat] = {
+    "png": OutputFormat("png", "png", dpi=300),
+    "png-web": OutputFormat("png-web", "png", dpi=100, max_bytes=250_000, suffix="-web"),
+    "webp": OutputFormat("webp", "webp", dpi=100, max_bytes=100_000),
+    "svg": OutputFormat("svg", "svg"),
+    "pdf": OutputFormat("pdf", "pdf"),
+}
+
+# Quality steps tried for a WebP over budget, and the smallest scale a
+# raster over budget shrinks to
+WEBP_QUALITIES = (90, 80, 70, 60, 50)
+MIN_BUDGET_SCALE = 0.5
+
+# SVG text stays text (a fraction of the size of glyph outlines)
+VECTOR_RC = {'svg.fonttype': 'none'}
+
+
+def parse_formats(
+    names: str,
+    dpi: Sequence[str] = (),
+    max_bytes: Sequence[str] = (),
+) -> List[OutputFormat]:
+    """
+    OutputFormats from a comma-separated list of OUTPUT_FORMATS names with
+    FORMAT=VALUE DPI and byte-budget overrides (raises ValueError).
+    """
+    formats = {}
+    for name in filter(None, (part.strip() for part in names.split(","))):
+        if name not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown format '{name}' (choose from: {', '.join(OUTPUT_FORMATS)})")
+        formats[name] = OUTPUT_FORMATS[name]
+    if not formats:
+        raise ValueError("No output formats given")
+    for option, field, overrides in (("--dpi", "dpi", dpi), ("--max-bytes", "max_bytes", max_bytes)):
+        for override in overrides:
+            name, _, value = override.partition("=")
+            if name not in formats:
+                raise ValueError(f"{option} {override}: '{name}' is not one of the requested formats")
+            if formats[name].vector:
+                raise ValueError(f"{option} {override}: '{name}' is a vector format")
+            try:
+                number = int(value)
+            except ValueError:
+                raise ValueError(f"{option} {override}: expected FORMAT=INTEGER") from None
+            if number <= 0:
+                raise ValueError(f"{option} {override}: must be positive")
+            formats[name] = replace(formats[name], **{field: number})
+    return list(formats.values())
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RASTER ENCODING
+# ─────────────────────────────────────────────────────────────────────────────
+
+def rasterize(fig, dpi: int, bbox=None):
+    """The figure (cropped to bbox, in inches) drawn once by Agg, as an RGB PIL image."""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="rgba", dpi=dpi, bbox_inches=bbox)
+    # matplotlib truncates the (cropped) figure size in pixels after its own
+    # float transforms, which can land one pixel off ours; the buffer
+    # length settles it
+    width, height = fig.get_size_inches() if bbox is None else (bbox.width, bbox.height)
+    pixels = len(buffer.getbuffer()) // 4
+    size = next(
+        (w, h)
+        for w in (int(width * dpi), int(width * dpi) + 1, int(width * dpi) - 1)
+        for h in (int(height * dpi), int(height * dpi) + 1, int(height * dpi) - 1)
+        if w * h == pixels
+    )
+    return Image.frombuffer("RGBA", size, buffer.getbuffer(), "raw", "RGBA", 0, 1).convert("RGB")
+
+
+def _encode(image, output: OutputFormat, reduced: int) -> bytes:
+    """One encoding of image; reduced counts the budget steps taken so far."""
+    buffer = io.BytesIO()
+    if output.extension == "webp":
+        quality = WEBP_QUALITIES[min(reduced, len(WEBP_QUALITIES) - 1)]
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    elif reduced:
+        image.quantize(colors=256).save(buffer, format="PNG", optimize=True)
+    else:
+        image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def encode_raster(image, source_dpi: int, output: OutputFormat) -> Tuple[bytes, int]:
+    """
+    Encode image (rendered at source_dpi) for output, within its byte
+    budget where possible. Returns the bytes and the DPI they are at.
+    """
+    from PIL import Image
+
+    scale = output.dpi / source_dpi
+    resized = image if scale == 1 else image.resize(
+        (round(image.width * scale), round(image.height * scale)), Image.LANCZOS
+    )
+    data = _encode(resized, output, 0)
+    if output.max_bytes is None:
+        return data, output.dpi
+
+    # Lossier encodings first, then smaller images
+    steps = len(WEBP_QUALITIES) - 1 if output.extension == "webp" else 1
+    reduced = 0
+    while len(data) > output.max_bytes and reduced < steps:
+        reduced += 1
+        data = _encode(resized, output, reduced)
+    shrink = 1.0
+    while len(data) > output.max_bytes and shrink > MIN_BUDGET_SCALE:
+        # Bytes scale roughly with pixel count
+        shrink = max(MIN_BUDGET_SCALE, shrink * min(0.9, (output.max_bytes / len(data)) ** 0.5))
+        smaller = resized.resize((round(resized.width * shrink), round(resized.height * shrink)), Image.LANCZOS)
+        data = _encode(smaller, output, reduced)
+    return data, round(output.dpi * shrink)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PIPELINE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def tight_bbox(fig, dpi: Optional[float] = None):
+    """
+    The savefig bounding box (inches) under the current style, or None.
+
+    Text extents depend slightly on DPI; measure at the raster DPI to crop
+    exactly as savefig would.
+    """
+    import matplotlib
+
+    if matplotlib.rcParams["savefig.bbox"] != "tight":
+        return None
+    pad = matplotlib.rcParams["savefig.pad_inches"]
+    original = fig.dpi
+    fig.dpi = dpi or original
+    try:
+        return fig.get_tightbbox(fig.canvas.get_renderer()).padded(pad)
+    finally:
+        fig.dpi = original
+
+
+def write_outputs(fig, stem: str, output_dir: Path, formats: Sequence[OutputFormat]) -> List[Dict[str, Any]]:
+    """
+    Write fig as every format; returns one report row per file (path,
+    bytes, budget, DPI used, seconds).
+    """
+    from matplotlib import rc_context
+
+    output_dir = Path(output_dir)
+    rasters = [output for output in formats if not output.vector]
+    source_dpi = max((output.dpi for output in rasters), default=None)
+    bbox = tight_bbox(fig, source_dpi)
+    rows = []
+
+    if rasters:
+        start = time.perf_counter()
+        image = rasterize(fig, source_dpi, bbox)
+        # The shared render is charted to the first raster
+        render_seconds = time.perf_counter() - start
+        for output in rasters:
+            start = time.perf_counter()
+            data, dpi = encode_raster(image, source_dpi, output)
+            path = output.path(output_dir, stem)
+            path.write_bytes(data)
+            rows.append(_row(output, path, len(data), dpi, time.perf_counter() - start + render_seconds))
+            render_seconds = 0.0
+
+    for output in formats:
+        if output.vector:
+            start = time.perf_counter()
+            path = output.path(output_dir, stem)
+            with rc_context(VECTOR_RC):
+                fig.savefig(path, format=output.extension, bbox_inches=bbox)
+            rows.append(_row(output, path, path.stat().st_size, None, time.perf_counter() - start))
+    return rows
+
+
+def _row(output: OutputFormat, path: Path, size: int, dpi: Optional[int], seconds: float) -> Dict[str, Any]:
+    return {
+        "path": path,
+        "format": output.name,
+        "bytes": size,
+        "max_bytes": output.max_bytes,
+        "within_budget": output.max_bytes is None or size <= output.max_bytes,
+        "dpi": dpi,
+        "seconds": seconds,
+    }
+
+
+def render_chart_outputs(name: str, output_dir: Path, formats: Sequence[OutputFormat]) -> List[Dict[str, Any]]:
+    """Draw one chart of generate_charts.CHARTS and write it in every format."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    plt = load_pyplot()
+    plot, _, filename = CHARTS[name]
+    fig = plot(None)
+    try:
+        return write_outputs(fig, Path(filename).stem, output_dir, formats)
+    finally:
+        plt.close(fig)
+
+
+def format_output_report(rows: Sequence[Dict[str, Any]]) -> str:
+    lines = [f"{'File':<40}{'DPI':>6}{'Size':>12}{'Budget':>12}{'Time':>10}"]
+    for row in rows:
+        budget = f"{row['max_bytes'] / 1000:,.0f} KB" if row["max_bytes"] else "-"
+        over = "" if row["within_budget"] else "  OVER BUDGET"
+        lines.append(
+            f"{row['path'].name:<40}{row['dpi'] or 'vec':>6}{row['bytes'] / 1000:>9,.1f} KB"
+            f"{budget:>12}{row['seconds'] * 1000:>8.0f} ms{over}"
+        )
+    total = sum(row["bytes"] for row in rows)
+    seconds = sum(row["seconds"] for row in rows)
+    lines.append(f"{len(rows)} files, {total / 1e6:.2f} MB, {seconds:.2f} s")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("charts", nargs="*", metavar="CHART",
+                        help=f"Charts to write (default: all of {', '.join(CHARTS)})")
+    parser.add_argument("--formats", default=",".join(OUTPUT_FORMATS),
+                        help=f"Comma-separated formats (default: {','.join(OUTPUT_FORMATS)})")
+    parser.add_argument("--dpi", action="append", default=[], metavar="FORMAT=DPI",
+                        help="Override a raster format's DPI (repeatable)")
+    parser.add_argument("--max-bytes", action="append", default=[], metavar="FORMAT=BYTES",
+                        help="Override a raster format's byte budget (repeatable)")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help="Default: assets/")
+    args = parser.parse_args()
+
+    try:
+        formats = parse_formats(args.formats, args.dpi, args.max_bytes)
+        unknown = [name for name in args.charts if name not in CHARTS]
+        if unknown:
+            raise ValueError(f"Unknown chart '{unknown[0]}' (choose from: {', '.join(CHARTS)})")
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        rows = [row for name in args.charts or CHARTS for row in render_chart_outputs(name, args.output_dir, formats)]
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return
+    print(format_output_report(rows))
+
+
+if __name__ == "__main__":
+    main()
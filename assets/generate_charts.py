@@ -15,20 +15,25 @@ Usage:
     python generate_charts.py --all          # Generate all charts
     python generate_charts.py --binding      # Just binding energy comparison
     python generate_charts.py --breakthrough # Just breakthrough curve
+
+matplotlib, numpy and the calculator modules are imported on first use:
+importing this module (or running --help) stays cheap, and each chart's
+data is available without plotting from its *_data() function.
 """
 
 import argparse
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+import sys
 from pathlib import Path
 
+# Treatment parameters are shared with the liability calculator
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "04_LEGAL_LIABILITY"))
+
 # ─────────────────────────────────────────────────────────────────────────────
 # STYLE CONFIGURATION
 # ─────────────────────────────────────────────────────────────────────────────
 
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams.update({
+STYLE_SHEET = 'seaborn-v0_8-whitegrid'
+STYLE_RC = {
     'font.family': 'sans-serif',
     'font.sans-serif': ['Arial', 'Helvetica', 'DejaVu Sans'],
     'font.size': 11,
@@ -38,7 +43,7 @@ plt.rcParams.update({
     'figure.dpi': 150,
     'savefig.dpi': 300,
     'savefig.bbox': 'tight',
-})
+}
 
 # Color palette
 COLORS = {
@@ -52,29 +57,54 @@ COLORS = {
 
 OUTPUT_DIR = Path(__file__).parent
 
+_styled = False
+
+
+def load_pyplot():
+    """matplotlib.pyplot with the white paper style applied (on first call)."""
+    global _styled
+    import matplotlib.pyplot as plt
+
+    if not _styled:
+        plt.style.use(STYLE_SHEET)
+        plt.rcParams.update(STYLE_RC)
+        _styled = True
+    return plt
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CHART 1: BINDING ENERGY COMPARISON
 # ─────────────────────────────────────────────────────────────────────────────
 
-def plot_binding_energy_comparison(output_path: Path = None):
+def binding_energy_data():
     """
-    Bar chart comparing binding energies of current vs required technology.
+    Binding energies (kJ/mol) of current vs required technology.
     
     Data sources:
     - Du et al. 2014, J. Hazardous Materials (GAC binding energies)
     - Zaggia et al. 2016, Water Research (IX binding energies)
     - Calculated threshold based on thermodynamic analysis
     """
+    return {
+        'compounds': ['PFOS\n(C8)', 'PFOA\n(C8)', 'PFHxS\n(C6)', 'PFBS\n(C4)'],
+        'gac': [-48, -42, -35, -18],        # from Du et al.
+        'ix': [-52, -45, -38, -22],         # from Zaggia et al.
+        'required': [-80, -80, -70, -60],   # calculated threshold
+    }
+
+
+def plot_binding_energy_comparison(output_path: Path = None):
+    """Bar chart comparing binding energies of current vs required technology."""
+    import numpy as np
+    plt = load_pyplot()
     
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    # Data (from published literature)
-    compounds = ['PFOS\n(C8)', 'PFOA\n(C8)', 'PFHxS\n(C6)', 'PFBS\n(C4)']
-    
-    gac_binding = [-48, -42, -35, -18]  # kJ/mol, from Du et al.
-    ix_binding = [-52, -45, -38, -22]   # kJ/mol, from Zaggia et al.
-    required = [-80, -80, -70, -60]     # kJ/mol, calculated threshold
+    data = binding_energy_data()
+    compounds = data['compounds']
+    gac_binding = data['gac']
+    ix_binding = data['ix']
+    required = data['required']
     
     x = np.arange(len(compounds))
     width = 0.25
@@ -130,31 +160,40 @@ def plot_binding_energy_comparison(output_path: Path = None):
 # CHART 2: BREAKTHROUGH CURVE
 # ─────────────────────────────────────────────────────────────────────────────
 
-def plot_breakthrough_curve(output_path: Path = None):
+def breakthrough_data():
     """
-    S-curve showing PFAS breakthrough over time for GAC.
+    GAC effluent (% of influent) per compound over bed volumes treated, at
+    the model's 50 ppt influent.
     
-    Data: Modeled based on published breakthrough studies
+    Data: illustrative curves from the Thomas model
+    (04_LEGAL_LIABILITY/breakthrough_model.py), not fitted to measured
+    data. Qualitative ordering modeled based on published breakthrough
+    studies
     - Appleman et al. 2014, Water Research
     - Patterson et al. 2019, AWWA Water Science
     """
+    import numpy as np
+    from breakthrough_model import REFERENCE_INFLUENT_PPT, breakthrough_curves
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # Generate breakthrough curve data (logistic function)
+    compounds = ["PFOS", "PFOA", "PFHxS", "PFBS"]
     bed_volumes = np.linspace(0, 80000, 500)
+    curves = breakthrough_curves("gac", bed_volumes, REFERENCE_INFLUENT_PPT, compounds)
+    return {
+        'bed_volumes': bed_volumes,
+        'influent_ppt': REFERENCE_INFLUENT_PPT,
+        'effluent_percent': dict(zip(compounds, curves)),
+    }
+
+
+def plot_breakthrough_curve(output_path: Path = None):
+    """S-curve showing PFAS breakthrough over time for GAC."""
+    plt = load_pyplot()
     
-    # PFOS breaks through around 30,000 BV
-    pfos_breakthrough = 100 / (1 + np.exp(-0.0002 * (bed_volumes - 35000)))
-    
-    # PFOA breaks through around 25,000 BV  
-    pfoa_breakthrough = 100 / (1 + np.exp(-0.00025 * (bed_volumes - 28000)))
-    
-    # PFHxS breaks through around 15,000 BV
-    pfhxs_breakthrough = 100 / (1 + np.exp(-0.0003 * (bed_volumes - 18000)))
+    fig, ax = plt.subplots(figsize=(10, 6))
     
-    # PFBS breaks through almost immediately
-    pfbs_breakthrough = 100 / (1 + np.exp(-0.0005 * (bed_volumes - 5000)))
+    data = breakthrough_data()
+    bed_volumes = data['bed_volumes']
+    pfos_breakthrough, pfoa_breakthrough, pfhxs_breakthrough, pfbs_breakthrough = data['effluent_percent'].values()
     
     # Plot curves
     ax.plot(bed_volumes/1000, pfos_breakthrough, label='PFOS (C8)', 
@@ -166,8 +205,8 @@ def plot_breakthrough_curve(output_path: Path = None):
     ax.plot(bed_volumes/1000, pfbs_breakthrough, label='PFBS (C4)',
            color='#d62728', linewidth=2.5)
     
-    # EPA limit line (assuming 50 ppt influent, 4 ppt limit = 8% of influent)
-    epa_limit = 8  # 4 ppt / 50 ppt * 100%
+    # EPA limit line (50 ppt influent, 4 ppt limit = 8% of influent)
+    epa_limit = 4 / data['influent_ppt'] * 100
     ax.axhline(y=epa_limit, color='red', linestyle='--', linewidth=2, alpha=0.7)
     ax.text(75, epa_limit + 3, 'EPA 4 ppt Limit\n(8% of influent)', 
            fontsize=10, color='red', fontweight='bold', ha='right')
@@ -190,6 +229,8 @@ def plot_breakthrough_curve(output_path: Path = None):
     ax.annotate('PFBS breakthrough\n< 10,000 BV', xy=(8, 50), xytext=(20, 70),
                arrowprops=dict(arrowstyle='->', color='black'),
                fontsize=10, ha='center')
+    ax.text(79, 1.5, f"Illustrative model curves, {data['influent_ppt']:g} ppt influent "
+            "(not fitted to measured data)", fontsize=8, color='gray', ha='right', va='bottom')
     
     plt.tight_layout()
     
@@ -204,23 +245,38 @@ def plot_breakthrough_curve(output_path: Path = None):
 # CHART 3: COST COMPARISON
 # ─────────────────────────────────────────────────────────────────────────────
 
-def plot_cost_comparison(output_path: Path = None):
+def cost_data():
     """
-    Stacked bar chart comparing treatment costs.
+    Treatment cost components ($/1000 gallons over 20 years, for a 10 MGD
+    plant); O&M comes from the shared technology catalog.
     
     Data: EPA cost estimates and industry data
     """
+    from technology_catalog import get_catalog
     
-    fig, ax = plt.subplots(figsize=(10, 6))
+    catalog = get_catalog()
+    keys = ['gac', 'ix_singleuse', 'ix_regenerable', 'ro', 'novel_projected']
+    return {
+        'technologies': ['GAC', 'Ion Exchange\n(Single-Use)', 'Ion Exchange\n(Regenerable)',
+                         'RO/NF', 'Novel Tech\n(Projected)'],
+        'capital': [0.22, 0.33, 0.33, 0.55, 0.17],  # Amortized capital
+        'operations': [catalog.technology(k).om_per_1000gal for k in keys],
+        'disposal': [0.50, 0.60, 0.30, 0.40, 0.10],  # Waste disposal
+    }
+
+
+def plot_cost_comparison(output_path: Path = None):
+    """Stacked bar chart comparing treatment costs."""
+    import numpy as np
+    plt = load_pyplot()
     
-    # Technologies
-    techs = ['GAC', 'Ion Exchange\n(Single-Use)', 'Ion Exchange\n(Regenerable)', 
-             'RO/NF', 'Novel Tech\n(Projected)']
+    fig, ax = plt.subplots(figsize=(10, 6))
     
-    # Cost components ($/1000 gallons over 20 years, for 10 MGD plant)
-    capital = [0.22, 0.33, 0.33, 0.55, 0.17]  # Amortized capital
-    operations = [0.75, 1.20, 0.50, 1.50, 0.35]  # O&M
-    disposal = [0.50, 0.60, 0.30, 0.40, 0.10]  # Waste disposal
+    data = cost_data()
+    techs = data['technologies']
+    capital = data['capital']
+    operations = data['operations']
+    disposal = data['disposal']
     
     x = np.arange(len(techs))
     width = 0.6
@@ -266,22 +322,32 @@ def plot_cost_comparison(output_path: Path = None):
 # CHART 4: CHAIN LENGTH EFFECT
 # ─────────────────────────────────────────────────────────────────────────────
 
-def plot_chain_length_effect(output_path: Path = None):
+def chain_length_data():
     """
-    Shows relationship between PFAS chain length and removal efficiency.
+    Removal efficiency (%) of GAC and ion exchange by PFAS chain length.
     
     Data: Compiled from multiple field studies
     """
+    return {
+        'chain_lengths': [4, 5, 6, 7, 8, 9, 10],
+        'compounds': ['PFBA/PFBS', 'PFPeA/PFPeS', 'PFHxA/PFHxS', 'PFHpA/PFHpS',
+                      'PFOA/PFOS', 'PFNA/PFNS', 'PFDA/PFDS'],
+        'gac': [15, 35, 55, 70, 82, 88, 92],
+        'ix': [28, 48, 68, 80, 92, 95, 97],
+    }
+
+
+def plot_chain_length_effect(output_path: Path = None):
+    """Shows relationship between PFAS chain length and removal efficiency."""
+    plt = load_pyplot()
     
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    # Data
-    chain_lengths = [4, 5, 6, 7, 8, 9, 10]
-    compounds = ['PFBA/PFBS', 'PFPeA/PFPeS', 'PFHxA/PFHxS', 'PFHpA/PFHpS', 
-                'PFOA/PFOS', 'PFNA/PFNS', 'PFDA/PFDS']
-    
-    gac_removal = [15, 35, 55, 70, 82, 88, 92]  # % removal
-    ix_removal = [28, 48, 68, 80, 92, 95, 97]   # % removal
+    data = chain_length_data()
+    chain_lengths = data['chain_lengths']
+    compounds = data['compounds']
+    gac_removal = data['gac']
+    ix_removal = data['ix']
     
     # Plot
     ax.plot(chain_lengths, gac_removal, 'o-', color=COLORS['gac'], 
@@ -324,23 +390,29 @@ def plot_chain_length_effect(output_path: Path = None):
 # CHART 5: SETTLEMENT TIMELINE
 # ─────────────────────────────────────────────────────────────────────────────
 
-def plot_settlement_timeline(output_path: Path = None):
+def settlement_data():
     """
-    Timeline of major PFAS settlements.
+    Major PFAS settlements as (year, amount $B, label).
     
     Data: Public court records and press releases
     """
-    
-    fig, ax = plt.subplots(figsize=(12, 5))
-    
-    # Settlement data
-    settlements = [
+    return [
         (2018, 0.85, '3M Minnesota\n$850M'),
         (2019, 0.021, 'Saint-Gobain NH\n$21M'),
         (2022, 0.055, 'Wolverine MI\n$55M'),
         (2023, 1.19, 'Chemours/DuPont\n$1.19B'),
         (2023, 10.3, '3M AFFF\n$10.3B'),
     ]
+
+
+def plot_settlement_timeline(output_path: Path = None):
+    """Timeline of major PFAS settlements."""
+    import numpy as np
+    plt = load_pyplot()
+    
+    fig, ax = plt.subplots(figsize=(12, 5))
+    
+    settlements = settlement_data()
     
     years = [s[0] for s in settlements]
     amounts = [s[1] for s in settlements]
@@ -389,14 +461,12 @@ def plot_settlement_timeline(output_path: Path = None):
 # CHART 6: LEACHING CURVE
 # ─────────────────────────────────────────────────────────────────────────────
 
-def plot_leaching_curve(output_path: Path = None):
+def leaching_data():
     """
-    Shows PFAS leaching from GAC over time when conditions change.
-    
-    This is the key "fear" chart showing the problem.
+    Influent and effluent PFOA (ppt) over 24 months of GAC service, with the
+    influent dropping at month 12.
     """
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
+    import numpy as np
     
     # Time axis (months)
     months = np.linspace(0, 24, 200)
@@ -413,11 +483,30 @@ def plot_leaching_curve(output_path: Path = None):
     
     effluent = np.concatenate([normal, leach])
     
+    # Influent drops at month 12
+    influent = np.concatenate([50 * np.ones(100), 10 * np.ones(100)])
+    return {'months': months, 'effluent': effluent, 'influent': influent}
+
+
+def plot_leaching_curve(output_path: Path = None):
+    """
+    Shows PFAS leaching from GAC over time when conditions change.
+    
+    This is the key "fear" chart showing the problem.
+    """
+    plt = load_pyplot()
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    
+    data = leaching_data()
+    months = data['months']
+    effluent = data['effluent']
+    influent = data['influent']
+    
     # Plot
     ax.plot(months, effluent, color='#d62728', linewidth=3, label='Effluent PFOA (ppt)')
     
     # Influent line (drops at month 12)
-    influent = np.concatenate([50 * np.ones(100), 10 * np.ones(100)])
     ax.plot(months, influent, color='#1f77b4', linewidth=2, linestyle='--', 
            label='Influent PFOA (ppt)')
     
@@ -465,18 +554,28 @@ def plot_leaching_curve(output_path: Path = None):
 # MAIN
 # ─────────────────────────────────────────────────────────────────────────────
 
-def generate_all_charts():
-    """Generate all charts for the white paper."""
+# Chart name -> (plot function, data function, output file in OUTPUT_DIR)
+CHARTS = {
+    "binding": (plot_binding_energy_comparison, binding_energy_data, "binding_energy_comparison.png"),
+    "breakthrough": (plot_breakthrough_curve, breakthrough_data, "breakthrough_curve.png"),
+    "cost": (plot_cost_comparison, cost_data, "cost_comparison.png"),
+    "chain": (plot_chain_length_effect, chain_length_data, "chain_length_effect.png"),
+    "settlement": (plot_settlement_timeline, settlement_data, "settlement_timeline.png"),
+    "leaching": (plot_leaching_curve, leaching_data, "leaching_curve.png"),
+}
+
+
+def generate_all_charts(close: bool = True):
+    """Generate all charts for the white paper (see chart_build.py for incremental builds)."""
     
     print("Generating PFAS Crisis Charts...")
     print("-" * 50)
     
-    plot_binding_energy_comparison(OUTPUT_DIR / "binding_energy_comparison.png")
-    plot_breakthrough_curve(OUTPUT_DIR / "breakthrough_curve.png")
-    plot_cost_comparison(OUTPUT_DIR / "cost_comparison.png")
-    plot_chain_length_effect(OUTPUT_DIR / "chain_length_effect.png")
-    plot_settlement_timeline(OUTPUT_DIR / "settlement_timeline.png")
-    plot_leaching_curve(OUTPUT_DIR / "leaching_curve.png")
+    plt = load_pyplot()
+    for plot, _, filename in CHARTS.values():
+        fig = plot(OUTPUT_DIR / filename)
+        if close:
+            plt.close(fig)
     
     print("-" * 50)
     print("All charts generated successfully!")
@@ -497,25 +596,16 @@ def main():
     
     args = parser.parse_args()
     
-    if args.all or not any([args.binding, args.breakthrough, args.cost, 
-                            args.chain, args.settlement, args.leaching]):
-        generate_all_charts()
+    selected = [name for name in CHARTS if getattr(args, name)]
+    if args.all or not selected:
+        generate_all_charts(close=not args.show)
     else:
-        if args.binding:
-            plot_binding_energy_comparison(OUTPUT_DIR / "binding_energy_comparison.png")
-        if args.breakthrough:
-            plot_breakthrough_curve(OUTPUT_DIR / "breakthrough_curve.png")
-        if args.cost:
-            plot_cost_comparison(OUTPUT_DIR / "cost_comparison.png")
-        if args.chain:
-            plot_chain_length_effect(OUTPUT_DIR / "chain_length_effect.png")
-        if args.settlement:
-            plot_settlement_timeline(OUTPUT_DIR / "settlement_timeline.png")
-        if args.leaching:
-            plot_leaching_curve(OUTPUT_DIR / "leaching_curve.png")
+        for name in selected:
+            plot, _, filename = CHARTS[name]
+            plot(OUTPUT_DIR / filename)
     
     if args.show:
-        plt.show()
+        load_pyplot().show()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Per-utility liability charts, one multi-page PDF per state
+
+Renders the liability report of every utility in a fleet file as small
+multiples, a few utilities per page, each row showing:
+
+    - compliance: each regulated compound and the Hazard Index as a
+      percentage of its EPA limit (bars over 100% are violations)
+    - exposure: penalties, litigation and treatment stacked for the low,
+      mid and high litigation scenarios
+
+Reports come from generate_liability_report (via fleet.iter_reports).
+Each state's PDF is written by one worker process with the Agg canvas.
+Each worker builds one page figure and then only updates its bars and
+labels from page to page, since building a figure costs more than
+drawing one.
+
+Usage:
+    python utility_charts.py --input fleet.csv --output-dir charts/
+    python utility_charts.py --input fleet.parquet --output-dir charts/ --workers 8
+    python utility_charts.py --input fleet.csv --output-dir charts/ --technology ix_singleuse
+
+Requirements:
+    pip install matplotlib numpy
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import argparse
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# generate_charts puts 04_LEGAL_LIABILITY on sys.path
+from generate_charts import COLORS, STYLE_RC, STYLE_SHEET
+from fleet import iter_reports, read_fleet
+from technology_catalog import get_catalog
+from utility_exposure_calculator import EPA_LIMITS, HAZARD_INDEX, UtilityProfile, format_currency
+
+
+UTILITIES_PER_PAGE = 4
+PAGE_SIZE = (11, 8.5)  # inches, landscape letter
+
+# Compliance axis ceiling (% of limit); taller bars are clipped and labeled
+COMPLIANCE_CEILING = 300.0
+
+# Compliance bars: regulated compounds, then the Hazard Index
+COMPLIANCE_BARS = (*EPA_LIMITS, HAZARD_INDEX)
+COMPLIANCE_LABELS = [*EPA_LIMITS, "HI"]
+
+# Exposure stack, bottom to top: (label, color)
+EXPOSURE_PARTS = (
+    ("Penalties", COLORS['warning']),
+    ("Litigation", COLORS['required']),
+    ("Treatment", COLORS['gac']),
+)
+SCENARIOS = ("low", "mid", "high")
+
+# Page rendering settings on top of the white paper style
+PDF_RC = {
+    'savefig.bbox': 'standard',
+    'pdf.use14corefonts': True,
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REPORT DATA
+# ─────────────────────────────────────────────────────────────────────────────
+
+def compliance_percentages(report: Dict[str, Any]) -> List[float]:
+    """Each COMPLIANCE_BARS entry as a percentage of its limit (0 if not detected)."""
+    levels = {level["compound"]: level["concentration_ppt"] for level in report["pfas_levels"]}
+    percentages = [100 * levels.get(compound, 0.0) / limit for compound, limit in EPA_LIMITS.items()]
+    hazard_index = report["hazard_index"]
+    percentages.append(100 * hazard_index["value"] / hazard_index["mcl"])
+    return percentages
+
+
+def exposure_stack(report: Dict[str, Any]) -> List[Tuple[float, float, float]]:
+    """(penalties, litigation, treatment) per litigation scenario, in EXPOSURE_PARTS order."""
+    penalties = report["regulatory_penalties"]["total"]
+    treatment = report["treatment_costs"]["total"]
+    return [(penalties, report["litigation_exposure"][scenario], treatment) for scenario in SCENARIOS]
+
+
+def state_pdf_name(state: str) -> str:
+    """File name of a state's PDF (utilities without a state go to UNKNOWN)."""
+    return f"liability_charts_{re.sub(r'[^A-Za-z0-9]+', '_', state or '') or 'UNKNOWN'}.pdf"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RENDERING
+# ─────────────────────────────────────────────────────────────────────────────
+
+class UtilityPage:
+    """
+    A page of per_page utility rows whose artists are created once.
+
+    update() refills the bars, labels and titles from a list of reports
+    (hiding unused rows on a short last page); the figure is then saved
+    as a new page.
+    """
+
+    def __init__(self, per_page: int = UTILITIES_PER_PAGE):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=PAGE_SIZE)
+        FigureCanvasAgg(self.figure)
+        self.figure.subplots_adjust(left=0.07, right=0.98, top=0.95, bottom=0.05, hspace=0.55, wspace=0.22)
+        grid = self.figure.subplots(per_page, 2, squeeze=False)
+        self.rows = []
+        for row, (compliance, exposure) in enumerate(grid):
+            bars = compliance.bar(COMPLIANCE_LABELS, [0.0] * len(COMPLIANCE_BARS),
+                                  color=COLORS['gac'], edgecolor='black', linewidth=0.5)
+            compliance.axhline(100, color=COLORS['required'], linestyle='--', linewidth=1)
+            compliance.set_ylim(0, COMPLIANCE_CEILING * 1.12)
+            compliance.set_yticks([0, 100, 200, 300])
+            compliance.set_ylabel('% of limit', fontsize=8)
+            compliance.tick_params(labelsize=7)
+            compliance.grid(False, axis='x')
+            values = [compliance.text(i, 0, "", ha='center', va='bottom', fontsize=6) for i in range(len(bars))]
+
+            stacks = [
+                exposure.bar(SCENARIOS, [0.0] * len(SCENARIOS), color=color, label=label,
+                             edgecolor='black', linewidth=0.5)
+                for label, color in EXPOSURE_PARTS
+            ]
+            # Totals are labeled on the bars; a rescaled money axis per
+            # utility would cost a tick layout on every page
+            exposure.set_yticks([])
+            exposure.set_ylabel('Exposure', fontsize=8)
+            exposure.tick_params(labelsize=7)
+            exposure.grid(False)
+            totals = [exposure.text(i, 0, "", ha='center', va='bottom', fontsize=6) for i in range(len(SCENARIOS))]
+
+            # An explicit y skips matplotlib's title placement pass on each draw
+            title = compliance.set_title("", loc='left', fontsize=9, fontweight='bold', y=1.04)
+            status = exposure.set_title("", loc='right', fontsize=9, fontweight='bold', y=1.04)
+            self.rows.append({
+                "axes": (compliance, exposure), "bars": bars, "values": values,
+                "stacks": stacks, "totals": totals, "title": title, "status": status,
+            })
+        self.figure.legend(handles=self.rows[0]["stacks"], loc='upper right', fontsize=7,
+                           ncol=len(EXPOSURE_PARTS), frameon=False)
+
+    def update(self, reports: List[Dict[str, Any]]) -> None:
+        for row, report in zip(self.rows, reports + [None] * (len(self.rows) - len(reports))):
+            for ax in row["axes"]:
+                ax.set_visible(report is not None)
+            if report is not None:
+                self._fill(row, report)
+
+    @staticmethod
+    def _fill(row: Dict[str, Any], report: Dict[str, Any]) -> None:
+        utility = report["utility"]
+        row["title"].set_text(
+            f"{utility['name']} ({utility.get('utility_id') or 'no ID'}) · "
+            f"pop. {utility['population_served']:,} · {utility['daily_flow_mgd']:g} MGD"
+        )
+        compliant = report["compliance_status"]
+        row["status"].set_text("IN COMPLIANCE" if compliant else "VIOLATION")
+        row["status"].set_color(COLORS['ix'] if compliant else COLORS['required'])
+
+        compliance, exposure = row["axes"]
+        percentages = compliance_percentages(report)
+        for bar, text, percent in zip(row["bars"], row["values"], percentages):
+            height = min(percent, COMPLIANCE_CEILING)
+            bar.set_height(height)
+            bar.set_facecolor(COLORS['required'] if percent > 100 else COLORS['gac'])
+            text.set_y(height)
+            text.set_text(f"{percent:.0f}%" if percent else "")
+
+        stack = exposure_stack(report)
+        bottoms = [0.0] * len(SCENARIOS)
+        for part, bars in enumerate(row["stacks"]):
+            for i, bar in enumerate(bars):
+                bar.set_y(bottoms[i])
+                bar.set_height(stack[i][part])
+                bottoms[i] += stack[i][part]
+        for text, total in zip(row["totals"], bottoms):
+            text.set_y(total)
+            text.set_text(format_currency(total))
+        exposure.set_ylim(0, max(bottoms[-1], 1.0) * 1.2)
+
+
+def write_state_pdf(path: Path, reports: Iterable[Dict[str, Any]], per_page: int = UTILITIES_PER_PAGE) -> int:
+    """Write reports as a multi-page PDF of per_page utilities a page. Returns the utility count."""
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.style import context
+
+    # The PDF's built-in Helvetica skips embedding and laying out glyphs
+    # (a third of the page time); its metrics are "medium" weight, which
+    # matplotlib warns about when matching "normal" text
+    logging.getLogger("matplotlib.font_manager").setLevel(logging.ERROR)
+    # Pages keep their fixed layout (no per-page tight bounding box)
+    with context([STYLE_SHEET, {**STYLE_RC, **PDF_RC}]):
+        page = UtilityPage(per_page)
+        count = 0
+        with PdfPages(path) as pdf:
+            batch = []
+            for report in reports:
+                batch.append(report)
+                if len(batch) == per_page:
+                    page.update(batch)
+                    pdf.savefig(page.figure)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                page.update(batch)
+                pdf.savefig(page.figure)
+                count += len(batch)
+    return count
+
+
+def render_state(
+    state: str,
+    profiles: List[UtilityProfile],
+    output_dir: Path,
+    report_options: Optional[Dict[str, Any]] = None,
+    generated_at: Optional[str] = None,
+    per_page: int = UTILITIES_PER_PAGE,
+) -> Tuple[str, int]:
+    """Process-pool task: score one state's utilities and write its PDF."""
+    reports = iter_reports(profiles, generated_at, report_options)
+    return state, write_state_pdf(output_dir / state_pdf_name(state), reports, per_page)
+
+
+def render_fleet(
+    profiles: Iterable[UtilityProfile],
+    output_dir: Path,
+    workers: int = 1,
+    report_options: Optional[Dict[str, Any]] = None,
+    per_page: int = UTILITIES_PER_PAGE,
+) -> Dict[str, int]:
+    """
+    Write one PDF per state into output_dir; returns state -> utilities.
+
+    Profiles are grouped by state in memory (pages keep input order), and
+    the largest states are submitted first so the pool finishes evenly.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    by_state: Dict[str, List[UtilityProfile]] = {}
+    for profile in profiles:
+        by_state.setdefault(profile.state or "", []).append(profile)
+    states = sorted(by_state, key=lambda state: -len(by_state[state]))
+    generated_at = datetime.now().isoformat()
+
+    if workers <= 1:
+        results = [render_state(s, by_state[s], output_dir, report_options, generated_at, per_page) for s in states]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(states))) as pool:
+            futures = [
+                pool.submit(render_state, s, by_state.pop(s), output_dir, report_options, generated_at, per_page)
+                for s in states
+            ]
+            results = [future.result() for future in as_completed(futures)]
+    return {state: count for state, count in sorted(results)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, required=True, help="Fleet CSV or Parquet file")
+    parser.add_argument("--output-dir", type=Path, required=True, help="Directory for the per-state PDFs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--per-page", type=int, default=UTILITIES_PER_PAGE, help="Utilities per page")
+    parser.add_argument("--technology", default="gac", help="Treatment technology to price")
+    args = parser.parse_args()
+
+    if args.technology not in get_catalog():
+        print(f"Error: Unknown technology '{args.technology}' (choose from: {', '.join(get_catalog().names())})")
+        return
+    if args.per_page < 1:
+        print("Error: --per-page must be at least 1")
+        return
+
+    start = time.perf_counter()
+    try:
+        counts = render_fleet(read_fleet(args.input), args.output_dir, args.workers,
+                              {"technology": args.technology}, args.per_page)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return
+    for state, count in counts.items():
+        print(f"{args.output_dir / state_pdf_name(state)}: {count:,} utilities")
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"{total:,} utilities in {len(counts)} PDFs, {elapsed:.1f} s "
+          f"({elapsed / max(total, 1) * 1000:.1f} ms per utility)")
+
+
+if __name__ == "__main__":
+    main()
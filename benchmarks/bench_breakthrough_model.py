@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Breakthrough-curve model: reference curves, parity and throughput
+
+Checks that:
+    - the GAC curves at 50 ppt reproduce the logistic curves the
+      breakthrough chart used to hard-code
+    - the effluent after bed_volumes_to_limit bed volumes is the limit
+    - media_changeout_years (scalar, used by the calculator) equals
+      fleet_changeout_years (vectorized)
+    - IncrementalFleet with --om-model breakthrough stays identical to
+      fresh reports as influent levels change
+
+then times change-out intervals for a whole fleet and the curves of many
+parameter sets at once.
+
+Usage:
+    python benchmarks/bench_breakthrough_model.py
+    python benchmarks/bench_breakthrough_model.py --utilities 1000000 --parameter-sets 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from bench_incremental import check_parity, random_updates
+from synthetic_fleet import COMPOUNDS, synthetic_arrays, synthetic_profiles
+
+from breakthrough_model import (
+    REFERENCE_INFLUENT_PPT,
+    TECHNOLOGY_MEDIA,
+    bed_volumes_to_limit,
+    breakthrough_curves,
+    effluent_fraction,
+    fleet_changeout_years,
+    media_changeout_years,
+    thomas_parameters,
+)
+from incremental import IncrementalFleet
+from utility_exposure_calculator import EPA_LIMITS
+
+# The logistic curves plot_breakthrough_curve drew before (midpoint BV, slope)
+CHART_CURVES = {
+    "PFOS": (35000, 0.0002),
+    "PFOA": (28000, 0.00025),
+    "PFHxS": (18000, 0.0003),
+    "PFBS": (5000, 0.0005),
+}
+
+
+def check() -> None:
+    bed_volumes = np.linspace(0, 80000, 500)
+    compounds = list(CHART_CURVES)
+    curves = breakthrough_curves("gac", bed_volumes, compounds=compounds)
+    for row, (midpoint, slope) in zip(curves, CHART_CURVES.values()):
+        if not np.allclose(row, 100 / (1 + np.exp(-slope * (bed_volumes - midpoint))), rtol=1e-12, atol=1e-9):
+            raise AssertionError("GAC curves at 50 ppt differ from the chart's logistic curves")
+    print(f"GAC curves at {REFERENCE_INFLUENT_PPT:g} ppt reproduce the chart's logistic curves")
+
+    rng = np.random.default_rng(1)
+    influent = rng.uniform(4.5, 500, (1000, 1))
+    for media in ("gac", "ix"):
+        params = thomas_parameters(media, compounds)
+        reached = bed_volumes_to_limit(influent, 4.0, params["capacity"], params["rate"])
+        effluent = influent * effluent_fraction(reached, influent, params["capacity"], params["rate"])
+        if not np.allclose(effluent[reached > 0], 4.0, rtol=1e-9):
+            raise AssertionError(f"{media}: effluent at the predicted breakthrough isn't the limit")
+    print("Effluent at the predicted breakthrough equals the limit")
+
+    arrays = synthetic_arrays(5_000, seed=2)
+    for technology in TECHNOLOGY_MEDIA:
+        years = fleet_changeout_years(technology, arrays["concentrations"], COMPOUNDS)
+        for i, row in enumerate(arrays["concentrations"].tolist()):
+            scalar = media_changeout_years(technology, {c: v for c, v in zip(COMPOUNDS, row) if v > 0})
+            if scalar != years[i]:
+                raise AssertionError(f"{technology}: utility {i} scalar {scalar} != vectorized {years[i]}")
+    print("Scalar and vectorized change-out intervals are identical")
+
+    profiles = synthetic_profiles(300, seed=3)
+    fleet = IncrementalFleet(profiles, {"technology": "ix_singleuse", "om_model": "breakthrough"})
+    fleet.apply(random_updates(profiles, 3_000, seed=3))
+    check_parity(fleet, profiles)
+    print("Incremental reports with breakthrough O&M match fresh reports\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=100_000)
+    parser.add_argument("--parameter-sets", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    check()
+
+    concentrations = synthetic_arrays(args.utilities, args.seed)["concentrations"]
+    start = time.perf_counter()
+    years = fleet_changeout_years("gac", concentrations, COMPOUNDS)
+    elapsed = time.perf_counter() - start
+    limited = years < 5.0
+    print(f"GAC change-out for {args.utilities:,} utilities: {elapsed:.3f} s "
+          f"(median {np.median(years[limited]):.2f} years where a compound breaks through)")
+
+    # Parameter uncertainty: capacity and rate scaled ±30% per set
+    rng = np.random.default_rng(args.seed)
+    params = thomas_parameters("gac", COMPOUNDS)
+    scale = rng.uniform(0.7, 1.3, (args.parameter_sets, 1, 2))
+    influent = concentrations[:200]
+    limits = np.array([EPA_LIMITS.get(c, np.inf) for c in COMPOUNDS])
+    start = time.perf_counter()
+    bed_volumes = bed_volumes_to_limit(
+        influent[None, :, :], limits, params["capacity"] * scale[..., :1], params["rate"] * scale[..., 1:]
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Bed volumes to limit for {args.parameter_sets:,} parameter sets × {len(influent)} utilities × "
+          f"{len(COMPOUNDS)} compounds ({bed_volumes.size:,} values): {elapsed:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Chart build: full, no-op and single-chart rebuilds
+
+Builds the white paper charts into a temporary directory with
+assets/chart_build.py, serially and across worker processes, then times
+a rebuild with nothing changed and one after a single chart's inputs
+change. Checks that the no-op rebuild renders nothing, that the edited
+chart is the only one rebuilt, and that no figures stay open.
+
+Usage:
+    python benchmarks/bench_chart_build.py
+    python benchmarks/bench_chart_build.py --jobs 4 --edit breakthrough
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "assets"))
+
+import chart_build  # noqa: E402
+import matplotlib.pyplot as plt  # noqa: E402
+
+
+def timed_build(output_dir: Path, **kwargs):
+    start = time.perf_counter()
+    built = chart_build.build_charts(output_dir=output_dir, log=lambda _: None, **kwargs)
+    return built, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument("--edit", default="cost", choices=list(chart_build.CHARTS),
+                        help="Chart whose inputs change before the last rebuild")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        _, serial = timed_build(output_dir, jobs=1, force=True)
+        if plt.get_fignums():
+            raise AssertionError(f"{len(plt.get_fignums())} figures left open")
+        built, parallel = timed_build(output_dir, jobs=args.jobs, force=True)
+        assert len(built) == len(chart_build.CHARTS)
+
+        built, noop = timed_build(output_dir, jobs=args.jobs)
+        if built:
+            raise AssertionError(f"no-op rebuild rendered {built}")
+
+        # A changed data input stands in for an edit to the chart
+        inputs = chart_build.CHART_INPUTS.get(args.edit, ())
+        chart_build.CHART_INPUTS[args.edit] = inputs + (lambda: b"edited",)
+        try:
+            built, single = timed_build(output_dir, jobs=args.jobs)
+        finally:
+            chart_build.CHART_INPUTS[args.edit] = inputs
+        if built != [args.edit]:
+            raise AssertionError(f"editing {args.edit} rebuilt {built}")
+
+    print(f"{len(chart_build.CHARTS)} charts, no figures left open, only the edited chart rebuilt\n")
+    print(f"{'Full build, 1 process':<32}{serial:>8.2f} s")
+    print(f"{f'Full build, {args.jobs} processes':<32}{parallel:>8.2f} s")
+    print(f"{'Rebuild, nothing changed':<32}{noop:>8.2f} s")
+    print(f"{f'Rebuild after editing {args.edit}':<32}{single:>8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Multi-format chart output: one render vs. one savefig per format
+
+Writes every white paper chart as all chart_output.OUTPUT_FORMATS, once
+with a separate savefig per file (each redraws the figure; the WebP goes
+through a PNG) and once with write_outputs (one Agg render resampled for
+every raster). Checks that the print PNG is pixel-identical to savefig's
+and that every raster meets its byte budget.
+
+Usage:
+    python benchmarks/bench_chart_output.py
+"""
+
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "assets"))
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+
+from chart_output import OUTPUT_FORMATS, format_output_report, write_outputs  # noqa: E402
+from generate_charts import CHARTS, load_pyplot  # noqa: E402
+from PIL import Image  # noqa: E402
+
+
+def savefig_each(fig, stem: str, output_dir: Path) -> float:
+    """Baseline: one savefig per format at its own DPI."""
+    start = time.perf_counter()
+    for output in OUTPUT_FORMATS.values():
+        path = output.path(output_dir, stem)
+        if output.extension == "webp":
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", dpi=output.dpi)
+            Image.open(buffer).convert("RGB").save(path, format="WEBP", quality=90)
+        else:
+            fig.savefig(path, format=output.extension, dpi=output.dpi or "figure")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+
+    plt = load_pyplot()
+    baseline = pipeline = 0.0
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        separate, shared = Path(tmp) / "savefig", Path(tmp) / "pipeline"
+        separate.mkdir()
+        shared.mkdir()
+        for plot, _, filename in CHARTS.values():
+            stem = Path(filename).stem
+            fig = plot(None)
+            baseline += savefig_each(fig, stem, separate)
+            start = time.perf_counter()
+            chart_rows = write_outputs(fig, stem, shared, list(OUTPUT_FORMATS.values()))
+            pipeline += time.perf_counter() - start
+            plt.close(fig)
+            rows += chart_rows
+
+            expected = np.asarray(Image.open(OUTPUT_FORMATS["png"].path(separate, stem)).convert("RGB"))
+            written = np.asarray(Image.open(OUTPUT_FORMATS["png"].path(shared, stem)))
+            if not np.array_equal(expected, written):
+                raise AssertionError(f"{stem}: print PNG differs from savefig")
+        over = [row["path"].name for row in rows if not row["within_budget"]]
+        if over:
+            raise AssertionError(f"over budget: {', '.join(over)}")
+        print("Print PNGs pixel-identical to savefig; every raster within budget\n")
+        print(format_output_report(rows))
+
+    print(f"\n{len(CHARTS)} charts × {len(OUTPUT_FORMATS)} formats: one savefig per format {baseline:.2f} s, "
+          f"one render per chart {pipeline:.2f} s ({baseline / pipeline:.1f}× faster)")
+
+
+if __name__ == "__main__":
+    main()
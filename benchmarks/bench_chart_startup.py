@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Chart generator startup time
+
+Runs `generate_charts.py --help` and `import generate_charts` in fresh
+interpreters, next to a bare interpreter start, and reports the median
+wall time plus the import breakdown of one `python -X importtime` run.
+Checks that neither path imports matplotlib, numpy or the calculator
+modules (they load on first render) and compares --help against a 50 ms
+target. Most of what remains is the interpreter itself and argparse.
+
+Usage:
+    python benchmarks/bench_chart_startup.py
+    python benchmarks/bench_chart_startup.py --runs 20 --target-ms 40
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ASSETS = Path(__file__).resolve().parent.parent / "assets"
+HEAVY = ("matplotlib", "numpy", "technology_catalog", "breakthrough_model", "utility_exposure_calculator")
+
+
+def run(args: List[str]) -> float:
+    """Wall time (s) of one fresh interpreter."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=ASSETS, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def importtime(args: List[str]) -> str:
+    """The -X importtime report of one fresh interpreter."""
+    return subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ASSETS,
+                          capture_output=True, text=True, check=True).stderr
+
+
+def parse_importtime(report: str) -> Dict[str, Tuple[int, int]]:
+    """Module -> (nesting depth, cumulative import time in µs)."""
+    modules = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, total, name = line.split("|")
+        # Nested imports are indented two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (depth, int(total))
+    return modules
+
+
+def measure(label: str, args: List[str], runs: int) -> float:
+    median = statistics.median(run(args) for _ in range(runs))
+    imported = parse_importtime(importtime(args))
+    heavy = sorted({name for name in imported for prefix in HEAVY if name.split(".")[0] == prefix})
+    if heavy and label != "bare interpreter":
+        raise AssertionError(f"{label} imports {', '.join(heavy)}")
+    top_level = {name: us for name, (depth, us) in imported.items() if depth == 0}
+    slowest = sorted(top_level.items(), key=lambda item: -item[1])[:3]
+    breakdown = ", ".join(f"{name} {us / 1000:.1f}" for name, us in slowest)
+    print(f"{label:<28}{median * 1000:>8.1f} ms   (slowest imports, ms: {breakdown})")
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    bare = measure("bare interpreter", ["-c", "pass"], args.runs)
+    help_time = measure("generate_charts.py --help", ["generate_charts.py", "--help"], args.runs)
+    measure("import generate_charts", ["-c", "import generate_charts"], args.runs)
+    measure("binding_energy_data()", ["-c", "import generate_charts; generate_charts.binding_energy_data()"],
+            args.runs)
+
+    print(f"\nNo plotting or model modules imported; --help is {(help_time - bare) * 1000:.1f} ms over a "
+          f"bare interpreter, {'within' if help_time * 1000 < args.target_ms else 'OVER'} the "
+          f"{args.target_ms:.0f} ms target")
+
+
+if __name__ == "__main__":
+    main()
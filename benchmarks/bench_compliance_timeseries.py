@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Running-annual-average compliance throughput
+
+Times compliance_timeseries.assess on a synthetic state-wide history
+(utilities × quarters × compounds, with some unsampled quarters) and
+compares it with a per-utility Python loop over the same windows.
+
+Before timing, it checks on a small synthetic UCMR 5 file that:
+    - the latest RAAs equal sample_ingest's streaming raa reducer
+    - raa, violation days and penalties (including the Hazard Index)
+      equal the scalar loop
+    - regulatory penalties equal generate_liability_report on the
+      profiles built by history_profiles
+
+Usage:
+    python benchmarks/bench_compliance_timeseries.py
+    python benchmarks/bench_compliance_timeseries.py --utilities 50000 --years 10
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bench_sample_ingest import write_metadata, write_samples
+from synthetic_fleet import COMPOUNDS
+
+from compliance_timeseries import ComplianceHistory, assess, history_profiles, quarter_days
+from sample_ingest import aggregate_samples, iter_samples, load_metadata
+from utility_exposure_calculator import (
+    EPA_LIMITS,
+    EPA_PENALTY_RATE,
+    HAZARD_INDEX_MCL,
+    generate_liability_report,
+    mixture_hazard_index,
+)
+
+
+def scalar_assess(history: ComplianceHistory, period_quarters: int = 4):
+    """Per-utility loop with explicit four-quarter windows (the reference)."""
+    utilities, quarters, compounds = history.quarterly.shape
+    days = quarter_days(history.first_quarter, quarters).tolist()
+    limits = [EPA_LIMITS.get(c, float("inf")) for c in history.compounds]
+    raa = np.full(history.quarterly.shape, np.nan)
+    violation_days = np.zeros((utilities, compounds), dtype=np.int64)
+    totals = np.zeros(utilities)
+    for u in range(utilities):
+        series = history.quarterly[u].tolist()
+        # The penalty period ends at the utility's last sampled quarter
+        last = max(t for t in range(quarters) if any(v == v for v in series[t]))
+        period = range(max(0, last - period_quarters + 1), last + 1)
+        latest_levels = {}
+        for c in range(compounds):
+            latest = None
+            for t in range(quarters):
+                window = [series[s][c] for s in range(max(0, t - 3), t + 1)]
+                sampled = [v for v in window if v == v]
+                if not sampled:
+                    continue
+                total = 0.0
+                for v in sampled:
+                    total += v
+                raa[u, t, c] = value = total / len(sampled)
+                if value > limits[c] and t in period:
+                    violation_days[u, c] += days[t]
+                if series[t][c] == series[t][c]:
+                    latest = value
+            if latest is not None:
+                latest_levels[history.compounds[c]] = latest
+                if latest > limits[c]:
+                    totals[u] += violation_days[u, c] * EPA_PENALTY_RATE
+        # Hazard Index of each quarter's RAAs
+        index_days = 0
+        for t in period:
+            levels = dict(zip(history.compounds, raa[u, t].tolist()))
+            if mixture_hazard_index(levels) > HAZARD_INDEX_MCL:
+                index_days += days[t]
+        if mixture_hazard_index(latest_levels) > HAZARD_INDEX_MCL:
+            totals[u] += index_days * EPA_PENALTY_RATE
+    return raa, violation_days, totals
+
+
+def synthetic_history(utilities: int, years: int, seed: int = 0) -> ComplianceHistory:
+    """Quarterly means around the MCLs with ~10% of quarters unsampled."""
+    rng = np.random.default_rng(seed)
+    shape = (utilities, years * 4, len(COMPOUNDS))
+    quarterly = np.round(rng.lognormal(1.0, 1.0, shape), 2)
+    quarterly[rng.random(shape) < 0.1] = np.nan
+    return ComplianceHistory(
+        [f"XX{u:07d}" for u in range(utilities)], tuple(COMPOUNDS), 2020 * 4, quarterly,
+        names=[None] * utilities, states=[None] * utilities,
+    )
+
+
+def check(workdir: Path) -> None:
+    samples = workdir / "check.txt"
+    metadata = workdir / "check.fleet.csv"
+    write_metadata(metadata, write_samples(samples, 20_000, seed=1), seed=1)
+    history = ComplianceHistory.from_samples(samples)
+    result = assess(history)
+
+    streamed = {
+        (utility_id, compound): value
+        for utility_id, _, _, levels in aggregate_samples(iter_samples(samples), "raa")
+        for compound, value in levels.items()
+    }
+    latest = result["latest_raa"]
+    for u, utility_id in enumerate(history.utility_ids):
+        for c, compound in enumerate(history.compounds):
+            expected = streamed.get((utility_id, compound), 0.0)
+            value = latest[u, c] if latest[u, c] == latest[u, c] else 0.0
+            if value != expected:
+                raise AssertionError(f"{utility_id} {compound}: RAA {value} != streamed {expected}")
+    print("Latest RAAs match sample_ingest's raa reducer")
+
+    for name, history in (("samples", history), ("synthetic", synthetic_history(300, 6, seed=2))):
+        result = assess(history)
+        raa, days, totals = scalar_assess(history)
+        if not np.array_equal(result["raa"], raa, equal_nan=True):
+            raise AssertionError(f"{name}: rolling RAA differs from the scalar loop")
+        if not np.array_equal(result["violation_days"], days):
+            raise AssertionError(f"{name}: violation days differ from the scalar loop")
+        if not np.array_equal(result["regulatory_total"], totals):
+            raise AssertionError(f"{name}: penalties differ from the scalar loop")
+    print("RAA, violation days and penalties match the scalar loop")
+
+    history = synthetic_history(300, 6, seed=3)
+    result = assess(history)
+    base = load_metadata(metadata)
+    base = {utility_id: next(iter(base.values())) for utility_id in history.utility_ids}
+    for u, profile in enumerate(history_profiles(history, base)):
+        report = generate_liability_report(profile)
+        if report["regulatory_penalties"]["total"] != result["regulatory_total"][u]:
+            raise AssertionError(f"{profile.utility_id}: report penalties differ from assess")
+        if report["compliance_status"] != result["in_compliance"][u]:
+            raise AssertionError(f"{profile.utility_id}: report compliance differs from assess")
+    print("generate_liability_report penalties match assess on the derived profiles\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--scalar-utilities", type=int, default=500,
+                        help="Utilities timed with the scalar loop (extrapolated)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check(Path(tmp))
+
+    history = synthetic_history(args.utilities, args.years, args.seed)
+    cells = history.quarterly.size
+    assess(history)  # warm-up
+    start = time.perf_counter()
+    result = assess(history)
+    vectorized = time.perf_counter() - start
+
+    subset = synthetic_history(min(args.scalar_utilities, args.utilities), args.years, args.seed)
+    start = time.perf_counter()
+    scalar_assess(subset)
+    scalar = (time.perf_counter() - start) * args.utilities / len(subset.utility_ids)
+
+    violating = int((~result["in_compliance"]).sum())
+    print(f"{args.utilities:,} utilities × {args.years * 4} quarters × {len(COMPOUNDS)} compounds "
+          f"({cells:,} quarterly results), {violating:,} out of compliance")
+    print(f"{'Vectorized assess':<22}{vectorized:>10.3f} s{cells / vectorized:>16,.0f} results/s")
+    print(f"{'Scalar loop (est.)':<22}{scalar:>10.3f} s{cells / scalar:>16,.0f} results/s")
+    print(f"Speedup: {scalar / vectorized:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
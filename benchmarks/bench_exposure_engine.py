@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Scalar vs. vectorized exposure engine
+
+First checks that exposure_engine.score_fleet reproduces the scalar
+generate_liability_report numbers exactly on a synthetic fleet, then
+measures throughput of both paths. The scalar rate is measured on a
+sample and extrapolated to the full fleet size; the vectorized time is
+the best of a few repeats.
+
+Usage:
+    python benchmarks/bench_exposure_engine.py                 # 1M utilities
+    python benchmarks/bench_exposure_engine.py --utilities 100000
+"""
+
+import argparse
+import time
+
+from synthetic_fleet import synthetic_arrays, synthetic_profiles
+
+from exposure_engine import score_fleet, score_profiles
+from utility_exposure_calculator import generate_liability_report
+
+# score_fleet key -> path into the scalar report
+PARITY_FIELDS = {
+    "in_compliance": ("compliance_status",),
+    "hazard_index": ("hazard_index", "value"),
+    "regulatory_total": ("regulatory_penalties", "total"),
+    "litigation_low": ("litigation_exposure", "low"),
+    "litigation_mid": ("litigation_exposure", "mid"),
+    "litigation_high": ("litigation_exposure", "high"),
+    "treatment_total": ("treatment_costs", "total"),
+    "total_low": ("total_exposure", "low"),
+    "total_mid": ("total_exposure", "mid"),
+    "total_high": ("total_exposure", "high"),
+}
+
+
+def check_parity(n: int, seed: int) -> None:
+    """Fail loudly if the columnar engine differs from the scalar path."""
+    profiles = synthetic_profiles(n, seed)
+    vectorized = score_profiles(profiles)
+    for i, profile in enumerate(profiles):
+        report = generate_liability_report(profile)
+        for key, path in PARITY_FIELDS.items():
+            expected = report
+            for part in path:
+                expected = expected[part]
+            actual = vectorized[key][i]
+            if actual != expected:
+                raise AssertionError(f"{profile.name}: {key} = {actual!r}, scalar = {expected!r}")
+    print(f"Parity: {n:,} utilities × {len(PARITY_FIELDS)} fields identical")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=1_000_000)
+    parser.add_argument("--scalar-sample", type=int, default=20_000)
+    parser.add_argument("--parity", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Vectorized timing repeats (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    check_parity(args.parity, args.seed)
+
+    profiles = synthetic_profiles(args.scalar_sample, args.seed)
+    start = time.perf_counter()
+    for profile in profiles:
+        generate_liability_report(profile)
+    scalar_rate = len(profiles) / (time.perf_counter() - start)
+
+    arrays = synthetic_arrays(args.utilities, args.seed)
+    elapsed = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        score_fleet(**arrays)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    vector_rate = args.utilities / elapsed
+
+    print(f"Scalar:     {scalar_rate:>14,.0f} utilities/s "
+          f"(~{args.utilities / scalar_rate:.1f} s for {args.utilities:,})")
+    print(f"Vectorized: {vector_rate:>14,.0f} utilities/s ({elapsed:.3f} s for {args.utilities:,})")
+    print(f"Speedup:    {vector_rate / scalar_rate:>14,.0f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Binary fleet files: CSV parsing vs. cold and warm memory-mapped loads
+
+Writes a synthetic fleet CSV, converts it with fleet_binary.convert_fleet
+and times what each rescoring run pays before (and for) scoring:
+
+    csv    read_fleet -> ProfileBatch.from_profiles, then score
+    cold   load_fleet after the file's pages are dropped from the page
+           cache (posix_fadvise DONTNEED), then score
+    warm   load_fleet with the file already cached, then score
+
+Checks that the binary path scores exactly like the CSV path and that
+the batch's numeric columns are views of the file mapping (no copies).
+The cold figure depends on the disk: on tmpfs, or where the kernel keeps
+the pages anyway, it matches the warm one (use --workdir to put the
+files on the disk of interest).
+
+Usage:
+    python benchmarks/bench_fleet_binary.py
+    python benchmarks/bench_fleet_binary.py --utilities 1000000 --repeat 5 --workdir /data/tmp
+"""
+
+import argparse
+import mmap
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from synthetic_fleet import write_synthetic_csv
+
+from exposure_engine import ProfileBatch
+from fleet import read_fleet
+from fleet_binary import convert_fleet, load_fleet
+
+
+def drop_page_cache(path: Path) -> bool:
+    """Ask the kernel to drop path's cached pages; False where that isn't available."""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def mapped(column: np.ndarray) -> bool:
+    """True if column is a view whose memory belongs to an mmap."""
+    base = column
+    while base is not None:
+        if isinstance(base, mmap.mmap):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def timed_run(load):
+    """(load seconds, score seconds, scores) of one run."""
+    start = time.perf_counter()
+    batch = load()
+    loaded = time.perf_counter()
+    scores = batch.score(technology="ro")
+    return loaded - start, time.perf_counter() - loaded, scores, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", type=Path, help="Directory for the fleet files (default: system temp)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        csv_path = write_synthetic_csv(Path(tmp) / "fleet.csv", args.utilities, args.seed)
+        npy_path = Path(tmp) / "fleet.npy"
+        start = time.perf_counter()
+        convert_fleet(csv_path, npy_path)
+        converted = time.perf_counter() - start
+
+        csv_load, csv_score, expected, _ = timed_run(lambda: ProfileBatch.from_profiles(read_fleet(csv_path)))
+        runs = {"cold": [], "warm": []}
+        can_drop = True
+        for _ in range(args.repeat):
+            can_drop = drop_page_cache(npy_path) and can_drop
+            runs["cold"].append(timed_run(lambda: load_fleet(npy_path)))
+            runs["warm"].append(timed_run(lambda: load_fleet(npy_path)))
+
+        for load_s, score_s, scores, batch in runs["cold"] + runs["warm"]:
+            if scores.keys() != expected.keys() or not all(np.array_equal(scores[k], expected[k]) for k in scores):
+                raise AssertionError("binary fleet scores differ from the CSV fleet")
+        batch = runs["warm"][-1][3]
+        columns = (batch.population_served, batch.daily_flow_mgd, batch.years_of_exposure, batch.concentrations)
+        if not all(mapped(column) for column in columns):
+            raise AssertionError("a ProfileBatch column was copied out of the mapping")
+        print("Binary fleet scores identical to CSV; columns are views of the file mapping\n")
+
+        print(f"{args.utilities:,} utilities: CSV {csv_path.stat().st_size / 1e6:.1f} MB, "
+              f".npy {npy_path.stat().st_size / 1e6:.1f} MB (converted in {converted:.1f} s)")
+        print(f"{'':<8}{'load':>10}{'score':>10}")
+        print(f"{'csv':<8}{csv_load:>9.3f}s{csv_score:>9.3f}s")
+        for label, results in runs.items():
+            load_s = statistics.median(r[0] for r in results)
+            score_s = statistics.median(r[1] for r in results)
+            print(f"{label:<8}{load_s:>9.3f}s{score_s:>9.3f}s   ({csv_load / load_s:,.0f}× faster load than CSV)")
+        if not can_drop:
+            print("\nposix_fadvise is unavailable here: 'cold' runs may have read from the page cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Incremental updates vs. regenerating the fleet
+
+Streams random single-compound updates into an IncrementalFleet, checks
+that every live report equals a fresh generate_liability_report of the
+updated profile, and compares the cost of one update with regenerating
+every report. The per-update cost should stay flat as the fleet grows.
+
+Usage:
+    python benchmarks/bench_incremental.py
+    python benchmarks/bench_incremental.py --sizes 1000 100000 --updates 20000
+"""
+
+import argparse
+import random
+import time
+
+from synthetic_fleet import COMPOUNDS, synthetic_profiles
+
+from incremental import IncrementalFleet
+from utility_exposure_calculator import generate_liability_report
+
+
+def random_updates(profiles, count: int, seed: int):
+    """(utility_id, compound, ppt) updates; about a quarter are non-detects."""
+    rng = random.Random(seed)
+    ids = [p.utility_id for p in profiles]
+    return [
+        (rng.choice(ids), rng.choice(COMPOUNDS), 0.0 if rng.random() < 0.25 else round(rng.uniform(0.5, 40), 1))
+        for _ in range(count)
+    ]
+
+
+def check_parity(fleet: IncrementalFleet, profiles) -> None:
+    for profile in profiles:
+        report = fleet.report(profile.utility_id)
+        fresh = generate_liability_report(profile, generated_at=report["report_generated"], **fleet.report_options)
+        if report != fresh:
+            raise AssertionError(f"{profile.name}: incremental report differs from a fresh one")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--updates", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'Utilities':>10}{'µs/update':>12}{'Full rescore (s)':>18}{'Ratio':>12}")
+    for n in args.sizes:
+        profiles = synthetic_profiles(n, args.seed)
+        fleet = IncrementalFleet(profiles)
+        updates = random_updates(profiles, args.updates, args.seed)
+
+        start = time.perf_counter()
+        fleet.apply(updates)
+        per_update = (time.perf_counter() - start) / len(updates)
+        check_parity(fleet, profiles)
+
+        start = time.perf_counter()
+        for profile in profiles:
+            generate_liability_report(profile)
+        full = time.perf_counter() - start
+
+        print(f"{n:>10,}{per_update * 1e6:>12.1f}{full:>18.2f}{full / per_update:>11,.0f}×")
+
+
+if __name__ == "__main__":
+    main()
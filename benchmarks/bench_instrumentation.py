@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Stage instrumentation overhead
+
+Scores a synthetic fleet to JSONL lines with instrumentation off, inside
+instrumentation.instrumented(), and off again afterwards. Checks that the
+instrumented run produces the same lines, that every stage counted one
+call per utility, and that leaving the block puts the original functions
+back (so "off" is the uninstrumented code path, not a disabled wrapper).
+Then checks that a --workers style run (score_parallel over a process
+pool) counts every utility scored in the workers.
+
+Usage:
+    python benchmarks/bench_instrumentation.py
+    python benchmarks/bench_instrumentation.py --utilities 100000 --repeat 5
+"""
+
+import argparse
+import time
+
+from synthetic_fleet import synthetic_profiles
+
+import fleet
+import utility_exposure_calculator as model
+from instrumentation import format_stage_stats, instrumented
+
+GENERATED_AT = "2026-01-01T00:00:00"
+
+
+def score(profiles) -> list:
+    render, _ = fleet.WRITERS["jsonl"]
+    return [render(report) for report in fleet.iter_reports(profiles, GENERATED_AT)]
+
+
+def best_of(profiles, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        score(profiles)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=2, help="Processes for the pool check (default: 2)")
+    args = parser.parse_args()
+
+    profiles = synthetic_profiles(args.utilities, args.seed)
+    originals = (model.generate_liability_report, fleet.generate_liability_report, fleet.WRITERS["jsonl"])
+    expected = score(profiles)
+
+    before = best_of(profiles, args.repeat)
+    with instrumented() as stats:
+        if score(profiles) != expected:
+            raise AssertionError("instrumented output differs")
+        on = best_of(profiles, args.repeat)
+    after = best_of(profiles, args.repeat)
+
+    if (model.generate_liability_report, fleet.generate_liability_report, fleet.WRITERS["jsonl"]) != originals:
+        raise AssertionError("original functions not restored")
+    runs = args.repeat + 1
+    for stage in ("report", "penalties", "litigation", "treatment", "output"):
+        if stats[stage].calls != args.utilities * runs:
+            raise AssertionError(f"{stage}: {stats[stage].calls} calls for {args.utilities * runs} reports")
+    print("Instrumented output identical, every stage counted, originals restored\n")
+
+    print(format_stage_stats(stats, histograms=False))
+    per = lambda seconds: seconds / args.utilities * 1e6  # noqa: E731
+    print(f"\n{args.utilities:,} utilities, best of {args.repeat}")
+    print(f"{'Off (before)':<24}{per(before):>8.1f} µs per utility")
+    print(f"{'Instrumented':<24}{per(on):>8.1f} µs per utility ({on / before - 1:+.1%})")
+    print(f"{'Off (after)':<24}{per(after):>8.1f} µs per utility ({after / before - 1:+.1%})")
+
+    with instrumented() as stats:
+        lines = list(fleet.score_parallel(profiles, args.workers, GENERATED_AT, render=fleet.jsonl_line))
+    if lines != expected:
+        raise AssertionError("instrumented parallel output differs")
+    for stage in ("report", "penalties", "litigation", "treatment", "output"):
+        if stats[stage].calls != args.utilities:
+            raise AssertionError(f"{stage}: {stats[stage].calls} calls counted across {args.workers} workers, "
+                                 f"{args.utilities} reports")
+    print(f"\n{args.workers} workers: every stage counted {args.utilities:,} calls")
+
+
+if __name__ == "__main__":
+    main()
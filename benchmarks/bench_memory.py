@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Memory per utility: dict-backed vs slotted profiles vs ProfileBatch
+
+Builds the same synthetic fleet three ways and reports the bytes
+allocated per utility (tracemalloc) plus the time to scan the fleet's
+compliance and exceedance, which the report path does for every utility:
+
+    dataclass     the original __dict__-backed PFASResult / UtilityProfile,
+                  recomputing the EPA_LIMITS lookup on every property read
+    slots         the current frozen/slotted classes with precomputed limits
+    batch         exposure_engine.ProfileBatch (numeric columns)
+
+Names, ids and states are created before measuring and shared by all three
+layouts, so the figures are the cost of the containers themselves.
+Build times include tracemalloc overhead and are only comparable with
+each other.
+
+Usage:
+    python benchmarks/bench_memory.py                  # 200,000 utilities
+    python benchmarks/bench_memory.py --utilities 1000000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from synthetic_fleet import COMPOUNDS, STATES, synthetic_arrays
+
+from exposure_engine import ProfileBatch
+from utility_exposure_calculator import EPA_LIMITS, PFASResult, UtilityProfile
+
+
+# The pre-slots representation, kept here as the baseline
+@dataclass
+class DictPFASResult:
+    compound: str
+    concentration_ppt: float
+
+    @property
+    def exceeds_mcl(self) -> bool:
+        limit = EPA_LIMITS.get(self.compound, float("inf"))
+        return self.concentration_ppt > limit
+
+    @property
+    def exceedance_factor(self) -> float:
+        limit = EPA_LIMITS.get(self.compound, float("inf"))
+        if limit == 0:
+            return float("inf") if self.concentration_ppt > 0 else 0
+        return max(0, (self.concentration_ppt / limit) - 1)
+
+
+@dataclass
+class DictUtilityProfile:
+    name: str
+    population_served: int
+    daily_flow_mgd: float
+    pfas_results: list
+    years_of_exposure: int = 5
+    utility_id: str = None
+    state: str = None
+
+    @property
+    def in_compliance(self) -> bool:
+        return not any(r.exceeds_mcl for r in self.pfas_results)
+
+    @property
+    def total_exceedance_factor(self) -> float:
+        return sum(r.exceedance_factor for r in self.pfas_results)
+
+
+def build_objects(columns, result_cls, profile_cls):
+    population, flow, years, rows, names, ids, states = columns
+    return [
+        profile_cls(
+            names[i], population[i], flow[i],
+            [result_cls(c, level) for c, level in row],
+            years[i], ids[i], states[i],
+        )
+        for i, row in enumerate(rows)
+    ]
+
+
+def measure(build):
+    """(object, bytes allocated, seconds) for one fleet build."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    fleet = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return fleet, size, elapsed
+
+
+def scan(fleet) -> float:
+    """Seconds to read compliance and exceedance for every utility."""
+    start = time.perf_counter()
+    if isinstance(fleet, ProfileBatch):
+        fleet.in_compliance.sum()
+        fleet.total_exceedance.sum()
+    else:
+        sum(p.in_compliance for p in fleet)
+        sum(p.total_exceedance_factor for p in fleet)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    n = args.utilities
+
+    arrays = synthetic_arrays(n, args.seed)
+    columns = (
+        arrays["population_served"].tolist(),
+        arrays["daily_flow_mgd"].tolist(),
+        arrays["years_of_exposure"].tolist(),
+        [
+            [(c, level) for c, level in zip(COMPOUNDS, row) if level > 0]
+            for row in arrays["concentrations"].tolist()
+        ],
+        [f"Utility {i:07d}" for i in range(n)],
+        [f"PWS{i:07d}" for i in range(n)],
+        [STATES[i % len(STATES)] for i in range(n)],
+    )
+    detections = sum(len(row) for row in columns[3])
+    print(f"{n:,} utilities, {detections / n:.2f} detections per utility\n")
+
+    layouts = {
+        "dataclass": lambda: build_objects(columns, DictPFASResult, DictUtilityProfile),
+        "slots": lambda: build_objects(columns, PFASResult, UtilityProfile),
+        "batch": lambda: ProfileBatch(
+            arrays["population_served"].copy(), arrays["daily_flow_mgd"].copy(),
+            arrays["years_of_exposure"].copy(), arrays["concentrations"].copy(),
+            names=list(columns[4]), utility_ids=list(columns[5]), states=list(columns[6]),
+        ),
+    }
+
+    print(f"{'Layout':<12}{'Bytes/utility':>15}{'Build (s)':>12}{'Scan (ms)':>12}")
+    baseline = None
+    for label, build in layouts.items():
+        fleet, size, elapsed = measure(build)
+        per_utility = size / n
+        line = f"{label:<12}{per_utility:>15,.0f}{elapsed:>12.2f}{scan(fleet) * 1e3:>12.1f}"
+        if baseline is None:
+            baseline = per_utility
+        else:
+            line += f"   ({baseline / per_utility:.1f}× smaller)"
+        print(line)
+        del fleet
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Process-pool scaling of fleet scoring
+
+Scores a synthetic fleet with fleet.score_parallel at 1, 2, 4, ... N
+workers, rendering JSONL lines in the workers as the --input pipeline
+does. Checks that every run produces exactly the serial output (same
+order, same shared timestamp) and prints throughput and speedup.
+
+Usage:
+    python benchmarks/bench_parallel_fleet.py                  # 100k utilities, up to cpu_count
+    python benchmarks/bench_parallel_fleet.py --max-workers 16 --chunk-size 2000
+"""
+
+import argparse
+import os
+import time
+
+from synthetic_fleet import synthetic_profiles
+
+from fleet import jsonl_line, score_parallel
+
+TIMESTAMP = "2026-01-01T00:00:00"
+
+
+def worker_counts(maximum: int):
+    count = 1
+    while count < maximum:
+        yield count
+        count *= 2
+    yield maximum
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=100_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    profiles = synthetic_profiles(args.utilities, args.seed)
+    print(f"{args.utilities:,} synthetic utilities, chunk size {args.chunk_size}, "
+          f"{os.cpu_count()} CPU(s) visible")
+    print(f"{'Workers':>8} {'Seconds':>10} {'Utilities/s':>14} {'Speedup':>9}")
+
+    baseline = None
+    reference = None
+    for workers in worker_counts(args.max_workers):
+        start = time.perf_counter()
+        reports = list(score_parallel(profiles, workers, TIMESTAMP, args.chunk_size, jsonl_line))
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = reports
+        elif reports != reference:
+            raise AssertionError(f"{workers} workers produced different output than 1 worker")
+
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {args.utilities / elapsed:>14,.0f} {baseline / elapsed:>8.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Report cache: cold vs. warm nightly runs
+
+Scores a synthetic fleet to JSONL lines three ways: without a cache
+(score_parallel, as fleet mode does), into an empty cache (every utility
+a miss) and again with a few percent of utilities changed (the nightly
+case). Warm reports and JSONL lines are checked against freshly generated
+ones, and the cache is checked to invalidate itself when a model constant
+changes and to stay under its size bound.
+
+Usage:
+    python benchmarks/bench_report_cache.py
+    python benchmarks/bench_report_cache.py --utilities 1000000 --changed 0.02
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic_fleet import synthetic_profiles
+
+import utility_exposure_calculator as model
+from fleet import jsonl_line, score_cached, score_parallel
+from report_cache import ReportCache, format_stats, model_version
+from utility_exposure_calculator import PFASResult
+
+GENERATED_AT = "2026-01-01T00:00:00"
+
+
+def timed(reports) -> float:
+    start = time.perf_counter()
+    for _ in reports:
+        pass
+    return time.perf_counter() - start
+
+
+def change_some(profiles, share: float, seed: int) -> int:
+    """Re-sample one result of a random share of utilities (as new lab data would)."""
+    rng = random.Random(seed)
+    changed = 0
+    for profile in profiles:
+        if profile.pfas_results and rng.random() < share:
+            old = profile.pfas_results[0]
+            profile.pfas_results[0] = PFASResult(old.compound, round(old.concentration_ppt * 1.1 + 0.1, 1))
+            changed += 1
+    return changed
+
+
+def check(workdir: Path) -> None:
+    profiles = synthetic_profiles(2_000, seed=1)
+    path = workdir / "check.sqlite"
+    with ReportCache(path) as cache:
+        list(score_cached(profiles, cache, generated_at=GENERATED_AT))
+    with ReportCache(path) as cache:
+        warm = list(score_cached(profiles, cache, generated_at=GENERATED_AT))
+        assert cache.hits == len(profiles), cache.stats()
+    fresh = list(score_parallel(profiles, 1, generated_at=GENERATED_AT))
+    if warm != fresh:
+        raise AssertionError("cached reports differ from fresh reports")
+    with ReportCache(path) as cache:
+        lines = list(score_cached(profiles, cache, generated_at="2026-02-01T00:00:00", render=jsonl_line))
+    if lines != list(score_parallel(profiles, 1, generated_at="2026-02-01T00:00:00", render=jsonl_line)):
+        raise AssertionError("cached JSONL lines differ from fresh ones")
+    print("Warm reports and JSONL lines identical to fresh ones")
+
+    rate = model.EPA_PENALTY_RATE
+    model.EPA_PENALTY_RATE = rate + 1
+    try:
+        with ReportCache(path) as cache:
+            assert cache.invalidated == len(profiles) and cache.get_many([cache.key(profiles[0], {})]) == {}
+    finally:
+        model.EPA_PENALTY_RATE = rate
+    print("Changing EPA_PENALTY_RATE invalidates every entry")
+
+    with ReportCache(workdir / "small.sqlite", max_bytes=500_000) as cache:
+        list(score_cached(profiles, cache, generated_at=GENERATED_AT, chunk_size=100))
+        assert cache.stats()["bytes"] <= 500_000 and cache.evictions, cache.stats()
+    print("Size bound holds (least recently used reports evicted)\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=100_000)
+    parser.add_argument("--changed", type=float, default=0.02, help="Share of utilities changed between runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        check(workdir)
+
+        profiles = synthetic_profiles(args.utilities, args.seed)
+        path = workdir / "reports.sqlite"
+        print(f"{args.utilities:,} utilities, model version {model_version()[:12]}")
+        uncached = timed(score_parallel(profiles, 1, generated_at=GENERATED_AT, render=jsonl_line))
+        print(f"{'No cache':<28}{uncached:>8.2f} s")
+
+        with ReportCache(path) as cache:
+            cold = timed(score_cached(profiles, cache, generated_at=GENERATED_AT, render=jsonl_line))
+            print(f"{'Cold cache (all misses)':<28}{cold:>8.2f} s   {format_stats(cache.stats())}")
+
+        changed = change_some(profiles, args.changed, args.seed)
+        with ReportCache(path) as cache:
+            warm = timed(score_cached(profiles, cache, generated_at=GENERATED_AT, render=jsonl_line))
+            print(f"{'Warm cache':<28}{warm:>8.2f} s   {format_stats(cache.stats())}")
+        print(f"\n{changed:,} utilities changed; warm run {uncached / warm:.1f}× faster than no cache, "
+              f"{warm / args.utilities * 1e6:.1f} µs per utility")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Parquet report store: filtered queries vs. scanning JSON reports
+
+Scores a synthetic fleet once, then writes it both as JSONL and as a
+report_store dataset, and answers the same questions each way: by
+decoding every JSONL report and filtering in Python, and with
+report_store.query_rows (partition, row-group and column pruning).
+Each query's answer is checked to be the same both ways.
+
+Usage:
+    python benchmarks/bench_report_store.py
+    python benchmarks/bench_report_store.py --utilities 1000000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic_fleet import synthetic_profiles
+
+from fleet import jsonl_line, score_parallel
+from report_store import explain, format_explain, query_rows, run_token, store_row, write_store
+
+GENERATED_AT = "2026-01-01T00:00:00"
+COLUMNS = ["utility_id", "state", "total_mid", "pfos_ppt"]
+
+# (label, store filters, store states, the same test on a JSON report)
+QUERIES = [
+    (
+        "mid > $50M, PFOS > 3x MCL",
+        ["total_mid > $50M", "pfos_exceedance > 3x"],
+        None,
+        lambda r: r["total_exposure"]["mid"] > 50e6 and _ppt(r, "PFOS") > 3 * 4.0,
+    ),
+    (
+        "CA and TX, mid > $50M",
+        ["total_mid > $50M"],
+        ["CA", "TX"],
+        lambda r: r["utility"]["state"] in ("CA", "TX") and r["total_exposure"]["mid"] > 50e6,
+    ),
+    (
+        "population > 5M",
+        ["population_served > 5M"],
+        None,
+        lambda r: r["utility"]["population_served"] > 5e6,
+    ),
+]
+
+
+def _ppt(report, compound: str) -> float:
+    return next((level["concentration_ppt"] for level in report["pfas_levels"]
+                 if level["compound"] == compound), 0.0)
+
+
+def scan_jsonl(path: Path, test) -> set:
+    with open(path, encoding="utf-8") as handle:
+        return {report["utility"]["utility_id"] for report in map(json.loads, handle) if test(report)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        reports = list(score_parallel(synthetic_profiles(args.utilities, args.seed), 1, GENERATED_AT))
+
+        start = time.perf_counter()
+        with open(workdir / "reports.jsonl", "w", encoding="utf-8") as handle:
+            handle.writelines(map(jsonl_line, reports))
+        jsonl_write = time.perf_counter() - start
+        start = time.perf_counter()
+        write_store(map(store_row, reports), workdir / "store", run_token(GENERATED_AT))
+        store_write = time.perf_counter() - start
+        del reports
+
+        size = lambda path: sum(p.stat().st_size for p in [path, *path.rglob("*")] if p.is_file())  # noqa: E731
+        print(f"{args.utilities:,} utilities")
+        print(f"{'JSONL':<8}{jsonl_write:>7.2f} s to write, {size(workdir / 'reports.jsonl') / 1e6:>7.1f} MB")
+        print(f"{'Store':<8}{store_write:>7.2f} s to write, {size(workdir / 'store') / 1e6:>7.1f} MB\n")
+
+        for label, where, states, test in QUERIES:
+            start = time.perf_counter()
+            expected = scan_jsonl(workdir / "reports.jsonl", test)
+            scanned = time.perf_counter() - start
+            start = time.perf_counter()
+            found = {row["utility_id"] for row in query_rows(workdir / "store", where, COLUMNS, states)}
+            queried = time.perf_counter() - start
+            if found != expected:
+                raise AssertionError(f"{label}: store returned {len(found)} utilities, JSONL scan {len(expected)}")
+            plan = format_explain(explain(workdir / "store", where, states))
+            print(f"{label:<28}{len(found):>8,} rows   scan JSONL {scanned:>6.2f} s   "
+                  f"store {queried * 1000:>7.1f} ms ({scanned / queried:,.0f}×)   {plan}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Streaming sample ingestion throughput
+
+Writes a synthetic UCMR 5-style sample export (tab-separated, µg/L, one
+row per sample × contaminant, including contaminants the calculator
+ignores) plus a matching fleet metadata file, then times
+sample_ingest.sample_profiles with each reducer. It also reports peak
+RSS growth, which should track the number of utilities, not rows.
+
+The reducers are cross-checked on a small file against a straightforward
+in-memory computation.
+
+Usage:
+    python benchmarks/bench_sample_ingest.py                   # 10M rows
+    python benchmarks/bench_sample_ingest.py --rows 1000000 --keep /tmp/ucmr.txt
+"""
+
+import argparse
+import csv
+import resource
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from synthetic_fleet import STATES, write_synthetic_csv
+
+from sample_ingest import REDUCERS, aggregate_samples, iter_samples, sample_profiles
+
+# UCMR 5 contaminants: the five with MCLs and PFBS (Hazard Index), plus others that are skipped
+CONTAMINANTS = ("PFOA", "PFOS", "PFHxS", "PFNA", "HFPO-DA", "PFBS", "PFBA", "PFHxA", "lithium")
+MRL_UG_L = 0.004
+HEADER = ["PWSID", "PWSName", "Size", "FacilityID", "SamplePointID", "CollectionDate",
+          "SampleID", "Contaminant", "MRL", "Units", "MethodID",
+          "AnalyticalResultsSign", "AnalyticalResultValue", "SampleEventCode", "State"]
+
+
+def write_samples(path: Path, rows: int, seed: int = 0) -> int:
+    """Write about `rows` sample rows; returns the number of utilities."""
+    rng = np.random.default_rng(seed)
+    per_event = len(CONTAMINANTS)
+    events = rows // per_event
+    # Quarterly sampling over 3 years: 12 events per utility
+    utilities = max(1, events // 12)
+    dates = [f"{2023 + q // 4}-{3 * (q % 4) + 2:02d}-15" for q in range(12)]
+
+    block = 100_000
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle, delimiter="\t")
+        writer.writerow(HEADER)
+        for start in range(0, events, block):
+            n = min(block, events - start)
+            event = np.arange(start, start + n)
+            utility = event % utilities
+            quarter = event // utilities % 12
+            detected = rng.random((n, per_event)) < 0.3
+            values = np.round(rng.lognormal(-5.0, 1.0, (n, per_event)), 4)
+            for i in range(n):
+                u = int(utility[i])
+                pwsid = f"XX{u:07d}"
+                date = dates[int(quarter[i])]
+                for j, contaminant in enumerate(CONTAMINANTS):
+                    hit = detected[i, j] and values[i, j] >= MRL_UG_L
+                    writer.writerow([
+                        pwsid, f"Utility {u}", "L", "1", "EP1", date, f"S{start + i}",
+                        contaminant, MRL_UG_L, "µg/L", "533",
+                        "=" if hit else "<", values[i, j] if hit else "", "SE1",
+                        STATES[u % len(STATES)],
+                    ])
+    return utilities
+
+
+def write_metadata(path: Path, utilities: int, seed: int = 0) -> None:
+    """Fleet file whose utility_id column matches the sample PWSIDs."""
+    write_synthetic_csv(path, utilities, seed)
+    text = Path(path).read_text().splitlines()
+    with open(path, "w") as handle:
+        handle.write(text[0] + "\n")
+        for i, line in enumerate(text[1:]):
+            name, _, rest = line.split(",", 2)
+            handle.write(f"{name},XX{i:07d},{rest}\n")
+
+
+def reference(path: Path, reducer: str):
+    """Plain in-memory reduction for cross-checking."""
+    samples = defaultdict(list)
+    for utility_id, compound, ppt, quarter, _, _ in iter_samples(path):
+        samples[utility_id, compound].append((quarter, ppt))
+    result = {}
+    for key, values in samples.items():
+        if reducer == "max":
+            result[key] = max(v for _, v in values)
+        elif reducer == "mean":
+            result[key] = sum(v for _, v in values) / len(values)
+        else:
+            latest = max(q for q, _ in values)
+            by_quarter = defaultdict(list)
+            for q, v in values:
+                if q > latest - 4:
+                    by_quarter[q].append(v)
+            means = [sum(v) / len(v) for _, v in sorted(by_quarter.items())]
+            result[key] = sum(means) / len(means)
+    return result
+
+
+def check_reducers(workdir: Path) -> None:
+    path = workdir / "check.txt"
+    write_samples(path, 20_000, seed=1)
+    for reducer in REDUCERS:
+        expected = reference(path, reducer)
+        for utility_id, _, _, levels in aggregate_samples(iter_samples(path), reducer):
+            for compound, value in levels.items():
+                if abs(value - expected[utility_id, compound]) > 1e-9 * max(1.0, value):
+                    raise AssertionError(f"{reducer}: {utility_id} {compound} {value} != {expected[utility_id, compound]}")
+    print(f"Reducers {', '.join(REDUCERS)} match the in-memory reference")
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--keep", type=Path, help="Write (or reuse) the sample file at this path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        check_reducers(workdir)
+
+        samples = args.keep or workdir / "ucmr5.txt"
+        metadata = samples.with_suffix(".fleet.csv")
+        if not (args.keep and samples.exists() and metadata.exists()):
+            start = time.perf_counter()
+            utilities = write_samples(samples, args.rows, args.seed)
+            write_metadata(metadata, utilities, args.seed)
+            print(f"Wrote {samples.stat().st_size / 1e6:,.0f} MB in {time.perf_counter() - start:.0f} s")
+        with open(samples, "rb") as handle:
+            rows = sum(1 for _ in handle) - 1
+
+        print(f"{rows:,} sample rows\n")
+        print(f"{'Reducer':<10}{'Utilities':>12}{'Seconds':>10}{'Rows/s':>14}{'Peak RSS (MB)':>16}")
+        for reducer in REDUCERS:
+            start = time.perf_counter()
+            count = sum(1 for _ in sample_profiles(samples, metadata, reducer))
+            elapsed = time.perf_counter() - start
+            print(f"{reducer:<10}{count:>12,}{elapsed:>10.1f}{rows / elapsed:>14,.0f}{peak_rss_mb():>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
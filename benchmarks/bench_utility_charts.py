@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Per-utility chart PDFs: reused vs. rebuilt page figures
+
+Renders synthetic fleets with assets/utility_charts.py. Before timing,
+it checks that a reused page refilled with new reports draws exactly
+like a freshly built one (no state leaks between utilities) and that
+every state's PDF has one page per UTILITIES_PER_PAGE utilities.
+
+Timed: the same reports written with a figure rebuilt for every page
+and with one reused figure, then the whole fleet through render_fleet
+(scoring included) across --workers processes.
+
+Usage:
+    python benchmarks/bench_utility_charts.py
+    python benchmarks/bench_utility_charts.py --utilities 10000 --workers 8
+"""
+
+import argparse
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from synthetic_fleet import synthetic_profiles
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "assets"))
+
+import utility_charts  # noqa: E402
+from fleet import iter_reports  # noqa: E402
+from generate_charts import STYLE_RC, STYLE_SHEET  # noqa: E402
+from utility_charts import PDF_RC, UTILITIES_PER_PAGE, UtilityPage, render_fleet, write_state_pdf  # noqa: E402
+
+
+def pixels(page: UtilityPage) -> np.ndarray:
+    page.figure.canvas.draw()
+    return np.asarray(page.figure.canvas.buffer_rgba()).copy()
+
+
+def check(workdir: Path) -> None:
+    from matplotlib.style import context
+
+    reports = list(iter_reports(synthetic_profiles(12, seed=1)))
+    with context([STYLE_SHEET, {**STYLE_RC, **PDF_RC}]):
+        reused = UtilityPage()
+        reused.update(reports[:4])
+        pixels(reused)
+        reused.update(reports[4:6])
+        fresh = UtilityPage()
+        fresh.update(reports[4:6])
+        if not np.array_equal(pixels(reused), pixels(fresh)):
+            raise AssertionError("a reused page draws differently from a fresh one")
+    print("Reused page draws identically to a freshly built one")
+
+    profiles = synthetic_profiles(300, seed=2)
+    counts = render_fleet(profiles, workdir / "check", workers=1)
+    expected = {}
+    for profile in profiles:
+        expected[profile.state] = expected.get(profile.state, 0) + 1
+    if counts != expected:
+        raise AssertionError(f"utilities per state {counts} != {expected}")
+    for state, count in counts.items():
+        pdf = (workdir / "check" / utility_charts.state_pdf_name(state)).read_bytes()
+        pages = pdf.count(b"/Type /Page\n") + pdf.count(b"/Type /Page ")
+        if pages != math.ceil(count / UTILITIES_PER_PAGE):
+            raise AssertionError(f"{state}: {pages} pages for {count} utilities")
+    print(f"One PDF per state ({len(counts)}), {UTILITIES_PER_PAGE} utilities per page\n")
+
+
+def write_rebuilding(path: Path, reports) -> None:
+    """Baseline: a new page figure for every page."""
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.style import context
+
+    with context([STYLE_SHEET, {**STYLE_RC, **PDF_RC}]), PdfPages(path) as pdf:
+        for i in range(0, len(reports), UTILITIES_PER_PAGE):
+            page = UtilityPage()
+            page.update(reports[i:i + UTILITIES_PER_PAGE])
+            pdf.savefig(page.figure)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utilities", type=int, default=2_000)
+    parser.add_argument("--sample", type=int, default=200, help="Utilities in the rebuilt vs. reused comparison")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        check(workdir)
+
+        sample = list(iter_reports(synthetic_profiles(args.sample, args.seed)))
+        write_state_pdf(workdir / "warmup.pdf", sample[:UTILITIES_PER_PAGE])
+        start = time.perf_counter()
+        write_rebuilding(workdir / "rebuilt.pdf", sample)
+        rebuilt = time.perf_counter() - start
+        start = time.perf_counter()
+        write_state_pdf(workdir / "reused.pdf", sample)
+        reused = time.perf_counter() - start
+        print(f"{args.sample:,} utilities, {UTILITIES_PER_PAGE} per page")
+        print(f"{'Figure rebuilt per page':<28}{rebuilt / args.sample * 1000:>8.1f} ms per utility")
+        print(f"{'Figure reused':<28}{reused / args.sample * 1000:>8.1f} ms per utility\n")
+
+        profiles = synthetic_profiles(args.utilities, args.seed)
+        start = time.perf_counter()
+        counts = render_fleet(profiles, workdir / "fleet", workers=args.workers)
+        elapsed = time.perf_counter() - start
+        size = sum(path.stat().st_size for path in (workdir / "fleet").iterdir())
+        print(f"{args.utilities:,} utilities -> {len(counts)} state PDFs ({size / 1e6:.1f} MB) "
+              f"with {args.workers} workers: {elapsed:.1f} s, {elapsed / args.utilities * 1000:.1f} ms per utility")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Load test for the local scoring service
+
+Starts `utility_exposure_calculator.py serve` on a free port (or targets
+an already running one with --port), then drives it from C concurrent
+keep-alive connections and reports client-side p50/p90/p99 latency and
+throughput for POST /report, plus POST /reports with --batch > 1. For
+comparison it also times a few one-shot CLI invocations, which is what
+each dashboard call cost before the service.
+
+Usage:
+    python benchmarks/load_test_service.py
+    python benchmarks/load_test_service.py --requests 20000 --connections 32
+    python benchmarks/load_test_service.py --port 8765 --batch 100
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from synthetic_fleet import COMPOUNDS, synthetic_arrays
+
+from scoring_service import percentile
+
+CALCULATOR = Path(__file__).resolve().parent.parent / "04_LEGAL_LIABILITY" / "utility_exposure_calculator.py"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request_bodies(count: int, batch: int, seed: int):
+    """JSON bodies for /report (batch 1) or /reports, from a synthetic fleet."""
+    arrays = synthetic_arrays(count * batch, seed)
+    rows = [
+        {
+            "name": f"Utility {i}",
+            "population_served": int(arrays["population_served"][i]),
+            "daily_flow_mgd": float(arrays["daily_flow_mgd"][i]),
+            "years_of_exposure": int(arrays["years_of_exposure"][i]),
+            **{c: float(v) for c, v in zip(COMPOUNDS, arrays["concentrations"][i]) if v},
+        }
+        for i in range(count * batch)
+    ]
+    if batch == 1:
+        return "/report", [json.dumps(row).encode() for row in rows]
+    return "/reports", [
+        json.dumps({"utilities": rows[i:i + batch]}).encode()
+        for i in range(0, len(rows), batch)
+    ]
+
+
+async def _call(reader, writer, path: str, body: bytes, method: str = "POST"):
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def run_load(port: int, path: str, bodies, connections: int):
+    """Send every body once; returns (latencies, errors, elapsed seconds)."""
+    queue = list(reversed(bodies))
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while queue:
+            body = queue.pop()
+            start = time.perf_counter()
+            status, _ = await _call(reader, writer, path, body)
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def server_metrics(port: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _, body = await _call(reader, writer, "/metrics", b"", method="GET")
+    writer.close()
+    return json.loads(body)
+
+
+def wait_for_server(port: int, process: subprocess.Popen, timeout: float = 15.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("scoring service exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("scoring service did not start")
+
+
+def time_cli(samples: int) -> float:
+    """Median wall time of one-shot CLI reports."""
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(CALCULATOR), "--population", "100000", "--flow", "10",
+             "--pfoa", "25", "--json"],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, help="Use a service already listening on this port")
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=1, help="Utilities per request (>1 uses /reports)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Server --concurrency when spawned")
+    parser.add_argument("--cli-samples", type=int, default=3, help="One-shot CLI runs to time (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    process = None
+    port = args.port
+    if port is None:
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, str(CALCULATOR), "serve", "--port", str(port),
+             "--concurrency", str(args.concurrency)],
+            stdout=subprocess.DEVNULL,
+        )
+        wait_for_server(port, process)
+
+    try:
+        path, bodies = request_bodies(args.requests, args.batch, args.seed)
+        # Warm-up pass so connection setup and first-call costs are excluded
+        asyncio.run(run_load(port, path, bodies[: min(200, len(bodies))], args.connections))
+        latencies, errors, elapsed = asyncio.run(run_load(port, path, bodies, args.connections))
+        metrics = asyncio.run(server_metrics(port))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    ordered = sorted(latencies)
+    utilities = len(latencies) * args.batch
+    print(f"{len(latencies):,} × POST {path} ({args.batch} utilities each), "
+          f"{args.connections} connections, {errors} errors")
+    print(f"Throughput:  {len(latencies) / elapsed:>10,.0f} requests/s  ({utilities / elapsed:,.0f} utilities/s)")
+    for q in (50, 90, 99):
+        print(f"p{q:<2} latency: {percentile(ordered, q) * 1e3:>10.2f} ms")
+    server = metrics["routes"].get(path, {}).get("latency_ms", {})
+    print(f"Server-side p50/p99: {server.get('p50', 0):.2f} / {server.get('p99', 0):.2f} ms")
+    if args.cli_samples:
+        print(f"One-shot CLI report: {time_cli(args.cli_samples) * 1e3:>10.0f} ms (median of {args.cli_samples})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: calculator, fleet and chart hot paths
+
+Times the paths a release can regress on synthetic fleets of 1k, 100k and
+1M utilities:
+
+    report        generate_liability_report per utility
+    json          fleet.jsonl_line (JSON serialization) per report
+    print_report  print_report (console rendering) per report
+    score_fleet   exposure_engine.score_fleet, the vectorized fleet path
+    fleet_jsonl   the fleet CSV -> JSONL pipeline end to end (run_fleet)
+    charts        each plot_* white paper chart rendered to PNG (fleet
+                  size independent, run once)
+
+Every case runs in a fresh interpreter, so its peak RSS (ru_maxrss) is
+its own. Fleets are streamed in chunks, so memory is the case's working
+set rather than the fleet. Per-utility cases time only the call being
+measured, and short cases keep the fastest of a few runs.
+
+Results are written as JSON (run metadata plus one record per case and
+size); --baseline compares a run against an earlier results file and
+exits with status 1 when a case got slower (time per item) or larger
+(peak RSS) by more than the thresholds. Everything runs offline.
+
+Usage:
+    python benchmarks/run_benchmarks.py                       # all cases, 1k/100k/1M
+    python benchmarks/run_benchmarks.py --sizes 1k,100k --cases report,json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/base.json --threshold 0.2
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+CHART_CASE = "charts"
+
+# Cases shorter than this are not compared (noise)
+MIN_COMPARABLE_SECONDS = 0.05
+
+# Cases are rerun (keeping the fastest) up to this many times while their
+# reruns take under SHORT_CASE_SECONDS
+SHORT_CASE_REPEATS = 5
+SHORT_CASE_SECONDS = 1.0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CASES (run in a child interpreter)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _timed_per_report(n: int, seed: int, measure: Callable[[Dict[str, Any]], Any]) -> Tuple[float, int]:
+    """Time measure(report) over a streamed fleet, excluding report generation."""
+    from synthetic_fleet import iter_synthetic_profiles
+    from utility_exposure_calculator import generate_liability_report
+
+    clock = time.perf_counter
+    seconds = 0.0
+    for profile in iter_synthetic_profiles(n, seed):
+        report = generate_liability_report(profile, generated_at="2026-01-01T00:00:00")
+        start = clock()
+        measure(report)
+        seconds += clock() - start
+    return seconds, n
+
+
+def case_report(n: int, seed: int) -> Tuple[float, int]:
+    from synthetic_fleet import iter_synthetic_profiles
+    from utility_exposure_calculator import generate_liability_report
+
+    clock = time.perf_counter
+    seconds = 0.0
+    for profile in iter_synthetic_profiles(n, seed):
+        start = clock()
+        generate_liability_report(profile, generated_at="2026-01-01T00:00:00")
+        seconds += clock() - start
+    return seconds, n
+
+
+def case_json(n: int, seed: int) -> Tuple[float, int]:
+    from fleet import jsonl_line
+
+    return _timed_per_report(n, seed, jsonl_line)
+
+
+def case_print_report(n: int, seed: int) -> Tuple[float, int]:
+    from utility_exposure_calculator import print_report
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return _timed_per_report(n, seed, print_report)
+
+
+def case_score_fleet(n: int, seed: int) -> Tuple[float, int]:
+    from exposure_engine import score_fleet
+    from synthetic_fleet import synthetic_arrays
+
+    fleet = synthetic_arrays(n, seed)
+    start = time.perf_counter()
+    score_fleet(**fleet)
+    return time.perf_counter() - start, n
+
+
+def case_fleet_jsonl(n: int, seed: int) -> Tuple[float, int]:
+    from fleet import run_fleet
+    from synthetic_fleet import write_synthetic_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = write_synthetic_csv(Path(tmp) / "fleet.csv", n, seed)
+        start = time.perf_counter()
+        scored = run_fleet(source, Path(tmp) / "reports.jsonl")
+        return time.perf_counter() - start, scored
+
+
+def case_chart(name: str) -> Tuple[float, int]:
+    sys.path.insert(0, str(BENCHMARKS_DIR.parent / "assets"))
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from generate_charts import CHARTS, load_pyplot
+
+    plt = load_pyplot()
+    plot, _, filename = CHARTS[name]
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        plt.close(plot(Path(tmp) / filename))
+        return time.perf_counter() - start, 1
+
+
+FLEET_CASES: Dict[str, Callable[[int, int], Tuple[float, int]]] = {
+    "report": case_report,
+    "json": case_json,
+    "print_report": case_print_report,
+    "score_fleet": case_score_fleet,
+    "fleet_jsonl": case_fleet_jsonl,
+}
+CASES = [*FLEET_CASES, CHART_CASE]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_child(case: str, size: str, seed: int) -> None:
+    """Child mode: run one case and print its result as JSON."""
+    import synthetic_fleet  # noqa: F401  (puts the calculator on sys.path)
+
+    if case.startswith(CHART_CASE + ":"):
+        run = functools.partial(case_chart, case.split(":", 1)[1])
+    else:
+        run = functools.partial(FLEET_CASES[case], SIZES[size], seed)
+    seconds, items = run()
+    # Short cases are repeated and keep their fastest run
+    started = time.perf_counter()
+    for _ in range(SHORT_CASE_REPEATS - 1):
+        if time.perf_counter() - started > SHORT_CASE_SECONDS:
+            break
+        seconds = min(seconds, run()[0])
+    print(json.dumps({"seconds": seconds, "items": items, "peak_rss_mb": peak_rss_mb()}))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RUNNER
+# ─────────────────────────────────────────────────────────────────────────────
+
+def run_case(case: str, size: Optional[str], seed: int) -> Dict[str, Any]:
+    done = subprocess.run(
+        [sys.executable, __file__, "--child", case, size or "-", "--seed", str(seed)],
+        capture_output=True, text=True,
+    )
+    if done.returncode:
+        raise RuntimeError(f"{case} ({size or 'once'}) failed:\n{done.stderr.strip()}")
+    result = json.loads(done.stdout.strip().splitlines()[-1])
+    result["us_per_item"] = result["seconds"] / max(result["items"], 1) * 1e6
+    return {"case": case, "size": size, **result}
+
+
+def chart_names() -> List[str]:
+    sys.path.insert(0, str(BENCHMARKS_DIR.parent / "assets"))
+    from generate_charts import CHARTS
+
+    return list(CHARTS)
+
+
+def run_metadata(seed: int) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+    }
+
+
+def result_key(result: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    return result["case"], result["size"]
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    threshold: float,
+    rss_threshold: float,
+) -> List[str]:
+    """Regressions of results against baseline, as messages."""
+    previous = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result_key(result))
+        if before is None:
+            continue
+        label = f"{result['case']} ({result['size'] or 'once'})"
+        ratio = result["us_per_item"] / before["us_per_item"] if before["us_per_item"] else 1.0
+        if ratio > 1 + threshold and result["seconds"] >= MIN_COMPARABLE_SECONDS:
+            regressions.append(f"{label}: {before['us_per_item']:,.1f} -> {result['us_per_item']:,.1f} "
+                               f"µs per item (+{ratio - 1:.0%})")
+        if result["peak_rss_mb"] and before.get("peak_rss_mb"):
+            growth = result["peak_rss_mb"] / before["peak_rss_mb"]
+            if growth > 1 + rss_threshold:
+                regressions.append(f"{label}: peak RSS {before['peak_rss_mb']:,.0f} -> "
+                                   f"{result['peak_rss_mb']:,.0f} MB (+{growth - 1:.0%})")
+    return regressions
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    rss = f"{result['peak_rss_mb']:>8,.0f} MB" if result["peak_rss_mb"] else f"{'-':>11}"
+    return (f"{result['case']:<28}{result['size'] or 'once':>6}{result['seconds']:>10.2f} s"
+            f"{result['us_per_item']:>14,.1f} µs/item{rss}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(SIZES), help=f"Comma-separated ({', '.join(SIZES)})")
+    parser.add_argument("--cases", default=",".join(CASES), help=f"Comma-separated ({', '.join(CASES)})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Results JSON (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown in time per item (default: 0.25 = 25%%)")
+    parser.add_argument("--rss-threshold", type=float, default=0.25, help="Allowed peak RSS growth")
+    parser.add_argument("--child", nargs=2, metavar=("CASE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.seed)
+        return
+
+    sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = [size for size in sizes if size not in SIZES] + [case for case in cases if case not in CASES]
+    if unknown:
+        print(f"Error: Unknown size or case '{unknown[0]}' "
+              f"(sizes: {', '.join(SIZES)}; cases: {', '.join(CASES)})")
+        sys.exit(2)
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"Error: Can't read baseline {args.baseline}: {exc}")
+            sys.exit(2)
+
+    runs = [(case, size) for case in cases if case in FLEET_CASES for size in sizes]
+    if CHART_CASE in cases:
+        runs += [(f"{CHART_CASE}:{name}", None) for name in chart_names()]
+
+    metadata = run_metadata(args.seed)
+    results = []
+    for case, size in runs:
+        try:
+            result = run_case(case, size, args.seed)
+        except RuntimeError as exc:
+            print(f"Error: {exc}")
+            sys.exit(2)
+        results.append(result)
+        print(format_result(result), flush=True)
+
+    output = args.output or RESULTS_DIR / f"{metadata['started'].replace(':', '')[:17]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"run": metadata, "results": results}, indent=2) + "\n", encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold, args.rss_threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (thresholds: time +{args.threshold:.0%}, "
+              f"RSS +{args.rss_threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
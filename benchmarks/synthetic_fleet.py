@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Synthetic utility fleets for benchmarks
+
+Generates reproducible fleets with realistic-looking spreads: log-normal
+population and flow, and sparse PFAS detections whose levels straddle the
+EPA limits. Fleets can be produced as UtilityProfile objects, as the
+columnar arrays used by exposure_engine, or as a fleet CSV file.
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import csv
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+# Make the calculator modules importable from the benchmarks directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "04_LEGAL_LIABILITY"))
+
+from utility_exposure_calculator import EPA_LIMITS, MODEL_COMPOUNDS, PFASResult, UtilityProfile  # noqa: E402
+
+COMPOUNDS = MODEL_COMPOUNDS
+# Typical detected level per compound (ppt): the MCL, or a few ppt for PFBS
+# (which only enters the Hazard Index)
+TYPICAL_PPT = {**EPA_LIMITS, "PFBS": 20.0}
+STATES = ("CA", "MI", "NC", "NJ", "NY", "OH", "PA", "TX")
+
+
+def synthetic_arrays(n: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Columnar synthetic fleet (the score_fleet input layout)."""
+    rng = np.random.default_rng(seed)
+    population = np.maximum(25, rng.lognormal(8.5, 1.6, n)).astype(np.int64)
+    # Roughly 100 gallons per person per day
+    flow = np.round(np.maximum(0.01, population * 1e-4 * rng.uniform(0.6, 1.4, n)), 3)
+    years = rng.integers(1, 21, n)
+
+    limits = np.array([TYPICAL_PPT[c] for c in COMPOUNDS])
+    detected = rng.random((n, len(COMPOUNDS))) < 0.35
+    levels = np.round(rng.lognormal(0.0, 1.0, (n, len(COMPOUNDS))) * limits, 1)
+    concentrations = np.where(detected, levels, 0.0)
+
+    return {
+        "population_served": population,
+        "daily_flow_mgd": flow,
+        "years_of_exposure": years,
+        "concentrations": concentrations,
+    }
+
+
+def synthetic_profiles(n: int, seed: int = 0, offset: int = 0) -> List[UtilityProfile]:
+    """
+    Synthetic fleet as UtilityProfile objects (same data as synthetic_arrays).
+
+    offset shifts the utility numbering (names, ids, states).
+    """
+    arrays = synthetic_arrays(n, seed)
+    profiles = []
+    for i in range(n):
+        results = [
+            PFASResult(compound, float(level))
+            for compound, level in zip(COMPOUNDS, arrays["concentrations"][i])
+            if level > 0
+        ]
+        number = offset + i
+        profiles.append(UtilityProfile(
+            name=f"Utility {number:07d}",
+            population_served=int(arrays["population_served"][i]),
+            daily_flow_mgd=float(arrays["daily_flow_mgd"][i]),
+            pfas_results=results,
+            years_of_exposure=int(arrays["years_of_exposure"][i]),
+            utility_id=f"PWS{number:07d}",
+            state=STATES[number % len(STATES)],
+        ))
+    return profiles
+
+
+def iter_synthetic_profiles(n: int, seed: int = 0, chunk_size: int = 100_000) -> Iterator[UtilityProfile]:
+    """A synthetic fleet streamed chunk by chunk (one seed per chunk), for fleets too big to hold."""
+    for chunk, start in enumerate(range(0, n, chunk_size)):
+        yield from synthetic_profiles(min(chunk_size, n - start), seed + chunk, offset=start)
+
+
+def write_synthetic_csv(path: Path, n: int, seed: int = 0) -> Path:
+    """Write a synthetic fleet in the fleet.py CSV input format."""
+    arrays = synthetic_arrays(n, seed)
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["name", "utility_id", "state", "population_served",
+                         "daily_flow_mgd", "years_of_exposure", *COMPOUNDS])
+        for i in range(n):
+            writer.writerow([
+                f"Utility {i:07d}",
+                f"PWS{i:07d}",
+                STATES[i % len(STATES)],
+                int(arrays["population_served"][i]),
+                float(arrays["daily_flow_mgd"][i]),
+                int(arrays["years_of_exposure"][i]),
+                *(float(level) if level > 0 else "" for level in arrays["concentrations"][i]),
+            ])
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic fleet CSV")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--utilities", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_synthetic_csv(args.output, args.utilities, args.seed)
+    print(f"Wrote {args.utilities:,} utilities to {args.output}")
@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: makes the calculator modules importable.
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "04_LEGAL_LIABILITY"))
@@ -0,0 +1,26 @@
+"""
+Command-line option combinations the calculator rejects
+
+Run:
+    python -m pytest -q tests
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import sys
+
+import pytest
+
+import utility_exposure_calculator
+
+DATA_DAYS = ["--input", "fleet.csv", "--samples", "UCMR5_All.txt", "--violation-days", "data"]
+
+
+@pytest.mark.parametrize("mode", [["--optimize"], ["--budget", "1e6"], ["--monte-carlo", "1000"]])
+def test_data_violation_days_rejected(monkeypatch, capsys, mode):
+    monkeypatch.setattr(sys, "argv", ["utility_exposure_calculator.py", *DATA_DAYS, *mode])
+    with pytest.raises(SystemExit) as exc:
+        utility_exposure_calculator.main()
+    assert exc.value.code == 2
+    assert "--violation-days data is not supported" in capsys.readouterr().err
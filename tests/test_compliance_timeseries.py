@@ -0,0 +1,57 @@
+"""
+Running-annual-average compliance: penalty period per utility
+
+Run:
+    python -m pytest -q tests
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import numpy as np
+
+import compliance_timeseries
+from compliance_timeseries import ComplianceHistory, assess, quarter_days
+from utility_exposure_calculator import EPA_PENALTY_RATE
+
+FIRST = 2023 * 4
+
+
+def history() -> ComplianceHistory:
+    # A is sampled for eight quarters below the MCL; B stopped after four, above it
+    quarters = list(range(FIRST, FIRST + 8)) + list(range(FIRST, FIRST + 4))
+    utility = [0] * 8 + [1] * 4
+    ppt = [1.0] * 8 + [20.0] * 4
+    return ComplianceHistory.from_records(
+        np.array(utility), np.array(quarters), np.zeros(len(quarters), dtype=np.int64),
+        np.array(ppt), ["A", "B"], ["PFOA"],
+    )
+
+
+def test_period_ends_at_each_utilitys_last_sample():
+    result = assess(history())
+    days = int(quarter_days(FIRST, 4).sum())
+    assert result["latest_raa"][1, 0] == 20.0
+    assert result["violation_days"].tolist() == [[0], [days]]
+    assert result["regulatory_total"].tolist() == [0, days * EPA_PENALTY_RATE]
+
+
+def test_whole_history_stops_at_last_sample():
+    # B's RAA stays defined for three quarters after its last sample
+    result = assess(history(), period_quarters=None)
+    assert result["violation_days"][1, 0] == quarter_days(FIRST, 4).sum()
+
+
+def test_from_samples_across_chunks(tmp_path, monkeypatch):
+    path = tmp_path / "samples.csv"
+    lines = ["PWSID,Contaminant,AnalyticalResultValue,Units,CollectionDate"]
+    for i in range(40):
+        lines.append(f"U{i % 3},{('PFOA', 'PFOS')[i % 2]},{i * 0.7:.1f},ng/L,{2023 + i // 16}-{i % 12 + 1:02d}-15")
+    path.write_text("\n".join(lines) + "\n")
+    whole = ComplianceHistory.from_samples(path)
+    monkeypatch.setattr(compliance_timeseries, "SAMPLE_CHUNK_ROWS", 7)
+    chunked = ComplianceHistory.from_samples(path)
+    assert chunked.utility_ids == whole.utility_ids == ["U0", "U1", "U2"]
+    assert chunked.compounds == whole.compounds
+    assert chunked.first_quarter == whole.first_quarter == 2023 * 4
+    np.testing.assert_array_equal(chunked.quarterly, whole.quarterly)
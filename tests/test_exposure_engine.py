@@ -0,0 +1,110 @@
+"""
+Parity of the vectorized exposure engine with the scalar report path
+
+score_fleet must give exactly the numbers generate_liability_report gives
+for the same utilities, for the default options, the discounted NPV mode
+with escalation, and every technology in the cost table.
+
+Run:
+    python -m pytest -q tests
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+from typing import List
+
+import numpy as np
+import pytest
+
+from exposure_engine import COMPOUNDS, profiles_to_arrays, score_fleet
+from utility_exposure_calculator import EPA_LIMITS, PFASResult, UtilityProfile, generate_liability_report
+
+# score_fleet key -> path into the scalar report
+PARITY_FIELDS = {
+    "in_compliance": ("compliance_status",),
+    "hazard_index": ("hazard_index", "value"),
+    "regulatory_total": ("regulatory_penalties", "total"),
+    "litigation_low": ("litigation_exposure", "low"),
+    "litigation_mid": ("litigation_exposure", "mid"),
+    "litigation_high": ("litigation_exposure", "high"),
+    "treatment_capital": ("treatment_costs", "capital"),
+    "treatment_annual_om": ("treatment_costs", "annual_om"),
+    "treatment_total": ("treatment_costs", "total"),
+    "total_low": ("total_exposure", "low"),
+    "total_mid": ("total_exposure", "mid"),
+    "total_high": ("total_exposure", "high"),
+}
+
+TECHNOLOGIES = ["gac", "ix_singleuse", "ix_regenerable", "ro", "nf", "novel", "novel_projected"]
+
+
+def random_profiles(n: int, seed: int) -> List[UtilityProfile]:
+    """Utilities with random size, history and detections around the MCLs."""
+    rng = np.random.default_rng(seed)
+    typical = {**EPA_LIMITS, "PFBS": 20.0}
+    profiles = []
+    for i in range(n):
+        population = int(max(25, rng.lognormal(8.5, 1.6)))
+        results = [
+            PFASResult(compound, round(float(rng.lognormal(0.0, 1.0)) * typical[compound], 1))
+            for compound in COMPOUNDS
+            if rng.random() < 0.4
+        ]
+        profiles.append(UtilityProfile(
+            name=f"Utility {i}",
+            population_served=population,
+            daily_flow_mgd=round(max(0.01, population * 1e-4 * float(rng.uniform(0.6, 1.4))), 3),
+            pfas_results=results,
+            years_of_exposure=int(rng.integers(1, 21)),
+        ))
+    return profiles
+
+
+def assert_parity(profiles: List[UtilityProfile], **options) -> None:
+    report_options = dict(options)
+    if "treatment_years" in report_options:
+        report_options["years"] = report_options.pop("treatment_years")
+    scores = score_fleet(**profiles_to_arrays(profiles), **options)
+    for i, profile in enumerate(profiles):
+        report = generate_liability_report(profile, **report_options)
+        for key, path in PARITY_FIELDS.items():
+            expected = report
+            for part in path:
+                expected = expected[part]
+            assert scores[key][i] == expected, f"{profile.name}: {key} = {scores[key][i]!r}, scalar = {expected!r}"
+
+
+@pytest.fixture(scope="module")
+def profiles() -> List[UtilityProfile]:
+    return random_profiles(500, seed=2024)
+
+
+def test_default_options(profiles):
+    assert_parity(profiles)
+
+
+def test_compliance_mix(profiles):
+    # The random fleet exercises both branches of every compliance test
+    scores = score_fleet(**profiles_to_arrays(profiles))
+    assert 0 < scores["in_compliance"].sum() < len(profiles)
+
+
+@pytest.mark.parametrize("discount_rate, escalation_rate", [(0.03, 0.0), (0.05, 0.025), (0.0, 0.02)])
+def test_npv_with_escalation(profiles, discount_rate, escalation_rate):
+    assert_parity(profiles, discount_rate=discount_rate, escalation_rate=escalation_rate)
+
+
+@pytest.mark.parametrize("technology", TECHNOLOGIES)
+def test_technologies(profiles, technology):
+    assert_parity(profiles, technology=technology, treatment_years=10, violation_days=90)
+
+
+@pytest.mark.parametrize("technology", ["ix_singleuse", "ro"])
+def test_technologies_npv(profiles, technology):
+    assert_parity(profiles, technology=technology, treatment_years=15, discount_rate=0.04, escalation_rate=0.03)
+
+
+def test_no_detections():
+    profile = UtilityProfile("Clean", 10_000, 1.2, [], years_of_exposure=3)
+    assert_parity([profile])
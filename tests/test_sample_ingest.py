@@ -0,0 +1,49 @@
+"""
+Sample file parsing: collection dates
+
+Run:
+    python -m pytest -q tests
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import pytest
+
+from sample_ingest import aggregate_samples, iter_samples
+
+HEADER = "PWSID,Contaminant,AnalyticalResultValue,Units,CollectionDate"
+
+
+def write(tmp_path, *rows):
+    path = tmp_path / "samples.csv"
+    path.write_text("\n".join([HEADER, *rows]) + "\n")
+    return path
+
+
+def test_blank_date_rejected_when_dates_are_needed(tmp_path):
+    path = write(tmp_path, "U1,PFOA,5.0,ng/L,2024-02-01", "U1,PFOA,7.0,ng/L,  ")
+    with pytest.raises(ValueError, match=r":3: missing collection date"):
+        list(iter_samples(path, need_dates=True))
+    assert [sample[3] for sample in iter_samples(path)] == [2024 * 4, -1]
+
+
+def test_bad_month_rejected(tmp_path):
+    path = write(tmp_path, "U1,PFOA,5.0,ng/L,2024-13-01")
+    with pytest.raises(ValueError, match="bad collection date"):
+        list(iter_samples(path))
+
+
+def test_raa_averages_sampled_quarters_in_window(tmp_path):
+    # 2023Q1 falls outside the four quarters ending 2024Q2; 2023Q4 is unsampled
+    path = write(
+        tmp_path,
+        "U1,PFOA,100.0,ng/L,2023-02-01",
+        "U1,PFOA,2.0,ng/L,2023-08-01",
+        "U1,PFOA,4.0,ng/L,2024-02-01",
+        "U1,PFOA,6.0,ng/L,2024-05-01",
+        "U1,PFOA,12.0,ng/L,2024-05-20",
+    )
+    [(utility_id, _, _, levels)] = aggregate_samples(iter_samples(path, need_dates=True), "raa")
+    assert utility_id == "U1"
+    assert levels["PFOA"] == pytest.approx((2.0 + 4.0 + 9.0) / 3)
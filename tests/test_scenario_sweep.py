@@ -0,0 +1,69 @@
+"""
+Scenario sweep grid parsing and cells
+
+Run:
+    python -m pytest -q tests
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import argparse
+
+import pytest
+
+from scenario_sweep import parse_sweep, sweep_profile
+from utility_exposure_calculator import PFASResult, UtilityProfile, generate_liability_report, run_sweep
+
+PROFILE = UtilityProfile("Springfield", 100_000, 10.0, [PFASResult("PFOA", 25.0), PFASResult("PFOS", 6.0)])
+
+
+def test_axes_left_out_use_defaults():
+    grid = parse_sweep(["years=5..6"], {"tech": "ro", "years": 10, "violation_days": 90})
+    assert grid == {"tech": ["ro"], "years": [5, 6], "violation_days": [90]}
+
+
+def test_axes_left_out_without_defaults():
+    assert parse_sweep(["tech=ix,ro"]) == {"tech": ["ix", "ro"], "years": [20], "violation_days": [365]}
+
+
+def test_unknown_axis():
+    with pytest.raises(ValueError):
+        parse_sweep(["speed=1"])
+
+
+@pytest.mark.parametrize("discount_rate", [None, 0.03])
+def test_cells_match_reports(discount_rate):
+    grid = parse_sweep(["tech=gac,ro", "years=5,20", "violation_days=90,365"])
+    rows = list(sweep_profile(PROFILE, grid, discount_rate))
+    assert len(rows) == 8
+    for row in rows:
+        report = generate_liability_report(
+            PROFILE, technology=row["technology"], years=row["years"],
+            violation_days=row["violation_days"], discount_rate=discount_rate,
+        )
+        assert row["regulatory_penalties"] == report["regulatory_penalties"]["total"]
+        assert row["treatment_total"] == report["treatment_costs"]["total"]
+        assert row["total_mid"] == report["total_exposure"]["mid"]
+
+
+def test_data_violation_days():
+    profile = UtilityProfile(
+        "Shelbyville", 50_000, 5.0, [PFASResult("PFOA", 25.0), PFASResult("PFOS", 6.0)],
+        violation_days={"PFOA": 92, "PFOS": 181},
+    )
+    grid = parse_sweep(["tech=gac,ro"], {"violation_days": "data"})
+    for row in sweep_profile(profile, grid):
+        report = generate_liability_report(profile, technology=row["technology"])
+        assert row["violation_days"] == "data"
+        assert row["regulatory_penalties"] == report["regulatory_penalties"]["total"]
+        assert row["total_mid"] == report["total_exposure"]["mid"]
+
+
+def test_data_violation_days_cannot_be_swept():
+    args = argparse.Namespace(
+        sweep=["violation_days=90,365"], technology="gac", horizon=20, violation_days="data",
+        output="-", format=None, discount_rate=None, escalation=0.0,
+    )
+    with pytest.raises(ValueError, match="violation_days sweep axis"):
+        run_sweep([PROFILE], args)
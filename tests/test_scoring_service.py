@@ -0,0 +1,54 @@
+"""
+Scoring service admission control
+
+Run:
+    python -m pytest -q tests
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import asyncio
+import threading
+import time
+
+import scoring_service
+from report_output import dumps
+from scoring_service import ScoringService
+
+BODY = dumps({"population": 100_000, "flow": 10, "PFOA": 25}).encode()
+
+
+def test_concurrency_bounds_reports_scored_at_once(monkeypatch):
+    lock = threading.Lock()
+    running = []
+    peak = []
+    score_one = scoring_service.score_one
+
+    def slow_score(*args):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+        return score_one(*args)
+
+    monkeypatch.setattr(scoring_service, "score_one", slow_score)
+
+    async def burst():
+        service = ScoringService(concurrency=2)
+        try:
+            reports = [asyncio.create_task(service.dispatch("POST", "/report", BODY)) for _ in range(6)]
+            await asyncio.sleep(0.01)
+            # The event loop stays free for other routes while reports are scored
+            health = await service.dispatch("GET", "/health", b"")
+            assert not all(task.done() for task in reports)
+            return health, await asyncio.gather(*reports)
+        finally:
+            service.close()
+
+    health, results = asyncio.run(burst())
+    assert health[0] == 200
+    assert [status for status, _ in results] == [200] * 6
+    assert max(peak) == 2
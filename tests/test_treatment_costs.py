@@ -0,0 +1,53 @@
+"""
+Treatment cost modes agree
+
+The NPV mode and the simple sum take O&M from the same cost table rate,
+so with no discounting or escalation they give the same total.
+
+Run:
+    python -m pytest -q tests
+
+Author: Genesis Platform Inc.
+License: CC BY-NC-ND 4.0
+"""
+
+import numpy as np
+import pytest
+
+from exposure_engine import treatment_costs
+from utility_exposure_calculator import PFASResult, UtilityProfile, calculate_treatment_costs
+
+TECHNOLOGIES = ["gac", "ix_singleuse", "ix_regenerable", "ro", "nf", "novel_projected"]
+
+PROFILE = UtilityProfile("Springfield", 10_000, 1.0, [PFASResult("PFOA", 40.0), PFASResult("PFOS", 12.0)])
+
+
+@pytest.mark.parametrize("years", [1, 7, 20])
+@pytest.mark.parametrize("technology", TECHNOLOGIES)
+def test_zero_rate_npv_matches_simple_sum(technology, years):
+    simple = calculate_treatment_costs(PROFILE, technology, years)
+    npv = calculate_treatment_costs(PROFILE, technology, years, discount_rate=0.0)
+    assert npv["total"] == pytest.approx(simple["total"], rel=1e-12)
+    assert npv["annual_om"] == pytest.approx(simple["annual_om"], rel=1e-12)
+
+
+@pytest.mark.parametrize("technology", ["gac", "ix_singleuse"])
+def test_zero_rate_npv_matches_simple_sum_breakthrough(technology):
+    simple = calculate_treatment_costs(PROFILE, technology, 20, om_model="breakthrough")
+    npv = calculate_treatment_costs(PROFILE, technology, 20, discount_rate=0.0, om_model="breakthrough")
+    assert npv["total"] == pytest.approx(simple["total"], rel=1e-12)
+
+
+@pytest.mark.parametrize("technology", TECHNOLOGIES)
+def test_zero_rate_npv_matches_simple_sum_vectorized(technology):
+    flow = np.array([0.05, 1.0, 12.5])
+    simple = treatment_costs(flow, technology, 20)
+    npv = treatment_costs(flow, technology, 20, discount_rate=0.0)
+    np.testing.assert_allclose(npv["total"], simple["total"], rtol=1e-12)
+
+
+def test_discounting_lowers_npv():
+    simple = calculate_treatment_costs(PROFILE, "gac", 20)
+    npv = calculate_treatment_costs(PROFILE, "gac", 20, discount_rate=0.03)
+    assert npv["capital"] == simple["capital"]
+    assert npv["total"] < simple["total"]